@@ -0,0 +1,218 @@
+"""Acquisition/processing benchmark against the simulated MDO4024C.
+
+    python benchmark.py --records 10000 100000 1000000 --channels 1 2 4 --formats int8 int16 --frames 20
+
+Reports, for every record length / channel count / transfer format: acquired frames/s,
+transfer MB/s, and the per-frame latency of scaling, FFT and plotting.
+
+With --instruments the aggregate rate of several simulated scopes acquiring in parallel
+(session.SessionManager) is measured instead; use --latency / --link-rate to model the link:
+
+    python benchmark.py --instruments 1 2 4 --records 100000 --channels 2 --latency 2 --link-rate 50
+
+With --fastframe the captured trigger-event rate of FastFrame sequences of N frames is
+compared with one Run/Stop acquisition per event (``N = 1``):
+
+    python benchmark.py --fastframe 1 100 1000 --records 1000 --channels 1 --latency 2 --link-rate 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from src.oscilloscope import Oscilloscope, TRANSFER_FORMATS
+from src.fft_processor import FFTProcessor
+from src.session import SessionManager
+from src.simulated_scope import SIMULATED_ADDRESS, SimulatedResourceManager
+from src.waveform import volts_block
+from src.decimation import minmax_envelope
+
+
+def time_call(function, repeat):
+    """Average wall time of ``function()`` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def make_plotter():
+    """Return a callable that draws one frame into an off-screen PlotWidget, or None.
+
+    Mirrors the GUI pipeline: persistent curves fed a min/max envelope of the raw record.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+        from PyQt5 import QtWidgets
+        import pyqtgraph as pg
+    except ImportError:
+        return None
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    graph = pg.PlotWidget()
+    graph.resize(1200, 700)
+    graph.show()
+    curves = {}
+
+    def plot(scope, channels):
+        bins = graph.getViewBox().width()
+        for channel in channels:
+            if channel not in curves:
+                curves[channel] = graph.plot()
+            waveform = scope.waveforms[channel]
+            positions, envelope = minmax_envelope(waveform.raw, 0, len(waveform), bins)
+            curves[channel].setData((waveform.x_zero + positions * waveform.x_increment) * 1000,
+                                    waveform.scale(envelope))
+        graph.repaint()
+        app.processEvents()
+
+    return plot
+
+
+def run_case(record, channels, transfer_format, frames, latency, plotter):
+    scope = Oscilloscope()
+    scope.set_transfer_format(*TRANSFER_FORMATS[transfer_format])
+    scope.connect_device(SIMULATED_ADDRESS, SimulatedResourceManager(record_length=record, latency=latency))
+    selected = {channel: channel <= channels for channel in range(1, 5)}
+    sources = [channel for channel in selected if selected[channel]]
+
+    scope.acquire_frame(selected)  # Warm up caches and the simulated waveform generator
+    start = time.perf_counter()
+    for _ in range(frames):
+        scope.acquire_frame(selected)
+    elapsed = time.perf_counter() - start
+
+    width = scope.transfer_width
+    transferred = frames * record * channels * width
+
+    waveforms = [scope.waveforms[channel] for channel in sources]
+    buffer = np.empty((channels, record), dtype=np.float32)
+    scale_ms = time_call(lambda: volts_block(waveforms, out=buffer), 3)
+
+    fft = FFTProcessor()
+    tscale = scope.preamble[sources[0]]['XINCR']
+    fft_ms = time_call(lambda: fft.perform_fft(tscale, volts_block(waveforms, out=buffer), False), 3)
+
+    plot_ms = time_call(lambda: plotter(scope, sources), 3) if plotter else float('nan')
+    scope.close()
+
+    return {
+        'record': record,
+        'channels': channels,
+        'format': transfer_format,
+        'fps': frames / elapsed,
+        'mbps': transferred / elapsed / 1e6,
+        'scale_ms': scale_ms,
+        'fft_ms': fft_ms,
+        'plot_ms': plot_ms,
+    }
+
+
+def run_session_case(instruments, record, channels, transfer_format, frames, latency, link_rate):
+    """Aggregate lockstep rate of ``instruments`` simulated scopes acquiring concurrently."""
+    with SessionManager() as session:
+        for _ in range(instruments):
+            options = dict(record_length=record, latency=latency, transfer_rate=link_rate)
+            session.add(SIMULATED_ADDRESS, range(1, channels + 1), transfer_format=transfer_format,
+                        resource_manager=SimulatedResourceManager(**options))
+        session.connect()
+        session.acquire()  # Warm up caches
+        start = time.perf_counter()
+        for _ in range(frames):
+            session.acquire()
+        elapsed = time.perf_counter() - start
+
+    transferred = instruments * frames * record * channels * TRANSFER_FORMATS[transfer_format][0]
+    return {
+        'instruments': instruments,
+        'fps': instruments * frames / elapsed,
+        'mbps': transferred / elapsed / 1e6,
+    }
+
+
+def run_fastframe_case(count, record, channels, transfer_format, frames, latency, link_rate):
+    """Trigger events captured per second with FastFrame sequences of ``count`` frames.
+
+    ``count == 1`` measures the ordinary one-acquisition-per-event loop for comparison.
+    """
+    scope = Oscilloscope()
+    scope.connect_device(SIMULATED_ADDRESS, SimulatedResourceManager(record_length=record, latency=latency,
+                                                                     transfer_rate=link_rate))
+    scope.set_transfer_format(*TRANSFER_FORMATS[transfer_format])
+    selected = {channel: channel <= channels for channel in range(1, 5)}
+
+    def acquire():
+        if count == 1:
+            scope.acquire_data(selected)
+            return 1
+        return len(next(iter(scope.acquire_segments(selected, count).values())).trigger_times)
+
+    acquire()  # Warm up caches
+    events = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        events += acquire()
+    elapsed = time.perf_counter() - start
+    scope.close()
+    return {
+        'count': count,
+        'eps': events / elapsed,
+        'mbps': events * record * channels * TRANSFER_FORMATS[transfer_format][0] / elapsed / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--channels', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--formats', nargs='+', default=['int8', 'int16'], choices=TRANSFER_FORMATS)
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated query round trip (ms)")
+    parser.add_argument('--no-plot', action='store_true', help="skip the pyqtgraph plot timing")
+    parser.add_argument('--instruments', type=int, nargs='+', help="measure parallel acquisition of N scopes")
+    parser.add_argument('--link-rate', type=float, help="simulated link throughput per instrument (MB/s)")
+    parser.add_argument('--fastframe', type=int, nargs='+', metavar='N', help="measure FastFrame sequences of N frames")
+    args = parser.parse_args()
+
+    if args.fastframe:
+        link_rate = args.link_rate * 1e6 if args.link_rate else None
+        print(f"{'record':>10} {'ch':>3} {'format':>18} {'frames':>7} {'events/s':>10} {'MB/s':>9}")
+        for record in args.records:
+            for channels in args.channels:
+                for transfer_format in args.formats:
+                    for count in args.fastframe:
+                        result = run_fastframe_case(count, record, channels, transfer_format, args.frames,
+                                                    args.latency / 1000, link_rate)
+                        print(f"{record:>10} {channels:>3} {transfer_format:>18} {count:>7} "
+                              f"{result['eps']:>10.1f} {result['mbps']:>9.1f}")
+        return
+
+    if args.instruments:
+        link_rate = args.link_rate * 1e6 if args.link_rate else None
+        print(f"{'record':>10} {'ch':>3} {'format':>18} {'scopes':>7} {'frames/s':>10} {'MB/s':>9}")
+        for record in args.records:
+            for channels in args.channels:
+                for transfer_format in args.formats:
+                    for instruments in args.instruments:
+                        result = run_session_case(instruments, record, channels, transfer_format, args.frames,
+                                                  args.latency / 1000, link_rate)
+                        print(f"{record:>10} {channels:>3} {transfer_format:>18} {instruments:>7} "
+                              f"{result['fps']:>10.1f} {result['mbps']:>9.1f}")
+        return
+
+    plotter = None if args.no_plot else make_plotter()
+
+    print(f"{'record':>10} {'ch':>3} {'format':>18} {'frames/s':>10} {'MB/s':>9} "
+          f"{'scale ms':>9} {'fft ms':>9} {'plot ms':>9}")
+    for record in args.records:
+        for channels in args.channels:
+            for transfer_format in args.formats:
+                result = run_case(record, channels, transfer_format, args.frames, args.latency / 1000, plotter)
+                print(f"{result['record']:>10} {result['channels']:>3} {result['format']:>18} "
+                      f"{result['fps']:>10.1f} {result['mbps']:>9.1f} {result['scale_ms']:>9.2f} {result['fft_ms']:>9.2f} {result['plot_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Headless capture from the command line, without Qt.
+
+    python capture.py SIM::MDO4024C::INSTR --channels 1 2 --frames 1000 --output capture.wfr
+    python capture.py TCPIP::192.168.0.10::INSTR --channels 1 --seconds 10 --output - > samples.bin
+    python capture.py TCPIP::192.168.0.10::INSTR TCPIP::192.168.0.11::INSTR --seconds 10 --output bench.wfr
+    python capture.py TCPIP::192.168.0.10::INSTR --fastframe 1000 --frames 100000 --output events.wfr
+
+With a file name the frames are stored by recorder.WaveformRecorder (raw samples plus a
+``.idx`` index, see recorder.WaveformFile). With ``-`` the raw samples of every frame are
+written to stdout, channel after channel, and their format is described on stderr. Without
+--output nothing is stored and only the throughput is measured.
+
+Several addresses are captured in parallel (see session.SessionManager) with one shared
+time base; each instrument gets its own file (``bench-1.wfr``, ``bench-2.wfr``, ...).
+
+--stats writes per-command and per-stage latency statistics (JSON, or CSV for a ``.csv``
+name; one file per instrument like the recordings).
+
+With --fastframe N the instrument captures N triggers per FastFrame sequence, which are
+transferred together and stored as separate frames stamped with their own trigger time.
+
+--publish NAME also copies every frame into a shared memory ring that other processes read
+with shared_frames.SharedFrameReader (``NAME-1``, ``NAME-2``, ... for several instruments).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from src.errors import OscilloscopeError
+from src.oscilloscope import TRANSFER_FORMATS
+from src.recorder import WaveformRecorder
+from src.session import SessionManager
+from src.shared_frames import SharedFrameWriter
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('addresses', nargs='+', metavar='address',
+                        help="VISA address (SIM::MDO4024C::INSTR for the simulator)")
+    parser.add_argument('--channels', type=int, nargs='+', default=[1], choices=range(1, 5))
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument('--frames', type=int, help="number of frames to capture per instrument (default 10)")
+    length.add_argument('--seconds', type=float, help="capture for this many seconds")
+    parser.add_argument('--format', choices=TRANSFER_FORMATS, default='int8', help="curve transfer format")
+    parser.add_argument('--record-length', type=int, help="set the record length before capturing")
+    parser.add_argument('--output', help="recording file, or - for raw samples on stdout")
+    parser.add_argument('--fastframe', type=int, metavar='N', help="capture N frames per FastFrame sequence")
+    parser.add_argument('--stats', metavar='FILE', help="export latency statistics (.json or .csv)")
+    parser.add_argument('--publish', metavar='NAME', help="publish frames to this shared memory ring")
+    args = parser.parse_args()
+    if args.output == '-' and len(args.addresses) > 1:
+        parser.error("--output - supports a single instrument")
+    if args.fastframe is not None and args.fastframe < 1:
+        parser.error("--fastframe needs at least one frame")
+    return args
+
+
+class StreamSink:
+    """Writes the raw samples of every frame to a binary stream; the format goes to stderr once."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.described = False
+
+    def __call__(self, timestamp, waveforms):
+        if not self.described:
+            for channel, waveform in waveforms.items():
+                print(f"CH{channel}: {waveform.raw.dtype.str} x {len(waveform)} points, "
+                      f"XINCR={waveform.x_increment:g} XZERO={waveform.x_zero:g} "
+                      f"YMULT={waveform.y_mult:g} YOFF={waveform.y_off:g} YZERO={waveform.y_zero:g}",
+                      file=sys.stderr)
+            self.described = True
+        for waveform in waveforms.values():
+            self.stream.write(waveform.raw.data)
+
+
+def capture(scope, channels, frames=None, seconds=None, sink=None, clock=time.time, stop_event=None, fastframe=None):
+    """Acquire until ``frames`` frames or ``seconds`` have passed (or ``stop_event`` is set).
+
+    With ``fastframe`` every acquisition is a FastFrame sequence of up to that many frames,
+    each passed to ``sink`` with the time of its own trigger.
+
+    Returns:
+        frames: number of frames acquired
+        transferred: bytes of samples acquired
+        elapsed: seconds
+    """
+    selected = {channel: channel in channels for channel in range(1, 5)}
+    count = 0
+    transferred = 0
+    start = time.perf_counter()
+    deadline = start + seconds if seconds is not None else None
+    while (count < frames) if deadline is None else (time.perf_counter() < deadline):
+        if stop_event is not None and stop_event.is_set():
+            break
+        timestamp = clock()
+        if fastframe:
+            with scope.instrumentation.stage('acquire'):
+                segments = scope.acquire_segments(selected, fastframe if deadline is not None else min(fastframe, frames - count))
+            trigger_times = segments[channels[0]].trigger_times
+            if sink is not None:
+                for index, offset in enumerate(trigger_times):
+                    sink(timestamp + offset, {channel: segments[channel].frame(index) for channel in channels})
+            count += len(trigger_times)
+            transferred += sum(segment.raw.nbytes for segment in segments.values())
+            continue
+        with scope.instrumentation.stage('acquire'):
+            scope.acquire_data(selected)
+        waveforms = {channel: scope.waveforms[channel] for channel in channels}
+        if sink is not None:
+            sink(timestamp, waveforms)
+        count += 1
+        transferred += sum(waveform.raw.nbytes for waveform in waveforms.values())
+    return count, transferred, time.perf_counter() - start
+
+
+class TeeSink:
+    """Passes every frame to several sinks."""
+
+    def __init__(self, *sinks):
+        self.sinks = [sink for sink in sinks if sink is not None]
+
+    def __call__(self, timestamp, waveforms):
+        for sink in self.sinks:
+            sink(timestamp, waveforms)
+
+
+def output_path(output, index, count):
+    if count == 1:
+        return output
+    base, extension = os.path.splitext(output)
+    return f"{base}-{index}{extension}"
+
+
+def main():
+    args = parse_arguments()
+    channels = sorted(set(args.channels))
+    frames = args.frames if args.frames is not None or args.seconds is not None else 10
+
+    session = SessionManager()
+    recorders = {}
+    publishers = {}
+    results = {}
+    stop_event = threading.Event()
+    try:
+        for address in args.addresses:
+            session.add(address, channels, transfer_format=args.format)
+        session.connect()
+        for instrument in session.instruments.values():
+            print(f"{instrument.name}: {instrument.oscilloscope.scope_idn.strip()}", file=sys.stderr)
+            if args.record_length:
+                instrument.oscilloscope.scope.write(f'HORizontal:RECOrdlength {args.record_length}')
+            instrument.oscilloscope.instrumentation.enabled = bool(args.stats)
+
+        sinks = {name: None for name in session.instruments}
+        if args.output == '-':
+            sinks = {name: StreamSink(sys.stdout.buffer) for name in session.instruments}
+        elif args.output:
+            for index, name in enumerate(session.instruments, 1):
+                recorders[name] = WaveformRecorder(output_path(args.output, index, len(session.instruments)), block=True)
+                recorders[name].start()
+                sinks[name] = recorders[name].record
+        if args.publish:
+            for index, name in enumerate(session.instruments, 1):
+                publishers[name] = SharedFrameWriter(output_path(args.publish, index, len(session.instruments)))
+                sinks[name] = TeeSink(sinks[name], publishers[name].publish)
+
+        def run(instrument):
+            results[instrument.name] = capture(instrument.oscilloscope, channels, frames, args.seconds,
+                                               sinks[instrument.name], session.clock, stop_event, args.fastframe)
+
+        start = time.perf_counter()
+        try:
+            session.map(run)
+        except KeyboardInterrupt:
+            # Let every instrument finish its current frame, then report what was captured
+            stop_event.set()
+            session.executor.shutdown(wait=True)
+            session.executor = None
+        elapsed = max(time.perf_counter() - start, 1e-9)
+
+        for recorder in recorders.values():
+            recorder.stop()
+            if recorder.error is not None:
+                raise recorder.error
+        if args.output == '-':
+            sys.stdout.flush()
+        if args.stats:
+            for index, instrument in enumerate(session.instruments.values(), 1):
+                instrument.oscilloscope.instrumentation.export(output_path(args.stats, index, len(session.instruments)))
+    except (OscilloscopeError, OSError) as e:
+        instrument = getattr(e, 'instrument', None)
+        print(f"capture: {instrument + ': ' if instrument else ''}{e}", file=sys.stderr)
+        return 1
+    finally:
+        stop_event.set()
+        for recorder in recorders.values():
+            recorder.stop()
+        for publisher in publishers.values():
+            publisher.close()
+        session.close()
+
+    total_frames = 0
+    total_bytes = 0
+    for name, (count, transferred, instrument_elapsed) in results.items():
+        instrument_elapsed = max(instrument_elapsed, 1e-9)
+        print(f"{name}: {count} frames of {len(channels)} channel(s) in {instrument_elapsed:.2f} s: "
+              f"{count / instrument_elapsed:.1f} frames/s, {transferred / instrument_elapsed / 1e6:.1f} MB/s",
+              file=sys.stderr)
+        total_frames += count
+        total_bytes += transferred
+    if len(results) > 1:
+        print(f"Total: {total_frames / elapsed:.1f} frames/s, {total_bytes / elapsed / 1e6:.1f} MB/s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,9 +6,9 @@ from PyQt5 import QtWidgets
 if __name__ == "__main__":
     app = QtWidgets.QApplication(sys.argv)
     window = OscilloscopeGUI()
-    window.connection_populate_visa_addresses()
     window.setWindowTitle("Oscilloscope GUI")  # 창 제목 설정
     window.show()
+    window.connection_populate_visa_addresses()  # 주소 검색은 background 에서 진행
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,264 @@
+import threading
+import time
+
+
+class Frame:
+    """One timestamped acquisition of the selected channels."""
+    __slots__ = ('sequence', 'timestamp', 'waveforms', 'math')
+
+    def __init__(self):
+        self.sequence = -1
+        self.timestamp = 0.0
+        self.waveforms = {}  # channel -> Waveform
+        self.math = {}  # math channel name -> (volts, reference Waveform)
+
+    def copy(self):
+        frame = Frame()
+        frame.sequence = self.sequence
+        frame.timestamp = self.timestamp
+        frame.waveforms = self.waveforms
+        frame.math = self.math
+        return frame
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of frames shared by one producer and its consumers.
+
+    All slots are allocated up front. When the ring is full, ``push`` either overwrites the
+    oldest unread frame (DROP_OLDEST) or waits for a consumer to make room (BLOCK).
+    """
+    DROP_OLDEST = 'drop_oldest'
+    BLOCK = 'block'
+
+    def __init__(self, capacity=8, policy=DROP_OLDEST):
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        if policy not in (self.DROP_OLDEST, self.BLOCK):
+            raise ValueError(f"Unknown ring buffer policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.frames = [Frame() for _ in range(capacity)]
+        self.condition = threading.Condition()
+        self.closed = False
+
+        self.head = 0  # sequence number of the next frame to be written
+        self.tail = 0  # sequence number of the oldest unread frame
+        self.acquired = 0
+        self.displayed = 0
+        self.dropped = 0
+
+    def __len__(self):
+        with self.condition:
+            return self.head - self.tail
+
+    def push(self, timestamp, waveforms, math=None):
+        """Store a frame; returns False if the ring was closed while waiting for room."""
+        with self.condition:
+            while self.head - self.tail >= self.capacity:
+                if self.policy == self.DROP_OLDEST:
+                    self.tail += 1
+                    self.dropped += 1
+                    break
+                if self.closed:
+                    return False
+                self.condition.wait()
+            if self.closed:
+                return False
+
+            frame = self.frames[self.head % self.capacity]
+            frame.sequence = self.head
+            frame.timestamp = timestamp
+            frame.waveforms = waveforms
+            frame.math = math if math is not None else {}
+            self.head += 1
+            self.acquired += 1
+            self.condition.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Return the oldest unread frame, waiting up to ``timeout`` seconds for one."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.head > self.tail or self.closed, timeout):
+                return None
+            if self.head == self.tail:
+                return None
+            frame = self.frames[self.tail % self.capacity].copy()
+            self.tail += 1
+            self.displayed += 1
+            self.condition.notify_all()
+            return frame
+
+    def take_latest(self):
+        """Return the newest unread frame (or None) and discard the older unread ones."""
+        with self.condition:
+            if self.head == self.tail:
+                return None
+            self.dropped += self.head - self.tail - 1
+            frame = self.frames[(self.head - 1) % self.capacity].copy()
+            self.tail = self.head
+            self.displayed += 1
+            self.condition.notify_all()
+            return frame
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class AcquisitionEngine:
+    """Pulls frames from an Oscilloscope on a background thread into a FrameRingBuffer.
+
+    The GUI (or any other consumer) reads frames from ``ring`` at its own pace, so slow VISA
+    transfers never block the event loop and plotting never limits the acquisition rate.
+    An optional ``recorder`` (see recorder.WaveformRecorder) and an optional ``publisher``
+    (see shared_frames.SharedFrameWriter) receive every acquired frame, including the ones
+    the display skips, an optional ``math_engine`` (see math_engine.MathEngine) computes the
+    math channels of each frame on this thread, an optional ``measurement_worker``
+    (see measurements.MeasurementWorker) is handed every frame to measure on its own thread,
+    and an optional ``persistence`` (see persistence.PersistenceHistogram) bins every frame
+    for the persistence display. The ``acquire``, ``poll``, ``persistence`` and ``math``
+    stages are timed with the oscilloscope's instrumentation, and ``on_frame`` (if set) is
+    called on this thread after each new frame is in the ring.
+
+    With ``trigger_driven`` the instrument is left running and polled with
+    Oscilloscope.acquire_new_frame(): curves are only transferred after a new trigger, and
+    while none comes the poll interval doubles from ``min_poll_interval`` up to
+    ``max_poll_interval``, or up to an eighth of the average time between triggers if that is
+    shorter, and goes back to the minimum after the next trigger. Otherwise every
+    iteration restarts the acquisition and transfers a frame.
+    """
+
+    def __init__(self, oscilloscope, channels, capacity=8, policy=FrameRingBuffer.DROP_OLDEST, clock=time.time,
+                 trigger_driven=True, min_poll_interval=0.0005, max_poll_interval=0.05):
+        self.oscilloscope = oscilloscope
+        self.clock = clock  # frame timestamps; session.SessionClock shares one between instruments
+        self.channels = channels
+        self.ring = FrameRingBuffer(capacity, policy)
+        self.trigger_driven = trigger_driven
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.polls = 0
+        self.idle_polls = 0  # polls that found no new acquisition
+        self.recorder = None
+        self.publisher = None
+        self.math_engine = None
+        self.measurement_worker = None
+        self.persistence = None
+        self.on_frame = None
+        self.error = None
+        self.start_time = None
+        self.stop_time = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self.error = None
+        self.polls = 0
+        self.idle_polls = 0
+        self._stop_event.clear()
+        self.start_time = time.monotonic()
+        self.stop_time = None
+        self._thread = threading.Thread(target=self._run, name="AcquisitionEngine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        self.ring.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.stop_time = time.monotonic()
+
+    def _run(self):
+        scope = self.oscilloscope
+        instrumentation = scope.instrumentation
+        if self.trigger_driven:
+            try:
+                scope.start_run()
+            except Exception as e:
+                self.error = e
+                self.stop_time = time.monotonic()
+                return
+        poll_interval = self.min_poll_interval
+        trigger_period = None  # moving average of the time between new acquisitions
+        last_trigger = None
+        while not self._stop_event.is_set():
+            selected = dict(self.channels)  # The GUI may toggle channels while we acquire
+            timestamp = self.clock()  # when the acquisition was started, not when its transfer ended
+            start = time.perf_counter()
+            try:
+                if self.trigger_driven:
+                    new = scope.acquire_new_data(selected)
+                else:
+                    scope.acquire_data(selected)
+                    new = True
+            except Exception as e:
+                self.error = e
+                break
+            self.polls += 1
+            if instrumentation.enabled:
+                instrumentation.record('acquire' if new else 'poll', time.perf_counter() - start)
+            if not new:
+                # No trigger since the last frame: wait longer each time, but not so long that a
+                # trigger at the usual rate waits more than an eighth of its period
+                self.idle_polls += 1
+                self._stop_event.wait(poll_interval)
+                limit = self.max_poll_interval if trigger_period is None else min(self.max_poll_interval, trigger_period / 8)
+                poll_interval = max(min(poll_interval * 2, limit), self.min_poll_interval)
+                continue
+            poll_interval = self.min_poll_interval
+            if last_trigger is not None:
+                period = start - last_trigger
+                trigger_period = period if trigger_period is None else 0.8 * trigger_period + 0.2 * period
+            last_trigger = start
+            waveforms = {channel: scope.waveforms[channel] for channel in selected if selected[channel]}
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.record(timestamp, waveforms)
+            publisher = self.publisher
+            if publisher is not None:
+                publisher.publish(timestamp, waveforms)
+            measurement_worker = self.measurement_worker
+            if measurement_worker is not None:
+                measurement_worker.submit(waveforms)
+            persistence = self.persistence
+            if persistence is not None:
+                with instrumentation.stage('persistence'):
+                    persistence.add(waveforms)
+            math = None
+            math_engine = self.math_engine
+            if math_engine:
+                try:
+                    with instrumentation.stage('math'):
+                        math = math_engine.evaluate(waveforms)
+                except Exception as e:
+                    self.error = e
+                    break
+            if not self.ring.push(timestamp, waveforms, math):
+                break
+            on_frame = self.on_frame
+            if on_frame is not None:
+                on_frame()
+        self.stop_time = time.monotonic()
+
+    def statistics(self):
+        """Frame counters and the average acquisition/display rates since start()."""
+        end = self.stop_time if self.stop_time is not None else time.monotonic()
+        elapsed = max(end - self.start_time, 1e-9) if self.start_time is not None else 0.0
+        ring = self.ring
+        return {
+            'acquired': ring.acquired,
+            'displayed': ring.displayed,
+            'dropped': ring.dropped,
+            'polls': self.polls,
+            'idle_polls': self.idle_polls,
+            'elapsed': elapsed,
+            'acquired_fps': ring.acquired / elapsed if elapsed else 0.0,
+            'displayed_fps': ring.displayed / elapsed if elapsed else 0.0,
+        }
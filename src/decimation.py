@@ -0,0 +1,41 @@
+import numpy as np
+
+
+def minmax_envelope(samples, start, stop, bins):
+    """Min/max envelope of ``samples[start:stop]``: at most ``bins`` min/max pairs, 2 * ``bins`` points.
+
+    Every excursion in a bin survives decimation, so glitches stay visible at any zoom
+    level, while the number of points handed to the plot only depends on ``bins``
+    (normally the plot width in pixels). Works on raw integer samples as well as volts.
+
+    Returns:
+        positions: sample indices (float64) of the returned points, in time order
+        values: the samples at those indices (same dtype as ``samples``)
+    """
+    start = max(int(start), 0)
+    stop = min(int(stop), len(samples))
+    bins = max(int(bins), 1)
+    count = stop - start
+    if count <= 0:
+        return np.empty(0, dtype=np.float64), samples[:0]
+    if count <= 2 * bins:
+        return np.arange(start, stop, dtype=np.float64), samples[start:stop]
+
+    step = -(-count // bins)  # rounded up, so there are at most ``bins`` bins
+    whole = count - count % step
+    blocks = samples[start:start + whole].reshape(-1, step)
+    low = blocks.argmin(axis=1)
+    high = blocks.argmax(axis=1)
+    if whole < count:
+        tail = samples[start + whole:stop]
+        low = np.append(low, tail.argmin())
+        high = np.append(high, tail.argmax())
+
+    # Emit each bin's extremes in the order they occur so the line is drawn correctly
+    first = np.minimum(low, high)
+    second = np.maximum(low, high)
+    offsets = start + np.arange(len(first)) * step
+    positions = np.empty(2 * len(first), dtype=np.int64)
+    positions[0::2] = offsets + first
+    positions[1::2] = offsets + second
+    return positions.astype(np.float64), samples[positions]
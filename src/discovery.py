@@ -0,0 +1,75 @@
+import queue
+import re
+import threading
+
+
+# One list_resources() query per interface, fastest first: a TCPIP scan (network broadcast)
+# can take seconds, so it must not hold back instruments on USB or GPIB
+DISCOVERY_QUERIES = ('USB?*::INSTR', 'GPIB?*::INSTR', 'ASRL?*::INSTR', 'TCPIP?*::INSTR')
+
+
+def interface(query):
+    """Interface prefix of a resource expression or address, e.g. ``'TCPIP'``."""
+    return re.match(r'[A-Za-z]*', query).group().upper()
+
+
+class ResourceDiscovery:
+    """Lists VISA resources on a background thread.
+
+    pyvisa is imported and the resource manager created on that thread too, so none of it
+    delays the caller. Addresses are put on ``found`` interface by interface as each query
+    returns. Errors are collected in ``errors`` as ``(query, exception)`` pairs and do not
+    stop the remaining queries; the query is None if the resource manager itself failed.
+
+    Parameters:
+        resource_manager: object with ``list_resources(query)`` (default: pyvisa.ResourceManager())
+        queries: resource expressions, queried in order
+    """
+
+    def __init__(self, resource_manager=None, queries=DISCOVERY_QUERIES):
+        self.resource_manager = resource_manager
+        self.queries = queries
+        self.found = queue.Queue()
+        self.errors = []
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._thread = threading.Thread(target=self._run, name="ResourceDiscovery", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            resource_manager = self.resource_manager
+            if resource_manager is None:
+                import pyvisa
+                resource_manager = pyvisa.ResourceManager()
+        except Exception as e:
+            self.errors.append((None, e))
+            return
+        for query in self.queries:
+            try:
+                for address in resource_manager.list_resources(query):
+                    self.found.put(address)
+            except Exception as e:
+                self.errors.append((query, e))
+
+    def failed_interfaces(self):
+        """Interface prefixes (``'GPIB'``, ...) whose query failed; None if none could be queried."""
+        if any(query is None for query, _ in self.errors):
+            return None
+        return [interface(query) for query, _ in self.errors]
+
+    def take_found(self):
+        """Addresses found since the last call, in discovery order."""
+        addresses = []
+        while True:
+            try:
+                addresses.append(self.found.get_nowait())
+            except queue.Empty:
+                return addresses
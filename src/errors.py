@@ -0,0 +1,26 @@
+class OscilloscopeError(Exception):
+    """Base class of the errors raised by the acquisition library (no GUI involved)."""
+
+
+class InstrumentConnectionError(OscilloscopeError):
+    """Opening or identifying the instrument failed."""
+
+
+class NotConnectedError(OscilloscopeError):
+    """An operation needs a connected instrument."""
+
+
+class ChannelOffError(OscilloscopeError):
+    """A selected channel is not displayed on the instrument, so it has no waveform."""
+
+    def __init__(self, channel):
+        super().__init__(f"Check Channel{channel}")
+        self.channel = channel
+
+
+class AcquisitionError(OscilloscopeError):
+    """A frame could not be acquired or decoded."""
+
+
+class InstrumentIOError(AcquisitionError):
+    """VISA I/O failed (timeout, lost connection, ...) during an acquisition."""
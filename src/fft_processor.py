@@ -1,41 +1,157 @@
+from functools import lru_cache
+
 import numpy as np
-from PyQt5.QtWidgets import QMessageBox
+
+
+# Cosine-sum window coefficients (periodic form, for spectral analysis)
+WINDOW_COEFFICIENTS = {
+    'Rectangular': (1.0,),
+    'Hann': (0.5, 0.5),
+    'Flat-top': (0.21557895, 0.41663158, 0.277263158, 0.083578947, 0.006947368),
+    'Blackman-Harris': (0.35875, 0.48829, 0.14128, 0.01168),
+}
+
+AVERAGING_MODES = ('None', 'Linear', 'Exponential', 'Peak hold')
+
+
+@lru_cache(maxsize=4)
+def make_window(name, length, dtype=np.float32):
+    """길이 length 의 periodic cosine-sum window 를 만듭니다 (캐시됨, read-only)."""
+    phase = np.arange(length, dtype=np.float64) * (2 * np.pi / length)
+    window = np.zeros(length, dtype=np.float64)
+    for k, a in enumerate(WINDOW_COEFFICIENTS[name]):
+        window += (-1) ** k * a * np.cos(k * phase)
+    window = window.astype(dtype)
+    window.setflags(write=False)
+    return window
 
 
 class FFTProcessor:
-    def __init__(self):
+    def __init__(self, window='Hann', averaging='None', average_count=16):
         self.fft_result = None
         self.fft_freq = None
         self.positive_freqs = None
         self.magnitude = None
 
+        self.window = window
+        self.averaging = averaging
+        self.average_count = average_count
+
+        # 현재 설정의 coherent gain / 주파수 축만 보관 (window 자체는 make_window 가 캐시)
+        self.window_gain = (None, None)  # (key, gain)
+        self.freq_axis = (None, None)  # (key, freqs)
+        self.window_buffer = None
+
+        # 프레임 간 평균 (power spectrum 기준)
+        self.average_power = None
+        self.average_frames = 0
+
+    def set_window(self, window):
+        if window not in WINDOW_COEFFICIENTS:
+            raise ValueError(f"Unknown FFT window: {window}")
+        self.window = window
+        self.reset_average()
+
+    def set_averaging(self, averaging, average_count=None):
+        if averaging not in AVERAGING_MODES:
+            raise ValueError(f"Unknown averaging mode: {averaging}")
+        self.averaging = averaging
+        if average_count is not None:
+            self.average_count = max(int(average_count), 1)
+        self.reset_average()
+
+    def reset_average(self):
+        self.average_power = None
+        self.average_frames = 0
+
+    def get_window(self, record, dtype=np.float32):
+        """길이 record 의 window 와 coherent gain(계수 합)을 반환합니다 (캐시됨)."""
+        key = (self.window, record, np.dtype(dtype))
+        window = make_window(*key)
+        if self.window_gain[0] != key:
+            self.window_gain = (key, float(window.sum(dtype=np.float64)))
+        return window, self.window_gain[1]
+
+    def get_frequencies(self, record, time_scale):
+        """rFFT 주파수 축 (Hz, 캐시됨)."""
+        key = (record, time_scale)
+        if self.freq_axis[0] != key:
+            self.freq_axis = (key, np.fft.rfftfreq(record, d=time_scale))
+        return self.freq_axis[1]
+
+    def compute_spectrum(self, wave_data):
+        """단측(single-sided) RMS 진폭 스펙트럼을 계산합니다.
+
+        Parameters:
+            wave_data: 시간 도메인 데이터, 1D (record) 또는 2D (channels x record) 배열.
+                2D 이면 모든 채널을 한 번의 rFFT 호출로 처리합니다.
+        """
+        wave_data = np.asarray(wave_data)
+        record = wave_data.shape[-1]
+        dtype = np.float32 if wave_data.dtype == np.float32 else np.float64
+        window, gain = self.get_window(record, dtype)
+
+        # window 곱은 재사용 버퍼에서 수행
+        if self.window_buffer is None or self.window_buffer.shape != wave_data.shape or self.window_buffer.dtype != dtype:
+            self.window_buffer = np.empty(wave_data.shape, dtype=dtype)
+        np.multiply(wave_data, window, out=self.window_buffer)
+        self.fft_result = np.fft.rfft(self.window_buffer, axis=-1)
+
+        # |X| / sum(w) 는 peak 진폭의 절반; DC 와 Nyquist 를 제외한 bin 은 sqrt(2) 배 해서 RMS 로
+        magnitude = np.abs(self.fft_result)
+        magnitude *= np.sqrt(2) / gain
+        magnitude[..., 0] /= np.sqrt(2)
+        if record % 2 == 0:
+            magnitude[..., -1] /= np.sqrt(2)
+        return magnitude
+
+    def accumulate(self, magnitude):
+        """선택된 averaging 모드로 프레임 간 평균을 적용합니다."""
+        if self.averaging == 'None':
+            return magnitude
+
+        power = magnitude * magnitude
+        if self.average_power is None or self.average_power.shape != power.shape:
+            self.average_power = power
+            self.average_frames = 1
+            return magnitude
+
+        self.average_frames += 1
+        if self.averaging == 'Peak hold':
+            np.maximum(self.average_power, power, out=self.average_power)
+        else:
+            # Linear: 누적 평균 (average_count 이후에는 1/N 가중 지수 평균으로 이어감)
+            if self.averaging == 'Linear':
+                weight = 1.0 / min(self.average_frames, self.average_count)
+            else:
+                weight = 1.0 / self.average_count
+            self.average_power *= 1.0 - weight
+            self.average_power += weight * power
+        return np.sqrt(self.average_power)
+
     def perform_fft(self, time_scale, wave_data, use_dbv):
         """FFT를 수행하고 결과를 저장합니다.
 
         Parameters:
             time_scale: 데이터의 시간 간격
-            wave_data: 시간 도메인에서의 데이터
+            wave_data: 시간 도메인에서의 데이터 (1D 또는 채널별 2D)
             use_dbv: vertical scale 설정
         """
-        try:
-            record = len(wave_data)
+        wave_data = np.asarray(wave_data)
+        if wave_data.shape[-1] < 2:
+            raise ValueError(f"FFT computation failed: {wave_data.shape[-1]} sample(s) is too short")
+        record = wave_data.shape[-1]
 
-            # FFT 계산
-            self.fft_result = np.fft.fft(wave_data)
-            self.fft_freq = np.fft.fftfreq(record, d=time_scale)
-
-            # 양의 주파수와 크기 계산
-            self.positive_freqs = self.fft_freq[:record // 2]
-
-            if use_dbv:
-                # dBV RMS 계산
-                self.magnitude = 20 * np.log10(np.abs(self.fft_result/10)[:record // 2])
-            else:
-                # Linear RMS 계산
-                self.magnitude = np.abs(self.fft_result/10)[:record // 2]  # FFT의 크기
+        self.fft_freq = self.get_frequencies(record, time_scale)
+        self.positive_freqs = self.fft_freq
+        magnitude = self.accumulate(self.compute_spectrum(wave_data))
 
-        except Exception as e:
-            QMessageBox.critical(None, "FFT Error", f"FFT computation failed: {str(e)}")
+        if use_dbv:
+            # dBV RMS 계산
+            self.magnitude = 20 * np.log10(np.maximum(magnitude, 1e-12))
+        else:
+            # Linear RMS 계산
+            self.magnitude = magnitude
 
     def get_results(self):
         """계산된 FFT 결과를 반환합니다."""
@@ -0,0 +1,269 @@
+import csv
+import json
+import math
+import threading
+import time
+from collections import deque
+
+
+# Latency histogram: logarithmic bins from 1 µs to 100 s, plus an underflow and an overflow bin
+HISTOGRAM_MIN_EXPONENT = -6
+HISTOGRAM_MAX_EXPONENT = 2
+HISTOGRAM_BINS_PER_DECADE = 10
+HISTOGRAM_EDGES = tuple(10 ** (HISTOGRAM_MIN_EXPONENT + i / HISTOGRAM_BINS_PER_DECADE)
+                        for i in range((HISTOGRAM_MAX_EXPONENT - HISTOGRAM_MIN_EXPONENT) * HISTOGRAM_BINS_PER_DECADE + 1))
+
+# Pipeline stages, in the order they happen in a frame (see Instrumentation.summary_text)
+STAGES = ('poll', 'acquire', 'transfer', 'decode', 'persistence', 'math', 'scale', 'fft', 'plot')
+
+# Seconds without events after which a rate is reported as 0
+_RATE_TIMEOUT = 2.0
+
+
+def command_name(command):
+    """Statistics key of a SCPI command: its first header without arguments, e.g. ``DATa:SOUrce``."""
+    command = command.strip()
+    header = command.split(';', 1)[0].split(' ', 1)[0].lstrip(':')
+    return header + ';...' if ';' in command else header
+
+
+class LatencyHistogram:
+    """Count, bytes, min/max/mean and a log-binned histogram of one kind of event.
+
+    Updating is O(1) with no allocation; percentiles are read from the histogram (within
+    one bin, about 26 %).
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.bytes = 0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.recent = deque(maxlen=64)  # perf_counter() of the latest events, for the current rate
+
+    def add(self, seconds, nbytes=0, end=None):
+        self.count += 1
+        self.total += seconds
+        self.bytes += nbytes
+        self.minimum = min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+        if seconds > 0:
+            index = int((math.log10(seconds) - HISTOGRAM_MIN_EXPONENT) * HISTOGRAM_BINS_PER_DECADE) + 1
+            index = min(max(index, 0), len(self.counts) - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.recent.append(time.perf_counter() if end is None else end)
+
+    def percentile(self, q):
+        """Upper edge of the bin holding the ``q``-th percentile (0..100), in seconds."""
+        if not self.count:
+            return math.nan
+        target = q / 100 * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target and count:
+                return min(HISTOGRAM_EDGES[min(index, len(HISTOGRAM_EDGES) - 1)], self.maximum)
+        return self.maximum
+
+    def rate(self, now=None):
+        """Events per second over the latest events (0 once they stopped)."""
+        now = time.perf_counter() if now is None else now
+        if len(self.recent) < 2 or now - self.recent[-1] > _RATE_TIMEOUT:
+            return 0.0
+        return (len(self.recent) - 1) / max(self.recent[-1] - self.recent[0], 1e-9)
+
+    def summary(self, now=None):
+        mean = self.total / self.count if self.count else math.nan
+        return {
+            'count': self.count,
+            'bytes': self.bytes,
+            'mean_ms': mean * 1e3,
+            'min_ms': self.minimum * 1e3 if self.count else math.nan,
+            'p50_ms': self.percentile(50) * 1e3,
+            'p95_ms': self.percentile(95) * 1e3,
+            'p99_ms': self.percentile(99) * 1e3,
+            'max_ms': self.maximum * 1e3 if self.count else math.nan,
+            'rate_hz': self.rate(now),
+            'mbps': self.bytes / self.total / 1e6 if self.total else 0.0,
+        }
+
+
+class _Stage:
+    """Times one ``with`` block; the body may set ``nbytes`` to count the data it handled."""
+    __slots__ = ('instrumentation', 'name', 'nbytes', 'start')
+
+    def __init__(self, instrumentation, name, nbytes):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        self.instrumentation.record(self.name, end - self.start, self.nbytes, end)
+        return False
+
+
+class _NullStage:
+    """Shared stand-in for _Stage while instrumentation is disabled; ``nbytes`` is ignored."""
+    __slots__ = ()
+    nbytes = 0
+
+    def __setattr__(self, name, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Instrumentation:
+    """Latency histograms and byte counts of pipeline stages and SCPI commands.
+
+    Stages are timed with ``with instrumentation.stage('plot'):``; SCPI commands through an
+    InstrumentedResource. While disabled, ``stage()`` returns a shared no-op context and the
+    resource proxy only checks ``enabled``, so it can stay in place in production.
+
+    Parameters:
+        enabled: start collecting immediately
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.stages = {}    # stage name -> LatencyHistogram
+        self.commands = {}  # 'write HEADer' / 'query HEADer?' -> LatencyHistogram
+        self.start_time = time.time()
+
+    def stage(self, name, nbytes=0):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, nbytes)
+
+    def record(self, name, seconds, nbytes=0, end=None):
+        self._add(self.stages, name, seconds, nbytes, end)
+
+    def record_command(self, name, seconds, nbytes=0, end=None):
+        self._add(self.commands, name, seconds, nbytes, end)
+
+    def _add(self, table, name, seconds, nbytes, end):
+        with self.lock:
+            histogram = table.get(name)
+            if histogram is None:
+                histogram = table[name] = LatencyHistogram()
+            histogram.add(seconds, nbytes, end)
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.commands = {}
+            self.start_time = time.time()
+
+    def snapshot(self):
+        """``{'stages': {name: summary}, 'commands': {name: summary}}``, see LatencyHistogram.summary()."""
+        now = time.perf_counter()
+        with self.lock:
+            return {
+                'start_time': self.start_time,
+                'stages': {name: histogram.summary(now) for name, histogram in self.stages.items()},
+                'commands': {name: histogram.summary(now) for name, histogram in self.commands.items()},
+            }
+
+    def summary_text(self, commands=3):
+        """A few lines for a live overlay: frame rates, stage latencies and the slowest commands."""
+        snapshot = self.snapshot()
+        stages = snapshot['stages']
+        lines = []
+        rates = [f"{label} {stages[name]['rate_hz']:.1f} fps"
+                 for name, label in (('acquire', 'Acquire'), ('plot', 'Display')) if name in stages]
+        if rates:
+            lines.append("   ".join(rates))
+        for name in STAGES + tuple(sorted(set(stages) - set(STAGES))):
+            if name in stages:
+                stats = stages[name]
+                throughput = f"   {stats['mbps']:.1f} MB/s" if stats['bytes'] else ""
+                lines.append(f"{name:<12}{stats['mean_ms']:8.2f} ms   p95 {stats['p95_ms']:8.2f} ms{throughput}")
+        slowest = sorted(snapshot['commands'].items(),
+                         key=lambda item: item[1]['mean_ms'] * item[1]['count'], reverse=True)[:commands]
+        for name, stats in slowest:
+            lines.append(f"{name:<36}{stats['mean_ms']:8.2f} ms x {stats['count']}")
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        snapshot = self.snapshot()
+        with self.lock:
+            for table, key in ((self.stages, 'stages'), (self.commands, 'commands')):
+                for name, histogram in table.items():
+                    snapshot[key][name]['histogram'] = list(histogram.counts)
+        snapshot['histogram_edges_s'] = list(HISTOGRAM_EDGES)
+        with open(path, 'w') as file:
+            json.dump(snapshot, file, indent=2, default=float)
+
+    def export_csv(self, path):
+        snapshot = self.snapshot()
+        fields = ['count', 'bytes', 'mean_ms', 'min_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'rate_hz', 'mbps']
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['kind', 'name'] + fields)
+            for kind in ('stages', 'commands'):
+                for name, stats in snapshot[kind].items():
+                    writer.writerow([kind[:-1], name] + [stats[field] for field in fields])
+
+    def export(self, path):
+        """Write the statistics as CSV for a ``.csv`` path, JSON otherwise."""
+        if path.lower().endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+
+class InstrumentedResource:
+    """Proxy of a VISA resource that times every ``write`` and ``query``.
+
+    Keys are ``write``/``query`` and the command header (see command_name()). Binary block
+    reads are timed as a whole by the Oscilloscope's ``transfer`` stage. Every other
+    attribute is passed through to the wrapped resource.
+    """
+
+    def __init__(self, resource, instrumentation):
+        object.__setattr__(self, 'resource', resource)
+        object.__setattr__(self, 'instrumentation', instrumentation)
+
+    def __getattr__(self, name):
+        return getattr(self.resource, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resource, name, value)
+
+    def write(self, command):
+        instrumentation = self.instrumentation
+        if not instrumentation.enabled:
+            return self.resource.write(command)
+        start = time.perf_counter()
+        result = self.resource.write(command)
+        end = time.perf_counter()
+        instrumentation.record_command(f'write {command_name(command)}', end - start, len(command), end)
+        return result
+
+    def query(self, command):
+        instrumentation = self.instrumentation
+        if not instrumentation.enabled:
+            return self.resource.query(command)
+        start = time.perf_counter()
+        response = self.resource.query(command)
+        end = time.perf_counter()
+        instrumentation.record_command(f'query {command_name(command)}', end - start,
+                                       len(command) + len(response), end)
+        return response
@@ -0,0 +1,262 @@
+import ast
+
+import numpy as np
+
+
+CHANNEL_NAMES = {f'CH{channel}': channel for channel in range(1, 5)}
+
+_BINARY_OPERATORS = {
+    ast.Add: 'add',
+    ast.Sub: 'subtract',
+    ast.Mult: 'multiply',
+    ast.Div: 'divide',
+}
+
+# name -> (number of constant parameters after the signal argument)
+FUNCTIONS = {
+    'abs': 0,
+    'integrate': 0,
+    'differentiate': 0,
+    'lowpass': 1,
+}
+
+# Instructions that cannot write their result over their input
+_NOT_IN_PLACE = ('differentiate', 'lowpass')
+
+
+class MathExpression:
+    """Math channel compiled from an expression over CH1..CH4.
+
+    The expression is parsed once into a short list of NumPy instructions. Channel volts and
+    intermediate results live in buffers that are allocated for the record length and reused
+    for the following frames, and intermediates are overwritten in place where the operation
+    allows it. Only the result gets a new array per frame (unless ``out`` is given), because it
+    is handed to another thread and must outlive the next evaluation.
+
+    Supported: ``+ - * /``, unary ``-``, numbers and
+        abs(x), integrate(x) (running sum times dt), differentiate(x) (backward difference / dt),
+        lowpass(x, cutoff_hz) (centred moving average with its -3 dB point at ``cutoff_hz``).
+    Samples divided by zero are NaN (drawn as a gap).
+
+    Parameters:
+        text: expression, e.g. ``(CH1-CH2)*CH3`` or ``integrate(CH1*CH2)``
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.instructions = []
+        self.slot_count = 0
+        self.leaves = {}  # channel -> slot holding its volts
+        tree = ast.parse(text.strip(), mode='eval')
+        result = self._compile(tree.body)
+        if result[0] == 'const':
+            raise ValueError("Math expression must use at least one channel (CH1..CH4)")
+        self.result_slot = result[1]
+        self.sources = sorted(self.leaves)
+        self.operations = {instruction[0] for instruction in self.instructions}
+        self.length = None
+
+    # --------------------------------------------------- Compile ------------------------------------------------ #
+    def _new_slot(self):
+        self.slot_count += 1
+        return self.slot_count - 1
+
+    def _is_intermediate(self, operand):
+        return operand[0] == 'slot' and operand[1] not in self.leaves.values()
+
+    def _emit(self, name, operands, params=(), in_place=True):
+        """Add an instruction; its result overwrites an intermediate operand when possible."""
+        target = None
+        if in_place:
+            target = next((operand[1] for operand in operands if self._is_intermediate(operand)), None)
+        if target is None:
+            target = self._new_slot()
+        self.instructions.append((name, target, operands, params))
+        return ('slot', target)
+
+    def _constant(self, node):
+        operand = self._compile(node)
+        if operand[0] != 'const':
+            raise ValueError(f"Expected a number in '{self.text}'")
+        return operand[1]
+
+    def _compile(self, node):
+        """Compile ``node``; returns ('const', value) or ('slot', index)."""
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return ('const', float(node.value))
+
+        if isinstance(node, ast.Name):
+            name = node.id.upper()
+            if name not in CHANNEL_NAMES:
+                raise ValueError(f"Unknown name '{node.id}' (use CH1..CH4)")
+            channel = CHANNEL_NAMES[name]
+            if channel not in self.leaves:
+                self.leaves[channel] = self._new_slot()
+            return ('slot', self.leaves[channel])
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, ast.UAdd):
+                return operand
+            if operand[0] == 'const':
+                return ('const', -operand[1])
+            return self._emit('negative', [operand])
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            name = _BINARY_OPERATORS[type(node.op)]
+            left = self._compile(node.left)
+            right = self._compile(node.right)
+            if name == 'divide' and right[0] == 'const':
+                if right[1] == 0:
+                    raise ValueError(f"Division by zero in '{self.text}'")
+                name, right = 'multiply', ('const', 1.0 / right[1])
+            if left[0] == 'const' and right[0] == 'const':
+                return ('const', float(getattr(np, name)(left[1], right[1])))
+            return self._emit(name, [left, right])
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            name = node.func.id.lower()
+            if name not in FUNCTIONS:
+                raise ValueError(f"Unknown function '{node.func.id}' (available: {', '.join(FUNCTIONS)})")
+            if len(node.args) != 1 + FUNCTIONS[name]:
+                raise ValueError(f"{name}() takes {1 + FUNCTIONS[name]} argument(s)")
+            operand = self._compile(node.args[0])
+            params = tuple(self._constant(arg) for arg in node.args[1:])
+            if operand[0] == 'const':
+                raise ValueError(f"{name}() needs a signal argument")
+            if name == 'lowpass' and params[0] <= 0:
+                raise ValueError("lowpass() cutoff must be positive")
+            return self._emit(name, [operand], params, in_place=name not in _NOT_IN_PLACE)
+
+        raise ValueError(f"Unsupported syntax in math expression '{self.text}'")
+
+    # --------------------------------------------------- Evaluate ----------------------------------------------- #
+    def _allocate(self, length):
+        self.length = length
+        # The result slot is never allocated here, evaluate() swaps in the output array
+        self.buffers = [np.empty(length, dtype=np.float32) if slot != self.result_slot else None
+                        for slot in range(self.slot_count)]
+        self.mask = np.empty(length, dtype=bool) if 'divide' in self.operations else None
+        # float64 running sums: a float32 one drifts over a multi-million-point record
+        self.scratch = (np.empty(length + 1, dtype=np.float64)
+                        if self.operations & {'integrate', 'lowpass'} else None)
+
+    def evaluate(self, waveforms, out=None):
+        """Evaluate the expression for one frame.
+
+        Parameters:
+            waveforms: channel -> Waveform; must contain every channel in ``sources``
+            out: float32 array of the record length receiving the result (default: new array)
+        Returns:
+            float32 array in volts
+        """
+        length = len(waveforms[self.sources[0]])
+        if any(len(waveforms[channel]) != length for channel in self.sources):
+            raise ValueError("Math sources have different record lengths")
+        if length != self.length:
+            self._allocate(length)
+        dt = waveforms[self.sources[0]].x_increment
+
+        buffers = self.buffers
+        output = np.empty(length, dtype=np.float32) if out is None else out
+        buffers[self.result_slot] = output
+        try:
+            for channel, slot in self.leaves.items():
+                waveform = waveforms[channel]
+                waveform.scale(waveform.raw, out=buffers[slot])
+
+            for name, target, operands, params in self.instructions:
+                args = [buffers[value] if kind == 'slot' else value for kind, value in operands]
+                self._execute(name, buffers[target], args, params, dt)
+        finally:
+            buffers[self.result_slot] = None
+        return output
+
+    def _execute(self, name, out, args, params, dt):
+        if name in ('add', 'subtract', 'multiply'):
+            getattr(np, name)(args[0], args[1], out=out)
+        elif name == 'divide':
+            numerator, denominator = args
+            mask = self.mask
+            np.not_equal(denominator, 0, out=mask)
+            np.divide(numerator, denominator, out=out, where=mask)
+            np.logical_not(mask, out=mask)
+            np.copyto(out, np.nan, where=mask)
+        elif name == 'negative':
+            np.negative(args[0], out=out)
+        elif name == 'abs':
+            np.abs(args[0], out=out)
+        elif name == 'integrate':
+            running_sum = self.scratch[:len(out)]
+            np.cumsum(args[0], dtype=np.float64, out=running_sum)
+            np.multiply(running_sum, dt, out=out, casting='same_kind')
+        elif name == 'differentiate':
+            source = args[0]
+            if len(source) < 2:
+                out.fill(0.0)
+                return
+            np.subtract(source[1:], source[:-1], out=out[1:])
+            out[0] = out[1]
+            out *= 1.0 / dt
+        elif name == 'lowpass':
+            self._moving_average(args[0], out, params[0], dt)
+
+    def _moving_average(self, source, out, cutoff, dt):
+        """Centred moving average whose -3 dB frequency is ``cutoff``; edges hold the nearest full window."""
+        length = len(source)
+        width = int(min(max(round(0.443 / (cutoff * dt)), 1), length))
+        if width == 1:
+            np.copyto(out, source)
+            return
+        cumulative = self.scratch
+        cumulative[0] = 0.0
+        np.cumsum(source, out=cumulative[1:])
+        half = width // 2
+        stop = half + length - width + 1
+        np.subtract(cumulative[width:], cumulative[:length - width + 1], out=out[half:stop], casting='same_kind')
+        out[half:stop] *= 1.0 / width
+        out[:half] = out[half]
+        out[stop:] = out[stop - 1]
+
+
+class MathEngine:
+    """Named math channels evaluated once per acquired frame.
+
+    ``set`` and ``remove`` replace the expression table instead of modifying it, so an
+    acquisition thread can evaluate frames while the GUI edits the math channels.
+    """
+
+    def __init__(self):
+        self.expressions = {}
+
+    def __bool__(self):
+        return bool(self.expressions)
+
+    def set(self, name, text):
+        """Compile ``text`` as math channel ``name`` (raises ValueError / SyntaxError)."""
+        current = self.expressions.get(name)
+        if current is not None and current.text == text:
+            return current
+        expression = MathExpression(text)
+        expressions = dict(self.expressions)
+        expressions[name] = expression
+        self.expressions = expressions
+        return expression
+
+    def remove(self, name):
+        if name in self.expressions:
+            expressions = dict(self.expressions)
+            del expressions[name]
+            self.expressions = expressions
+
+    def evaluate(self, waveforms):
+        """Evaluate every math channel whose sources are all in ``waveforms``.
+
+        Returns:
+            name -> (result, reference Waveform giving the time base)
+        """
+        results = {}
+        for name, expression in self.expressions.items():
+            if all(channel in waveforms for channel in expression.sources):
+                results[name] = (expression.evaluate(waveforms), waveforms[expression.sources[0]])
+        return results
@@ -0,0 +1,267 @@
+import queue
+import threading
+
+import numpy as np
+
+
+# (name, unit) of every measurement, in the order of the arrays returned by measure()
+MEASUREMENTS = (
+    ('Vpp', 'V'),
+    ('Mean', 'V'),
+    ('RMS', 'V'),
+    ('Frequency', 'Hz'),
+    ('Period', 's'),
+    ('Rise time', 's'),
+    ('Fall time', 's'),
+    ('Duty cycle', '%'),
+    ('Overshoot', '%'),
+)
+MEASUREMENT_NAMES = tuple(name for name, _ in MEASUREMENTS)
+
+
+def level_histogram(raw):
+    """Number of samples at every digitizer level of ``raw``.
+
+    Returns:
+        counts: counts[i] is the number of samples at level ``first_level + i``
+        first_level: level of counts[0]
+    """
+    dtype = raw.dtype
+    if dtype.kind == 'i':
+        # Flipping the sign bit maps signed levels onto 0..2**bits-1 without a wider copy
+        unsigned = raw.view(dtype.str.replace('i', 'u'))
+        counts = np.bincount(unsigned ^ unsigned.dtype.type(1 << (8 * dtype.itemsize - 1)),
+                             minlength=1 << (8 * dtype.itemsize))
+        return counts, -(1 << (8 * dtype.itemsize - 1))
+    return np.bincount(raw), 0
+
+
+def _edges(raw, low, high):
+    """Transitions between the ``low`` and ``high`` reference levels (hysteresis).
+
+    Samples between the two levels keep the state of the last sample outside them, so
+    noise around a single threshold does not produce extra edges.
+
+    Returns:
+        starts: last sample outside the band before each transition
+        ends: first sample on the other side of the band
+        rising: True for low -> high transitions
+    """
+    state = (raw > high).view(np.int8) - (raw < low).view(np.int8)
+    index = np.arange(len(raw), dtype=np.int32 if len(raw) < 2 ** 31 else np.int64)
+    index[state == 0] = 0
+    np.maximum.accumulate(index, out=index)
+    filled = state[index]
+    ends = np.flatnonzero(filled[1:] != filled[:-1]) + 1
+    # The first change may come from samples before the first sample outside the band
+    ends = ends[filled[ends - 1] != 0]
+    return index[ends - 1], ends, filled[ends] > 0
+
+
+def measure(waveform):
+    """All MEASUREMENTS of one Waveform, as a float64 array (NaN where not measurable).
+
+    Levels follow IEEE 181: top and base are the most common levels in the upper and lower
+    half of the amplitude histogram, and rise/fall times are measured between 10 % and 90 %
+    of top - base. Edges use the 10 %/90 % levels as hysteresis band. Frequency, period and
+    duty cycle use the midpoint between each edge's 10 % and 90 % crossings (interpolated
+    between samples), which is its 50 % crossing only if the edge is linear.
+    """
+    raw = waveform.raw
+    results = np.full(len(MEASUREMENTS), np.nan)
+    if len(raw) == 0:
+        return results
+
+    counts, first_level = level_histogram(raw)
+    occupied = np.flatnonzero(counts)
+    lowest, highest = occupied[0], occupied[-1]
+    levels = np.arange(first_level, first_level + len(counts), dtype=np.float64)
+
+    # Mean / RMS from the histogram: no pass over the samples in floating point
+    total = float(len(raw))
+    mean_level = float(np.dot(counts, levels)) / total
+    center = waveform.y_off - waveform.y_zero / waveform.y_mult  # level of 0 V
+    square_level = float(np.dot(counts, (levels - center) ** 2)) / total
+
+    middle = (lowest + highest) // 2
+    base = lowest + int(np.argmax(counts[lowest:middle + 1]))
+    top = middle + 1 + int(np.argmax(counts[middle + 1:highest + 1])) if highest > middle else highest
+    base += first_level
+    top += first_level
+    amplitude = top - base
+
+    y_mult = waveform.y_mult
+    results[0] = (highest - lowest) * y_mult
+    results[1] = (mean_level - waveform.y_off) * y_mult + waveform.y_zero
+    results[2] = np.sqrt(square_level) * abs(y_mult)
+    if amplitude <= 0:
+        return results
+    results[8] = (highest + first_level - top) / amplitude * 100
+
+    low = base + 0.1 * amplitude
+    high = base + 0.9 * amplitude
+    starts, ends, rising = _edges(raw, low, high)
+    if len(ends) == 0:
+        return results
+
+    # Interpolated crossings: ``low`` just after the start of a rising edge, ``high`` just
+    # before its end (and the other way round for falling edges)
+    start_value = raw[starts].astype(np.float64)
+    after_start = raw[starts + 1].astype(np.float64)
+    before_end = raw[ends - 1].astype(np.float64)
+    end_value = raw[ends].astype(np.float64)
+    first_level_crossing = np.where(rising, low, high)
+    last_level_crossing = np.where(rising, high, low)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_first = starts + (first_level_crossing - start_value) / (after_start - start_value)
+        t_last = ends - 1 + (last_level_crossing - before_end) / (end_value - before_end)
+    transition = (t_last - t_first) * waveform.x_increment
+    # 50 % point of a transition, assuming a linear edge between the 10 % and 90 % crossings
+    t_mid = (t_first + t_last) / 2
+
+    if rising.any():
+        results[5] = transition[rising].mean()
+    if (~rising).any():
+        results[6] = transition[~rising].mean()
+
+    rise_times = t_mid[rising]
+    if len(rise_times) >= 2:
+        period = (rise_times[-1] - rise_times[0]) / (len(rise_times) - 1)
+        results[4] = period * waveform.x_increment
+        results[3] = 1.0 / results[4]
+        # Edges alternate, so every rising edge but the last is followed by a falling edge
+        first_rising = 0 if rising[0] else 1
+        pairs = (len(t_mid) - first_rising) // 2
+        if pairs:
+            high_time = t_mid[first_rising + 1::2][:pairs] - t_mid[first_rising::2][:pairs]
+            results[7] = high_time.mean() / period * 100
+    return results
+
+
+_SI_PREFIXES = ((1e9, 'G'), (1e6, 'M'), (1e3, 'k'), (1.0, ''), (1e-3, 'm'), (1e-6, 'µ'), (1e-9, 'n'), (1e-12, 'p'))
+
+
+def format_value(value, unit):
+    """``value`` with an SI prefix, e.g. ``format_value(1.5e-6, 's') == '1.500 µs'``."""
+    if value is None or not np.isfinite(value):
+        return "---"
+    if unit == '%':
+        return f"{value:.2f} %"
+    magnitude = abs(value)
+    for factor, prefix in _SI_PREFIXES:
+        if magnitude >= factor:
+            return f"{value / factor:.4g} {prefix}{unit}"
+    return f"{value / 1e-12:.4g} p{unit}" if magnitude else f"0 {unit}"
+
+
+class RunningStatistics:
+    """Min/max/mean/standard deviation of a vector of measurements over many frames.
+
+    Welford's update keeps O(1) memory and stays accurate over long runs. NaN values
+    (not measurable in that frame) are skipped per measurement.
+    """
+
+    def __init__(self, size):
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.minimum = np.full(size, np.nan)
+        self.maximum = np.full(size, np.nan)
+
+    def update(self, values):
+        valid = ~np.isnan(values)
+        self.count[valid] += 1
+        delta = np.where(valid, values - self.mean, 0.0)
+        self.mean += delta / np.maximum(self.count, 1)
+        self.m2 += np.where(valid, delta * (values - self.mean), 0.0)
+        self.minimum = np.where(valid, np.fmin(self.minimum, values), self.minimum)
+        self.maximum = np.where(valid, np.fmax(self.maximum, values), self.maximum)
+
+    @property
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+    def summary(self):
+        """name -> dict(count, mean, min, max, std)."""
+        std = self.std
+        return {name: {'count': int(self.count[i]),
+                       'mean': self.mean[i] if self.count[i] else np.nan,
+                       'min': self.minimum[i],
+                       'max': self.maximum[i],
+                       'std': std[i]}
+                for i, name in enumerate(MEASUREMENT_NAMES)}
+
+
+class MeasurementWorker:
+    """Measures submitted frames on its own thread and keeps per-channel statistics.
+
+    ``submit()`` never blocks: if the worker falls behind, frames are counted in ``skipped``
+    so measuring never lowers the acquisition rate.
+    """
+
+    def __init__(self, queue_size=4):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.latest = {}  # channel -> measurement array of the newest measured frame
+        self.statistics = {}  # channel -> RunningStatistics
+        self.measured = 0
+        self.skipped = 0
+        self.error = None
+        self._thread = None
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._thread = threading.Thread(target=self._run, name="MeasurementWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, waveforms):
+        """Queue one frame (channel -> Waveform) for measurement."""
+        try:
+            self.queue.put_nowait(waveforms)
+        except queue.Full:
+            self.skipped += 1
+
+    def reset(self):
+        with self.lock:
+            self.latest = {}
+            self.statistics = {}
+            self.measured = 0
+            self.skipped = 0
+
+    def _run(self):
+        while True:
+            waveforms = self.queue.get()
+            if waveforms is None:
+                break
+            try:
+                results = {channel: measure(waveform) for channel, waveform in waveforms.items()}
+            except Exception as e:
+                self.error = e
+                continue
+            with self.lock:
+                for channel, values in results.items():
+                    if channel not in self.statistics:
+                        self.statistics[channel] = RunningStatistics(len(MEASUREMENTS))
+                    self.statistics[channel].update(values)
+                self.latest.update(results)
+                self.measured += 1
+
+    def snapshot(self, channel):
+        """Newest values and statistics summary of ``channel`` (None before its first frame)."""
+        with self.lock:
+            if channel not in self.statistics:
+                return None
+            return self.latest[channel].copy(), self.statistics[channel].summary()
@@ -1,103 +1,505 @@
+import re
 import numpy as np
-import pyvisa as visa
-from PyQt5.QtWidgets import QMessageBox
 import time
+from datetime import datetime
+from src.errors import (OscilloscopeError, InstrumentConnectionError, NotConnectedError, ChannelOffError,
+                        AcquisitionError, InstrumentIOError)
+from src.instrumentation import Instrumentation, InstrumentedResource
+from src.simulated_scope import SimulatedResourceManager
+from src.waveform import Waveform, SegmentedWaveform
+
+
+# Splits a SCPI response on ';' while leaving quoted strings (e.g. WFID) intact
+_RESPONSE_SPLIT = re.compile(r';(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+# Numeric preamble fields and their types
+_PREAMBLE_TYPES = {
+    'BYT_NR': int,
+    'BIT_NR': int,
+    'NR_PT': int,
+    'PT_OFF': int,
+    'XINCR': float,
+    'XZERO': float,
+    'YMULT': float,
+    'YOFF': float,
+    'YZERO': float,
+}
+
+
+# DATa:ENCdg value for each (signed, byte order)
+_ENCODINGS = {
+    (True, 'MSB'): 'RIBINARY',
+    (True, 'LSB'): 'SRIBINARY',
+    (False, 'MSB'): 'RPBINARY',
+    (False, 'LSB'): 'SRPBINARY',
+}
+
+# Named transfer formats: (bytes per sample, signed, byte order)
+TRANSFER_FORMATS = {
+    'int8': (1, True, 'LSB'),
+    'uint8': (1, False, 'LSB'),
+    'int16': (2, True, 'LSB'),
+    'uint16': (2, False, 'LSB'),
+    'int16-msb': (2, True, 'MSB'),
+    'uint16-msb': (2, False, 'MSB'),
+}
+
+# Consecutive failed multi-channel transfers after which only the per-channel path is used
+MULTI_SOURCE_MAX_FAILURES = 3
+
+
+def _visa():
+    """pyvisa, imported on first use: importing it takes longer than starting the whole GUI."""
+    import pyvisa
+    return pyvisa
+
+
+def parse_preamble(response):
+    """Parse a verbose ``WFMOutpre?`` response into a ``{FIELD: value}`` dict."""
+    preamble = {}
+    for item in _RESPONSE_SPLIT.split(response.strip()):
+        header, _, value = item.strip().partition(' ')
+        key = header.rsplit(':', 1)[-1].upper()
+        value = value.strip().strip('"')
+        preamble[key] = _PREAMBLE_TYPES[key](float(value)) if key in _PREAMBLE_TYPES else value
+    return preamble
+
+
+def parse_timestamps(response):
+    """Parse a FastFrame time stamp list (``"02 Mar 2012 20:42:42.032127000",...``).
+
+    The whole-second part of the stamps is parsed once per distinct second and the
+    fractions are kept apart, so relative times keep nanosecond resolution.
+
+    Returns:
+        first: Unix time of the first stamp (instrument clock)
+        relative: float64 array of every stamp in seconds after the first
+    """
+    stamps = [item.strip().strip('"') for item in response.strip().split(',')]
+    whole = []
+    fraction = np.empty(len(stamps))
+    for index, stamp in enumerate(stamps):
+        clock, _, digits = stamp.partition('.')
+        whole.append(clock)
+        fraction[index] = float(f'0.{digits}') if digits else 0.0
+    unique, inverse = np.unique(whole, return_inverse=True)
+    seconds = np.array([datetime.strptime(clock, '%d %b %Y %H:%M:%S').timestamp() for clock in unique])[inverse]
+    relative = (seconds - seconds[0]) + (fraction - fraction[0])
+    return seconds[0] + fraction[0], relative
 
 
 # Data Acquisition Class
 class Oscilloscope:
-    def __init__(self):
+    """Acquisition from a Tektronix MDO4000-series scope over VISA.
+
+    The class has no GUI dependency: errors are raised as the types in src.errors, so it can
+    be used from scripts, the command line (capture.py) or the GUI alike.
+
+    Parameters:
+        instrumentation: src.instrumentation.Instrumentation timing the SCPI commands and the
+            transfer/decode stages (default: a disabled one of its own)
+    """
+
+    def __init__(self, instrumentation=None):
         super().__init__()
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
         self.scope_idn = None
         self.is_connected = False
-        self.scaled_time = {}
-        self.scaled_wave = {}
+        self.waveforms = {}  # channel -> Waveform of the latest acquisition
         self.is_channel_on = {
             1: False,
             2: False,
             3: False,
             4: False
         }
+        self.channel_state_known = False  # is_channel_on has been read since connecting
+
+        # ACQuire:NUMACq? read with the settings of the latest frame, and the count of the
+        # acquisition whose waveforms were last transferred (see acquire_new_frame())
+        self.acquisition_count = None
+        self.transferred_acquisition = None
+
+        # Cached instrument state; see check_settings() / invalidate_cache()
+        self.record_length = None
+        self.preamble = {}              # channel -> parsed WFMOutpre? response
+        self.io_settings = {}           # command header -> last value written
+        self.settings_signature = None  # last horizontal/vertical settings response
+        self.multi_source_supported = None  # unknown until the first multi-channel acquisition
+        self.multi_source_failures = 0      # consecutive failed multi-channel transfers
 
-    def connect_device(self, visa_address):
+        # Curve transfer format, see set_transfer_format(); io_format is the one in effect for
+        # the frame being acquired
+        self.transfer_width = 1
+        self.transfer_signed = True
+        self.transfer_byte_order = 'LSB'
+        self.io_format = None
+
+    def connect_device(self, visa_address, resource_manager=None):
         try:
-            self.rm = visa.ResourceManager()
-            self.scope = self.rm.open_resource(visa_address)
+            if resource_manager is not None:
+                self.rm = resource_manager
+            elif visa_address.startswith('SIM::'):
+                self.rm = SimulatedResourceManager()
+            else:
+                self.rm = _visa().ResourceManager()
+            self.scope = InstrumentedResource(self.rm.open_resource(visa_address), self.instrumentation)
             self.scope.timeout = 10000  # ms
             self.scope.encoding = 'UTF-8'
             self.scope.read_termination = '\n'
             self.scope.write_termination = None
             self.scope.write('*cls')  # Clear ESR
             self.scope_idn = self.scope.query('*IDN?')  # Identify the oscilloscope
-            print(self.scope_idn)
+            self.invalidate_cache()
+            self.multi_source_supported = None
+            self.multi_source_failures = 0
             self.is_connected = True
         except Exception as e:
-            QMessageBox.critical(None, "Connection Error", f"Failed to connect to oscilloscope: {str(e)}")
+            raise InstrumentConnectionError(f"Failed to connect to oscilloscope: {str(e)}") from e
 
-    def configure_io(self, channel):
-        try:
-            self.scope.write('HEAder 0')
-            self.scope.write('DATa:ENCdg SRIBINARY')
-            self.scope.write(f'DATa:SOUrce CH{channel}')
-            record = int(self.scope.query('HORizontal:RECOrdlength?'))
-            self.scope.write('DATa:START 1')
-            self.scope.write(f'DATa:STOP {record}')
-            self.scope.write('WFMOutpre:BYT_Nr 1')
-        except Exception as e:
-            QMessageBox.critical(None, "Configuration Error", f"Oscilloscope configuration failed: {str(e)}")
+    def invalidate_cache(self):
+        """Forget every cached preamble and DATa setting so they are re-read/re-sent."""
+        self.record_length = None
+        self.preamble.clear()
+        self.io_settings.clear()
+        self.settings_signature = None
+        self.channel_state_known = False
+        self.acquisition_count = None
+        self.transferred_acquisition = None
+
+    def write_setting(self, header, value):
+        """Write ``header value`` only if it differs from what was last sent."""
+        value = str(value)
+        if self.io_settings.get(header) != value:
+            self.scope.write(f'{header} {value}')
+            self.io_settings[header] = value
+
+    def set_transfer_format(self, width=1, signed=True, byte_order='LSB'):
+        """Select the curve sample format.
+
+        Parameters:
+            width: bytes per sample; 1 is enough for Sample mode, 2 keeps the extra bits of
+                Hi Res and Average acquisitions
+            signed: signed (RI) or unsigned/offset binary (RP) samples
+            byte_order: 'LSB' (least significant byte first) or 'MSB', only relevant for 2 bytes
+        """
+        if width not in (1, 2):
+            raise ValueError(f"Unsupported sample width: {width}")
+        if byte_order not in ('LSB', 'MSB'):
+            raise ValueError(f"Unsupported byte order: {byte_order}")
+        self.transfer_width = width
+        self.transfer_signed = signed
+        self.transfer_byte_order = byte_order
+
+    @property
+    def transfer_dtype(self):
+        """NumPy dtype of the samples of the frame being acquired, e.g. ``<i2``."""
+        width, signed, byte_order = self.io_format
+        return np.dtype(f"{'<' if byte_order == 'LSB' else '>'}{'i' if signed else 'u'}{width}")
+
+    def check_settings(self, channels):
+        """Read record length, timebase and vertical settings in one query.
+
+        The preamble cache is dropped whenever the response differs from the previous one,
+        so settings changed from the front panel are picked up on the next frame. The same
+        query also reads the acquisition counter (``acquisition_count``) and which channels are
+        displayed (``is_channel_on``), so neither costs a round trip of its own.
+        """
+        self.write_setting('HEAder', 0)
+        query = (':ACQuire:NUMACq?;:SELect:CH1?;:SELect:CH2?;:SELect:CH3?;:SELect:CH4?;'
+                 ':HORizontal:RECOrdlength?;:HORizontal:SCAle?;:HORizontal:POSition?;:ACQuire:MODe?')
+        for channel in channels:
+            if channels[channel]:
+                query += f';:CH{channel}:SCAle?;:CH{channel}:OFFSet?;:CH{channel}:POSition?'
+        # The format is taken once per frame so set_transfer_format() may be called from
+        # another thread at any time; YMULT/YOFF depend on it, hence it is part of the signature
+        self.io_format = (self.transfer_width, self.transfer_signed, self.transfer_byte_order)
+        response = self.scope.query(query).strip().split(';')
+        self.acquisition_count = int(float(response[0]))
+        self.update_channel_state(response[1:5])
+        signature = f"{';'.join(response[5:])};{self.io_format}"
+        if signature != self.settings_signature:
+            self.preamble.clear()
+            self.settings_signature = signature
+            self.record_length = int(float(signature.split(';', 1)[0]))
+
+    def configure_io(self, *channels):
+        self.write_setting('HEAder', 0)
+        width, signed, byte_order = self.io_format
+        self.write_setting('DATa:ENCdg', _ENCODINGS[(signed, byte_order)])
+        self.write_setting('DATa:SOUrce', ','.join(f'CH{channel}' for channel in channels))
+        self.write_setting('DATa:START', 1)
+        self.write_setting('DATa:STOP', self.record_length)
+        self.write_setting('WFMOutpre:BYT_Nr', width)
+
+    def update_channel_state(self, responses):
+        """Set ``is_channel_on`` from the four ``SELect:CH<x>?`` responses."""
+        for channel, response in zip(range(1, 5), responses):
+            self.is_channel_on[channel] = response.strip() == "1"
+        self.channel_state_known = True
 
     def check_channel_on(self, channels):
+        """Raise ChannelOffError if a selected channel is not displayed on the instrument.
+
+        The cached display state (refreshed by every frame's settings query) is trusted when it
+        shows all selected channels on; otherwise all four are read again with one query.
+        """
+        if self.channel_state_known and all(self.is_channel_on[channel] for channel in channels if channels[channel]):
+            return True
+        self.write_setting('HEAder', 0)
+        self.update_channel_state(self.scope.query(':SELect:CH1?;:SELect:CH2?;:SELect:CH3?;:SELect:CH4?').split(';'))
         for channel in range(1, 5):
-            self.is_channel_on[channel] = self.scope.query(f":SELECT:CH{channel}?") == "1"
             # print(f"{channel}, want {channels[channel]}, real {self.is_channel_on[channel]}") # for debug
-
-            if channels[channel]:
-                if not self.is_channel_on[channel]:
-                    QMessageBox.critical(None, "Acquisition Error", f"Check Channel{channel}")
-                    return False
+            if channels[channel] and not self.is_channel_on[channel]:
+                raise ChannelOffError(channel)
         return True
 
     def acquire_data(self, channels):
+        """Acquire one frame like acquire_frame(), raising only src.errors types."""
+        self._acquire(self.acquire_frame, channels)
+
+    def acquire_new_data(self, channels):
+        """Like acquire_new_frame(), raising only src.errors types."""
+        return self._acquire(self.acquire_new_frame, channels)
+
+    def acquire_segments(self, channels, count, timeout=None):
+        """FastFrame acquisition like acquire_fastframe(), raising only src.errors types."""
+        return self._acquire(self.acquire_fastframe, channels, count, timeout)
+
+    def _acquire(self, acquire, *args):
         if not self.is_connected:
-            QMessageBox.critical(None, "Connection Error", "Data cannot be acquired before the oscilloscope is connected")
-            return  # Return if the oscilloscope is not connected
+            raise NotConnectedError("Data cannot be acquired before the oscilloscope is connected")
         try:
-            # Start acquisition
-            for channel in channels:
-                if channels[channel]:
-                    self.configure_io(channel)
-                    self.scope.write('ACQuire:STAte 1')  # Start acquisition
-                    self.bin_wave = self.scope.query_binary_values('CURve?', datatype='b', container=np.array)
-                    self.retrieve_scaling_factors()
-                    self.scale_data(channel)
-        except visa.VisaIOError as e:
-            QMessageBox.critical(None, "VISA Error", f"Error during acquisition: {str(e)}")
+            return acquire(*args)
+        except _visa().VisaIOError as e:
+            raise InstrumentIOError(f"Error during acquisition: {str(e)}") from e
+        except OscilloscopeError:
+            raise
         except Exception as e:
-            QMessageBox.critical(None, "Acquisition Error", f"Data acquisition failed: {str(e)}")
+            raise AcquisitionError(f"Data acquisition failed: {str(e)}") from e
+
+    def acquire_frame(self, channels):
+        """Acquire one frame of the selected channels into ``waveforms``.
+
+        Errors propagate unchanged (VisaIOError, ValueError, ...); acquire_data() wraps them
+        in the src.errors types.
+        """
+        if self.io_settings.get('HORizontal:FASTframe:STATE') == '1':
+            self.stop_fastframe()
+        self.check_settings(channels)
+        self.transfer_frame(channels, start=True)
+
+    def start_run(self):
+        """Put the instrument in continuous Run mode, as used by acquire_new_frame()."""
+        self.stop_fastframe()
+        self.scope.write('ACQuire:STATE 1')
+        self.transferred_acquisition = None
+
+    def acquire_new_frame(self, channels):
+        """Transfer the latest acquisition only if the instrument has triggered since the last one.
+
+        ``ACQuire:NUMACq?`` comes with the settings query made for every frame anyway, so polling
+        an instrument that has not re-triggered costs one short query and no curve transfer.
+        The acquisition is not restarted (see start_run()). A trigger between that query and
+        ``CURve?`` can make the next call transfer the same waveform once more. Without a
+        multi-source ``CURve?`` the acquisition is stopped while the channels are read one
+        by one, so a frame never mixes waveforms of different triggers.
 
-    def retrieve_scaling_factors(self):
+        Returns:
+            True if new waveforms were transferred into ``waveforms``
+        """
+        self.check_settings(channels)
+        if self.acquisition_count == self.transferred_acquisition:
+            return False
+        self.transfer_frame(channels, start=False)
+        return True
+
+    def transfer_frame(self, channels, start):
+        """Transfer the selected channels after check_settings(); ``start`` writes ACQuire:STAte 1 first."""
+        for channel in range(1, 5):
+            if channels[channel] and not self.is_channel_on[channel]:
+                raise ChannelOffError(channel)
+        self.transferred_acquisition = self.acquisition_count
+        sources = [channel for channel in channels if channels[channel]]
+        if len(sources) > 1 and self.multi_source_supported is not False:
+            if self.acquire_multi_source(sources, start):
+                return
+        if start or len(sources) == 1:
+            self.transfer_channels(sources, start)
+            return
+        # Run mode: hold the latest acquisition while the channels are read one by one, so
+        # they all come from the same trigger
+        self.scope.write('ACQuire:STATE 0')
         try:
-            self.tscale = float(self.scope.query('WFMoutpre:XINcr?'))
-            self.tstart = float(self.scope.query('WFMoutpre:XZEro?'))
-            self.vscale = float(self.scope.query('WFMoutpre:YMUlt?'))
-            self.vzero = float(self.scope.query('WFMoutpre:YZEro?'))
-            self.voff = float(self.scope.query('WFMoutpre:YOFf?'))
-        except visa.VisaIOError as e:
-            QMessageBox.critical(None, "Scaling Error", f"Error retrieving scaling factors: {str(e)}")
-        except Exception as e:
-            QMessageBox.critical(None, "Scaling Error", f"Failed to retrieve scaling factors: {str(e)}")
+            self.transferred_acquisition = int(float(self.scope.query('ACQuire:NUMACq?')))
+            self.transfer_channels(sources, start)
+        finally:
+            self.scope.write('ACQuire:STATE 1')
 
-    def scale_data(self, channel):
+    def transfer_channels(self, sources, start):
+        """Transfer ``sources`` with one ``CURve?`` each (``start`` triggers before each one)."""
+        for channel in sources:
+            self.configure_io(channel)
+            if start:
+                self.scope.write('ACQuire:STAte 1')  # Start acquisition
+            self.scope.write('CURve?')
+            block = self.read_binary_blocks()[0]
+            with self.instrumentation.stage('decode'):
+                raw = np.frombuffer(block, dtype=self.transfer_dtype)
+            preamble = self.preamble.get(channel) or self.retrieve_preamble(channel)
+            self.waveforms[channel] = Waveform(raw, preamble)
+
+    def acquire_multi_source(self, sources, start=True):
+        """Trigger once (with ``start``) and transfer every channel in ``sources`` with a single ``CURve?``.
+
+        Returns False when the instrument does not accept a multi-channel ``DATa:SOUrce``
+        (probed once per connection, see select_sources()) or the transfer failed, so the
+        caller can fall back to the per-channel path. After a failure (I/O error or a reply
+        that is not the expected blocks) the device is cleared so no leftover bytes corrupt
+        the next read; after MULTI_SOURCE_MAX_FAILURES failures
+        in a row the mode is disabled for this connection.
+        """
         try:
-            record = int(self.scope.query('HORizontal:RECOrdlength?'))
-            total_time = self.tscale * record
-            self.tstop = self.tstart + total_time
-            self.scaled_time[channel] = np.linspace(self.tstart*1000, self.tstop*1000, num=record, endpoint=False)
-            unscaled_wave = np.array(self.bin_wave, dtype='double')
-            self.scaled_wave[channel] = (unscaled_wave - self.voff) * self.vscale + self.vzero
-        except Exception as e:
-            QMessageBox.critical(None, "Scaling Error", f"Data scaling failed: {str(e)}")
+            if not self.select_sources(sources):
+                return False
+
+            if start:
+                self.scope.write('ACQuire:STAte 1')  # Start acquisition
+            self.scope.write('CURve?')
+            blocks = self.read_binary_blocks()
+            with self.instrumentation.stage('decode'):
+                raw = self.decode_blocks(blocks, len(sources))
+        except (_visa().VisaIOError, ValueError):  # I/O error, malformed or short reply
+            self.multi_source_failures += 1
+            if self.multi_source_failures >= MULTI_SOURCE_MAX_FAILURES:
+                self.multi_source_supported = False
+            self.scope.clear()
+            self.io_settings.clear()
+            return False
+        self.multi_source_failures = 0
+
+        for index, channel in enumerate(sources):
+            if channel not in self.preamble:
+                self.write_setting('DATa:SOUrce', f'CH{channel}')
+                self.retrieve_preamble(channel)
+            self.waveforms[channel] = Waveform(raw[index], self.preamble[channel])
+        return True
+
+    def select_sources(self, sources):
+        """Configure DATa:SOUrce for all ``sources`` at once; False if the instrument takes only one."""
+        self.configure_io(*sources)
+        if self.multi_source_supported is None:
+            selected = self.scope.query('DATa:SOUrce?').upper()
+            self.multi_source_supported = all(f'CH{channel}' in selected for channel in sources)
+            if not self.multi_source_supported:
+                self.io_settings.pop('DATa:SOUrce', None)
+                return False
+        return self.multi_source_supported
+
+    def acquire_fastframe(self, channels, count, timeout=None):
+        """Capture ``count`` trigger events in FastFrame (segmented) memory and transfer them in bulk.
+
+        One ``ACQuire:STATE 1`` arms a single sequence; the instrument stores every trigger in
+        its own frame with no round trip in between. Each channel then comes back as one binary
+        block (one ``CURve?`` for all channels when supported) that is reshaped, without a copy,
+        into a (frames x samples) array, and the trigger times of all frames are read with one
+        time stamp query. The instrument stays in FastFrame mode until stop_fastframe() or the
+        next acquire_frame().
+
+        Parameters:
+            channels: channel -> bool, like acquire_frame()
+            count: number of frames; the instrument may capture fewer (HORizontal:FASTframe:MAXFRames)
+            timeout: seconds to wait for the sequence to complete (default: the VISA timeout)
+        Returns:
+            channel -> SegmentedWaveform
+        """
+        self.check_settings(channels)
+        sources = [channel for channel in channels if channels[channel]]
+        if not sources:
+            raise ValueError("No channel selected for FastFrame acquisition")
+
+        self.write_setting('HORizontal:FASTframe:STATE', 1)
+        self.write_setting('HORizontal:FASTframe:COUNt', count)
+        self.write_setting('ACQuire:STOPAfter', 'SEQuence')
+        self.scope.write('ACQuire:STATE 1')  # Arm the whole sequence
+        visa_timeout = self.scope.timeout
+        if timeout is not None:
+            self.scope.timeout = timeout * 1000  # ms
+        try:
+            self.scope.query('*OPC?')  # Returns once the last frame has been captured
+        finally:
+            self.scope.timeout = visa_timeout
+        self.write_setting('DATa:FRAMESTARt', 1)
+        self.write_setting('DATa:FRAMESTOP', count)
+
+        if len(sources) > 1 and self.multi_source_supported is not False and self.select_sources(sources):
+            self.scope.write('CURve?')
+            blocks = self.decode_blocks(self.read_binary_blocks(), len(sources))
+        else:
+            blocks = []
+            for channel in sources:
+                self.configure_io(channel)
+                self.scope.write('CURve?')
+                blocks.append(np.frombuffer(self.read_binary_blocks()[0], dtype=self.transfer_dtype))
+
+        # Frames are back to back in each block; the frame count comes from the data in case
+        # the instrument captured fewer than requested
+        with self.instrumentation.stage('decode'):
+            raw = [block.reshape(-1, self.record_length) for block in blocks]
+        frames = len(raw[0])
+        first_trigger, trigger_times = parse_timestamps(
+            self.scope.query(f'HORizontal:FASTframe:TIMEStamp:ALL:CH{sources[0]}? 1,{frames}'))
+
+        segments = {}
+        for channel, samples in zip(sources, raw):
+            if channel not in self.preamble:
+                self.write_setting('DATa:SOUrce', f'CH{channel}')
+                self.retrieve_preamble(channel)
+            segments[channel] = SegmentedWaveform(samples, self.preamble[channel], trigger_times, first_trigger)
+        return segments
+
+    def stop_fastframe(self):
+        """Return to continuous Run/Stop acquisition after acquire_fastframe()."""
+        self.write_setting('HORizontal:FASTframe:STATE', 0)
+        self.write_setting('ACQuire:STOPAfter', 'RUNSTop')
+        self.write_setting('DATa:FRAMESTARt', 1)
+        self.write_setting('DATa:FRAMESTOP', 1)
+
+    def decode_blocks(self, blocks, count):
+        """Return ``count`` raw sample arrays viewing the transfer buffer(s) without copying.
+
+        Handles both one block per source and a single block holding all sources back to back.
+        """
+        dtype = self.transfer_dtype
+        if len(blocks) == count:
+            return [np.frombuffer(block, dtype=dtype) for block in blocks]
+        if len(blocks) == 1:
+            return list(np.frombuffer(blocks[0], dtype=dtype).reshape(count, -1))
+        raise ValueError(f"Expected {count} waveforms, received {len(blocks)} blocks")
+
+    def read_binary_blocks(self):
+        """Read the IEEE-488.2 definite-length block(s) returned by a pending query.
+
+        Instruments that answer a multi-source ``CURve?`` with one block per source separate
+        the blocks with ';'; all of them are read until the terminating newline.
+        """
+        blocks = []
+        with self.instrumentation.stage('transfer') as stage:
+            while True:
+                header = self.scope.read_bytes(2)
+                if header[:1] != b'#' or header[1:2] == b'0':
+                    raise ValueError(f"Unexpected binary block header: {header!r}")
+                length = int(self.scope.read_bytes(int(header[1:2])))
+                blocks.append(self.scope.read_bytes(length))
+                stage.nbytes += length
+                if self.scope.read_bytes(1) != b';':
+                    return blocks
 
+    def retrieve_preamble(self, channel):
+        """Fetch the whole waveform preamble of the current data source with one query."""
+        response = self.scope.query(':HEAder 1;:VERBose 1;:WFMOutpre?')
+        self.scope.write(':HEAder 0')
+        self.preamble[channel] = parse_preamble(response)
+        return self.preamble[channel]
 
     def close(self):
         self.scope.close()
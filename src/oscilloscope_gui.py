@@ -1,21 +1,38 @@
 import sys
-import pyvisa as visa
-from PyQt5 import QtWidgets, uic
+from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
-from src.oscilloscope import Oscilloscope
-from src.fft_processor import FFTProcessor
+from PyQt5.QtGui import QFont
+from src.ui_oscilloscope import Ui_MainWindow
+from src.oscilloscope import Oscilloscope, TRANSFER_FORMATS
+from src.discovery import ResourceDiscovery, interface
+from src.errors import ChannelOffError
+from src.fft_processor import FFTProcessor, WINDOW_COEFFICIENTS, AVERAGING_MODES
+from src.acquisition_engine import AcquisitionEngine
+from src.simulated_scope import SIMULATED_ADDRESS
+from src.decimation import minmax_envelope
+from src.waveform import volts_block
+from src.spectral_analysis import SpectralAnalyzer
+from src.recorder import WaveformRecorder, WaveformFile
+from src.math_engine import MathEngine
+from src.measurements import MeasurementWorker, MEASUREMENTS, format_value
+from src.instrumentation import Instrumentation
+from src.persistence import PersistenceHistogram
+from src.shared_frames import SharedFrameWriter, DEFAULT_NAME
 import pyqtgraph as pg
 import numpy as np
 from datetime import datetime
 
 
-class OscilloscopeGUI(QtWidgets.QMainWindow):
+class OscilloscopeGUI(QtWidgets.QMainWindow, Ui_MainWindow):
+    # Acquisition thread -> GUI thread: a new frame is in the ring buffer
+    frame_ready = pyqtSignal()
+
     def __init__(self):
         super().__init__()
 
-        uic.loadUi('src/oscilloscope.ui', self)
-        # uic.loadUi('test.ui', self)
+        # src/ui_oscilloscope.py 는 src/oscilloscope.ui 에서 생성됨 (.ui 수정 후 pyuic5 로 다시 생성)
+        self.setupUi(self)
 
         self.oscilloscope = None
         self.fft_processor = FFTProcessor()
@@ -25,6 +42,14 @@ class OscilloscopeGUI(QtWidgets.QMainWindow):
         self.is_connected = False
         self.connection_connect_button.clicked.connect(self.connection_connect_device)
 
+        # VISA 주소 검색은 background thread 에서 수행, 찾은 주소는 timer 로 combobox 에 추가
+        # 마지막으로 찾은 주소와 연결한 장비는 QSettings 에 저장되어 다음 실행 시 바로 선택됨
+        self.settings = QSettings("pyoscilloscope", "PyOscilloscope")
+        self.resource_discovery = None
+        self.discovered_addresses = []
+        self.connection_discovery_timer = QTimer()
+        self.connection_discovery_timer.timeout.connect(self.connection_collect_visa_addresses)
+
         # Time Update
         self.time_update_timer = QTimer()
         self.time_update_timer.start(1000)
@@ -49,29 +74,114 @@ class OscilloscopeGUI(QtWidgets.QMainWindow):
         self.control_select_channel_ch4.stateChanged.connect(
             lambda: self.control_channel_select(4, self.control_select_channel_ch4.isChecked()))
 
+        self.control_transfer_format_combobox.addItems(TRANSFER_FORMATS)
+        self.control_transfer_format_combobox.currentTextChanged.connect(self.control_set_transfer_format)
+
         self.control_single.clicked.connect(self.control_single_aquire_data)
         self.control_run_stop.clicked.connect(self.control_run_stop_aquire_data)
 
+        # Run/Stop: the acquisition engine polls the scope for new triggers on its own thread and
+        # fills a ring buffer; frame_ready 가 오면 최신 프레임을 그림 (처리 중에 온 알림은 하나로 합침).
+        # The timer only refreshes the statistics and reports errors while no frame arrives.
+        self.acquisition_engine = None
+        self.frame_notification_pending = False
+        self.frame_ready.connect(self.control_run_stop_aquire_data_loop)
         self.control_run_stop_timer = QTimer()
         self.control_run_stop_timer.timeout.connect(self.control_run_stop_aquire_data_loop)
 
-        # Math
+        # Frame currently on screen (channel -> Waveform)
+        self.frame_waveforms = {}
+
+        # Recording: every acquired frame is appended to disk by a background writer
+        self.recorder = None
+        self.menu_action_record.triggered.connect(self.file_record)
+        self.menu_action_open.triggered.connect(self.file_open_recording)
+
+        # Publishing: every acquired frame is copied into a shared memory ring (DEFAULT_NAME) that
+        # other processes read with shared_frames.SharedFrameReader, without slowing acquisition
+        self.publisher = None
+        self.menu_action_publish.triggered.connect(self.file_publish)
+
+        # Math: 각 함수는 math engine 의 expression 으로 compile 되어 프레임마다 한 번 계산됨
+        # (Run 중에는 acquisition thread 에서, 결과는 frame_math 로 전달)
         self.math_source1 = None
         self.math_source2 = None
+        self.math_engine = MathEngine()
+        self.frame_math = {}
 
         self.math_is_running = {
             'add': False,
             'subtract': False,
             'multiply': False,
-            'divide': False
+            'divide': False,
+            'expression': False
+        }
+        self.math_function_checkbox = {
+            'add': self.math_function_add,
+            'subtract': self.math_function_subtract,
+            'multiply': self.math_function_multiply,
+            'divide': self.math_function_divide,
+            'expression': self.math_function_expression
         }
 
         self.math_function_add.stateChanged.connect(lambda: self.math_operation_function('add', self.math_function_add.isChecked()))
         self.math_function_subtract.stateChanged.connect(lambda: self.math_operation_function('subtract', self.math_function_subtract.isChecked()))
         self.math_function_multiply.stateChanged.connect(lambda: self.math_operation_function('multiply', self.math_function_multiply.isChecked()))
         self.math_function_divide.stateChanged.connect(lambda: self.math_operation_function('divide', self.math_function_divide.isChecked()))
+        self.math_function_expression.stateChanged.connect(lambda: self.math_operation_function('expression', self.math_function_expression.isChecked()))
+        self.math_expression_lineedit.editingFinished.connect(self.math_sources_changed)
+        self.math_channel_select_source1_combobox.currentIndexChanged.connect(self.math_sources_changed)
+        self.math_channel_select_source2_combobox.currentIndexChanged.connect(self.math_sources_changed)
+
+        # Spectrum (FFT) - 그래프 context menu 의 "Power Spectrum (FFT)" 로 전환
+        # Mode: FFT (프레임 전체 한 번), Welch PSD / Spectrogram (segment 단위 chunk 처리)
+        self.fft_mode = False
+        self.fft_use_dbv = False
+        self.spectral_mode = 'FFT'
+        self.spectral_analyzer = SpectralAnalyzer()
+        self.spectral_executor = None  # 처음 Welch / Spectrogram 계산 시 생성 (see plot_spectral_executor)
+        self.spectrogram_image = None
+        self.fft_volts = None  # (channels x record) volts reused by every FFT frame
+        self.math_fft_mode_combobox.addItems(['FFT', 'Welch PSD', 'Spectrogram'])
+        self.math_fft_window_combobox.addItems(WINDOW_COEFFICIENTS)
+        self.math_fft_window_combobox.setCurrentText(self.fft_processor.window)
+        self.math_fft_averaging_combobox.addItems(AVERAGING_MODES)
+        self.math_fft_mode_combobox.currentTextChanged.connect(self.math_fft_settings_changed)
+        self.math_fft_window_combobox.currentTextChanged.connect(self.math_fft_settings_changed)
+        self.math_fft_averaging_combobox.currentTextChanged.connect(self.math_fft_settings_changed)
+        self.math_fft_average_count_spinbox.valueChanged.connect(self.math_fft_settings_changed)
+        self.math_fft_segment_spinbox.valueChanged.connect(self.math_fft_settings_changed)
+        self.math_fft_overlap_spinbox.valueChanged.connect(self.math_fft_settings_changed)
+        self.math_fft_dbv_checkbox.stateChanged.connect(self.math_fft_settings_changed)
+
+        # Measure: 측정은 별도 thread 에서 프레임마다 수행, 표는 timer 로 갱신
+        self.measurement_worker = MeasurementWorker()
+        self.measure_table.setRowCount(len(MEASUREMENTS))
+        self.measure_table.setColumnCount(5)
+        self.measure_table.setHorizontalHeaderLabels(['Value', 'Mean', 'Min', 'Max', 'Std Dev'])
+        self.measure_table.setVerticalHeaderLabels([name for name, _ in MEASUREMENTS])
+        self.measure_enable_checkbox.stateChanged.connect(
+            lambda: self.measure_enable(self.measure_enable_checkbox.isChecked()))
+        self.measure_channel_combobox.currentIndexChanged.connect(self.measure_update_table)
+        self.measure_reset_button.clicked.connect(self.measure_reset)
+        self.measure_update_timer = QTimer()
+        self.measure_update_timer.timeout.connect(self.measure_update_table)
+
+        # Plots: one persistent curve per channel / math function, updated with setData()
+        self.channel_plot = {
+            1: None,
+            2: None,
+            3: None,
+            4: None
+        }
+        self.math_plot = {
+            'add': None,
+            'subtract': None,
+            'multiply': None,
+            'divide': None,
+            'expression': None
+        }
 
-        # Plots
         self.graph = pg.PlotWidget()
         self.graphLayout = QtWidgets.QVBoxLayout(self.graph_widget)
         self.graphLayout.addWidget(self.graph)
@@ -81,6 +191,9 @@ class OscilloscopeGUI(QtWidgets.QMainWindow):
         # PlotWidget의 PlotItem에 접근
         self.plot_item = self.graph.getPlotItem()
 
+        # 확대/이동 시 보이는 구간만 다시 decimation
+        self.plot_item.getViewBox().sigXRangeChanged.connect(self.plot_refresh)
+
         # context menu 감지 연결
         self.plot_item.ctrlMenu.menuAction().triggered.connect(self.onContextMenuEvent)
         self.graph.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -93,44 +206,98 @@ class OscilloscopeGUI(QtWidgets.QMainWindow):
             4: "g"
         }
 
-        self.math_plot = {
-            'add': None,
-            'subtract': None,
-            'multiply': None,
-            'divide': None
-        }
-
         self.math_plot_color_dictionary = {
             'add': 'c',
             'subtract': 'm',
             'multiply': 'k',
-            'divide': 'w'
+            'divide': 'w',
+            'expression': (255, 165, 0)
         }
 
+        # Instrumentation: SCPI command / pipeline stage latency, View > Performance Overlay 로 켜고 끔
+        # (꺼져 있을 때는 거의 비용 없음)
+        self.instrumentation = Instrumentation()
+        self.performance_overlay = pg.TextItem(color=(255, 255, 255), fill=(0, 0, 0, 160), anchor=(0, 0))
+        self.performance_overlay.setParentItem(self.plot_item.getViewBox())  # view 좌표 (pixel) 에 고정
+        self.performance_overlay.setPos(10, 10)
+        self.performance_overlay.textItem.setFont(QFont("Monospace", 8))
+        self.performance_overlay.hide()
+        self.performance_overlay_timer = QTimer()
+        self.performance_overlay_timer.timeout.connect(self.view_update_performance_overlay)
+        self.menu_action_performance_overlay.triggered.connect(self.view_performance_overlay)
+        self.menu_action_export_statistics.triggered.connect(self.view_export_statistics)
+
+        # Persistence: 모든 프레임을 (시간, 전압) histogram 에 누적해 curve 뒤에 image 로 표시
+        # Run 중에는 acquisition thread 에서 누적되고, 화면 갱신 비용은 histogram 해상도에만 비례
+        self.persistence = None
+        self.persistence_image = None
+        self.persistence_decay_time = 1.0  # seconds, unless View > Infinite Persistence
+        self.menu_action_persistence.triggered.connect(self.view_persistence)
+        self.menu_action_persistence_infinite.triggered.connect(self.view_persistence_infinite)
+        self.menu_action_persistence_clear.triggered.connect(self.view_persistence_clear)
+
         # Toolbar
 
     # --------------------------------------------------- Connection ------------------------------------------------- #
     def connection_populate_visa_addresses(self):  # 사용 가능한 VISA 주소 콤보 상자를 채우는 함수
+        """저장된 주소를 바로 표시하고, 새 주소 검색은 background 에서 시작합니다."""
         try:
-            rm = visa.ResourceManager()
-            address = rm.list_resources()
-            self.connection_combobox.addItems(address)
+            self.connection_add_addresses(self.settings.value("connection/addresses", [], type=list))
+            self.connection_add_addresses([SIMULATED_ADDRESS])
+            last_address = self.settings.value("connection/last_address", "", type=str)
+            if last_address:
+                self.connection_add_addresses([last_address])
+                self.connection_combobox.setCurrentText(last_address)
+
+            self.discovered_addresses = []
+            self.resource_discovery = ResourceDiscovery()
+            self.resource_discovery.start()
+            self.connection_discovery_timer.start(100)
         except Exception as e:
             QMessageBox.critical(self, "Address Loading Error", str(e))
 
+    def connection_add_addresses(self, addresses):
+        """Combobox 에 없는 주소만 추가합니다 (현재 선택은 바뀌지 않음)."""
+        for address in addresses:
+            if address and self.connection_combobox.findText(address) < 0:
+                self.connection_combobox.addItem(address)
+
+    def connection_collect_visa_addresses(self):
+        discovery = self.resource_discovery
+        running = discovery.is_running  # 먼저 확인해야 종료 직전에 찾은 주소도 가져옴
+        found = discovery.take_found()
+        self.discovered_addresses.extend(found)
+        self.connection_add_addresses(found)
+        if running:
+            return
+        self.connection_discovery_timer.stop()
+        failed = discovery.failed_interfaces()
+        if failed is not None:
+            # 검색에 실패한 interface 는 이전에 저장된 주소를 유지
+            kept = [address for address in self.settings.value("connection/addresses", [], type=list)
+                    if interface(address) in failed and address not in self.discovered_addresses]
+            self.settings.setValue("connection/addresses", self.discovered_addresses + kept)
+        if discovery.errors:
+            if not self.discovered_addresses:
+                QMessageBox.critical(self, "Address Loading Error", str(discovery.errors[0][1]))
+            else:
+                self.statusbar.showMessage("VISA address search failed for " + ", ".join(
+                    f"{interface(query) if query else 'VISA'} ({e})" for query, e in discovery.errors))
+
     def connection_connect_device(self):  # 선택한 VISA 주소로 연결하는 함수
         try:
             visa_address = self.connection_combobox.currentText()
-            self.oscilloscope = Oscilloscope()
+            self.oscilloscope = Oscilloscope(self.instrumentation)
+            self.control_set_transfer_format(self.control_transfer_format_combobox.currentText())
             self.oscilloscope.connect_device(visa_address)
-            if self.oscilloscope.is_connected:
-                self.control_set_btn_on()
-                self.connection_status_label.setText("Status: Connected")
-                QMessageBox.information(self, "Connection", f"Connected to {self.oscilloscope.scope_idn}")
-                self.connect_device_name_label.setText(f"Device: {self.oscilloscope.scope_idn}")
-            else:
-                self.connection_status_label.setText("Status: Not Connected")
+            print(self.oscilloscope.scope_idn)
+            self.settings.setValue("connection/last_address", visa_address)
+            self.control_set_btn_on()
+            self.connection_status_label.setText("Status: Connected")
+            QMessageBox.information(self, "Connection", f"Connected to {self.oscilloscope.scope_idn}")
+            self.connect_device_name_label.setText(f"Device: {self.oscilloscope.scope_idn}")
         except Exception as e:
+            self.connection_status_label.setText("Status: Not Connected")
             QMessageBox.critical(self, "Connection Error", str(e))
 
     def connection_disconnect_device(self):
@@ -170,69 +337,375 @@ class OscilloscopeGUI(QtWidgets.QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Channel Selecting Error", str(e))
 
+    def control_set_transfer_format(self, name):
+        try:
+            if self.oscilloscope:
+                self.oscilloscope.set_transfer_format(*TRANSFER_FORMATS[name])
+        except Exception as e:
+            QMessageBox.critical(self, "Transfer Format Error", str(e))
+
     def control_single_aquire_data(self):
         try:
             if not self.is_acquiring:
                 if self.oscilloscope:
-                    if self.oscilloscope.check_channel_on(self.channel_selected):
+                    self.oscilloscope.check_channel_on(self.channel_selected)
+                    with self.instrumentation.stage('acquire'):
                         self.oscilloscope.acquire_data(self.channel_selected)
-                        self.plot_time_domain_signals()
-                    else:
-                        return
+                    self.frame_set({channel: self.oscilloscope.waveforms[channel]
+                                    for channel in self.channel_selected if self.channel_selected[channel]})
+                    if self.recorder:
+                        self.recorder.record(datetime.now().timestamp(), self.frame_waveforms)
+                    if self.publisher:
+                        self.publisher.publish(datetime.now().timestamp(), self.frame_waveforms)
+                    if self.measurement_worker.is_running:
+                        self.measurement_worker.submit(self.frame_waveforms)
+                    if self.persistence:
+                        self.persistence.add(self.frame_waveforms)
+                    self.plot_time_domain_signals()
+        except ChannelOffError as e:
+            QMessageBox.critical(self, "Acquisition Error", str(e))
         except Exception as e:
             QMessageBox.critical(self, "Data Aquiration Error", str(e))
 
     def control_run_stop_aquire_data(self):
         try:
             if self.is_acquiring:
-                self.control_run_stop_timer.stop()
-                self.is_acquiring = False
+                self.control_run_stop_stop()
             else:
-                if self.oscilloscope.check_channel_on(self.channel_selected):
-                    self.is_acquiring = True
-                    self.control_run_stop_timer.start(30)
-                else:
-                    return
+                self.oscilloscope.check_channel_on(self.channel_selected)
+                self.is_acquiring = True
+                self.acquisition_engine = AcquisitionEngine(self.oscilloscope, self.channel_selected)
+                self.acquisition_engine.recorder = self.recorder
+                self.acquisition_engine.publisher = self.publisher
+                self.acquisition_engine.math_engine = self.math_engine
+                if self.measurement_worker.is_running:
+                    self.acquisition_engine.measurement_worker = self.measurement_worker
+                self.acquisition_engine.persistence = self.persistence
+                self.acquisition_engine.on_frame = self.control_run_stop_notify
+                self.frame_notification_pending = False
+                self.acquisition_engine.start()
+                self.control_run_stop_timer.start(250)
+        except ChannelOffError as e:
+            QMessageBox.critical(self, "Acquisition Error", str(e))
         except Exception as e:
             QMessageBox.critical(self, "Data Aquiration Error", str(e))
 
+    def control_run_stop_stop(self):
+        self.control_run_stop_timer.stop()
+        self.is_acquiring = False
+        if self.acquisition_engine:
+            self.acquisition_engine.stop()
+            self.control_show_statistics()
+
+    def control_run_stop_notify(self):
+        """Acquisition thread 에서 호출: 아직 처리되지 않은 알림이 있으면 새로 보내지 않음."""
+        if not self.frame_notification_pending:
+            self.frame_notification_pending = True
+            self.frame_ready.emit()
+
     def control_run_stop_aquire_data_loop(self):
+        self.frame_notification_pending = False
         if self.is_acquiring:
             try:
-                self.oscilloscope.acquire_data(self.channel_selected)
-                self.plot_time_domain_signals()
+                engine = self.acquisition_engine
+                if engine.error is not None:
+                    self.control_run_stop_stop()
+                    QMessageBox.critical(self, "Data Aquiration Error", str(engine.error))
+                    return
+
+                frame = engine.ring.take_latest()
+                if frame is not None:
+                    self.frame_set(frame.waveforms, frame.math)
+                    self.plot_time_domain_signals()
+                self.control_show_statistics()
                 # print(self.return_time_stamp())   # for Debug
             except Exception as e:
-                self.is_acquiring = False
+                self.control_run_stop_stop()
                 QMessageBox.critical(self, "Data Aquiration Error", str(e))
 
+    def control_show_statistics(self):
+        stats = self.acquisition_engine.statistics()
+        self.statusbar.showMessage(
+            f"Acquired: {stats['acquired']} ({stats['acquired_fps']:.1f} fps)   "
+            f"Displayed: {stats['displayed']} ({stats['displayed_fps']:.1f} fps)   "
+            f"Dropped: {stats['dropped']}   "
+            f"Polls: {stats['polls']} (no trigger: {stats['idle_polls']})" + self.file_record_status()
+            + self.file_publish_status())
+
+    # ----------------------------------------------------- Measure -------------------------------------------------- #
+    def measure_enable(self, checked):
+        try:
+            if checked:
+                self.measurement_worker.start()
+                self.measure_update_timer.start(250)
+                if self.acquisition_engine and self.acquisition_engine.is_running:
+                    self.acquisition_engine.measurement_worker = self.measurement_worker
+                if self.frame_waveforms and not self.is_acquiring:
+                    self.measurement_worker.submit(self.frame_waveforms)
+            else:
+                if self.acquisition_engine:
+                    self.acquisition_engine.measurement_worker = None
+                self.measurement_worker.stop()
+                self.measure_update_timer.stop()
+                self.measure_update_table()
+        except Exception as e:
+            QMessageBox.critical(self, "Measurement Error", str(e))
+
+    def measure_reset(self):
+        self.measurement_worker.reset()
+        self.measure_update_table()
+
+    def measure_update_table(self):
+        """선택된 채널의 최신 측정값과 누적 통계를 표에 표시합니다."""
+        worker = self.measurement_worker
+        if worker.error is not None:
+            error, worker.error = worker.error, None
+            QMessageBox.critical(self, "Measurement Error", str(error))
+
+        snapshot = worker.snapshot(self.measure_channel_combobox.currentIndex() + 1)
+        for row, (name, unit) in enumerate(MEASUREMENTS):
+            if snapshot is None:
+                cells = [None] * 5
+            else:
+                latest, summary = snapshot
+                stats = summary[name]
+                cells = [latest[row], stats['mean'], stats['min'], stats['max'], stats['std']]
+            for column, value in enumerate(cells):
+                self.measure_table.setItem(row, column, QTableWidgetItem(format_value(value, unit)))
+        self.measure_count_label.setText(f"Frames: {worker.measured}   Skipped: {worker.skipped}")
+
+    def frame_set(self, waveforms, math=None):
+        """화면에 표시할 프레임을 바꿉니다; math 결과가 없으면 여기서 계산합니다."""
+        self.frame_waveforms = waveforms
+        if math is None:
+            with self.instrumentation.stage('math'):
+                math = self.math_engine.evaluate(waveforms)
+        self.frame_math = math
+
+    # ---------------------------------------------------- File ------------------------------------------------------ #
+    def file_record(self, checked):
+        try:
+            if checked:
+                path, _ = QFileDialog.getSaveFileName(self, "Record Waveforms", "", "Waveform recording (*.wfr)")
+                if not path:
+                    self.menu_action_record.setChecked(False)
+                    return
+                self.recorder = WaveformRecorder(path)
+                self.recorder.start()
+                if self.acquisition_engine and self.acquisition_engine.is_running:
+                    self.acquisition_engine.recorder = self.recorder
+            else:
+                self.file_record_stop()
+        except Exception as e:
+            self.recorder = None
+            self.menu_action_record.setChecked(False)
+            QMessageBox.critical(self, "Recording Error", str(e))
+
+    def file_record_stop(self):
+        if self.recorder is None:
+            return
+        if self.acquisition_engine:
+            self.acquisition_engine.recorder = None
+        recorder = self.recorder
+        self.recorder = None
+        recorder.stop()
+        self.menu_action_record.setChecked(False)
+        stats = recorder.statistics()
+        self.statusbar.showMessage(
+            f"Recorded {stats['recorded']} frames ({stats['bytes'] / 1e6:.1f} MB) to {recorder.path}   "
+            f"Dropped: {stats['dropped']}")
+        if recorder.error is not None:
+            QMessageBox.critical(self, "Recording Error", str(recorder.error))
+
+    def file_record_status(self):
+        if self.recorder is None:
+            return ""
+        stats = self.recorder.statistics()
+        return (f"   Recorded: {stats['recorded']} ({stats['mbps']:.1f} MB/s)   "
+                f"Record dropped: {stats['dropped']}")
+
+    def file_publish(self, checked):
+        try:
+            if checked:
+                # int16 samples of all four channels at the current record length fit in a slot
+                record_length = self.oscilloscope.record_length if self.oscilloscope else None
+                self.publisher = SharedFrameWriter(DEFAULT_NAME, slot_size=max(1 << 22, 8 * (record_length or 0)))
+                if self.acquisition_engine and self.acquisition_engine.is_running:
+                    self.acquisition_engine.publisher = self.publisher
+                self.statusbar.showMessage(f"Publishing frames to shared memory '{DEFAULT_NAME}'")
+            else:
+                self.file_publish_stop()
+        except Exception as e:
+            self.publisher = None
+            self.menu_action_publish.setChecked(False)
+            QMessageBox.critical(self, "Publishing Error", str(e))
+
+    def file_publish_stop(self):
+        if self.publisher is None:
+            return
+        if self.acquisition_engine:
+            self.acquisition_engine.publisher = None
+        publisher = self.publisher
+        self.publisher = None
+        publisher.close()
+        self.menu_action_publish.setChecked(False)
+
+    def file_publish_status(self):
+        if self.publisher is None:
+            return ""
+        status = f"   Published: {self.publisher.published}"
+        if self.publisher.oversized:
+            status += f" (too large: {self.publisher.oversized})"
+        return status
+
+    def file_open_recording(self):
+        """Show the last frame of a recording; samples stay memory-mapped."""
+        try:
+            path, _ = QFileDialog.getOpenFileName(self, "Open Recording", "", "Waveform recording (*.wfr)")
+            if not path:
+                return
+            recording = WaveformFile(path)
+            if len(recording) == 0:
+                raise ValueError("The recording is empty")
+            if self.persistence and not self.is_acquiring:
+                for number in range(len(recording)):
+                    self.persistence.add(recording.frame(number)[1])
+            timestamp, waveforms = recording.frame(len(recording) - 1)
+            self.frame_set(waveforms, None if not self.is_acquiring else {})
+            self.plot_time_domain_signals()
+            self.statusbar.showMessage(
+                f"{path}: {len(recording)} frames, last at "
+                f"{datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')}")
+        except Exception as e:
+            QMessageBox.critical(self, "Open Error", str(e))
+
+    # ------------------------------------------------------ View ---------------------------------------------------- #
+    def view_performance_overlay(self, checked):
+        self.instrumentation.enabled = checked
+        if checked:
+            self.instrumentation.reset()
+            self.performance_overlay.setText("Waiting for frames...")
+            self.performance_overlay.show()
+            self.performance_overlay_timer.start(500)
+        else:
+            self.performance_overlay_timer.stop()
+            self.performance_overlay.hide()
+
+    def view_update_performance_overlay(self):
+        self.performance_overlay.setText(self.instrumentation.summary_text() or "Waiting for frames...")
+
+    def view_export_statistics(self):
+        """측정된 latency / byte 통계를 JSON 또는 CSV 로 저장합니다."""
+        try:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Statistics", "",
+                                                  "JSON (*.json);;CSV (*.csv)")
+            if not path:
+                return
+            self.instrumentation.export(path)
+            self.statusbar.showMessage(f"Statistics exported to {path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", str(e))
+
+    def view_persistence(self, checked):
+        """Persistence 를 켜면 이후 수집되는 모든 프레임이 누적됩니다 (끄면 누적된 histogram 도 버림)."""
+        try:
+            if checked:
+                decay_time = None if self.menu_action_persistence_infinite.isChecked() else self.persistence_decay_time
+                self.persistence = PersistenceHistogram(decay_time)
+                if not self.is_acquiring and self.frame_waveforms:
+                    self.persistence.add(self.frame_waveforms)
+            else:
+                self.persistence = None
+            if self.acquisition_engine:
+                self.acquisition_engine.persistence = self.persistence
+            if not self.is_acquiring and not self.fft_mode:
+                self.plot_persistence()
+        except Exception as e:
+            self.menu_action_persistence.setChecked(False)
+            self.persistence = None
+            QMessageBox.critical(self, "Persistence Error", str(e))
+
+    def view_persistence_infinite(self, checked):
+        if self.persistence:
+            self.persistence.decay_time = None if checked else self.persistence_decay_time
+
+    def view_persistence_clear(self):
+        if self.persistence:
+            self.persistence.clear()
+            self.plot_persistence()
+
     # ------------------------------------------------------ Math ---------------------------------------------------- #
     def math_select_channel(self):
         self.math_source1 = self.math_channel_select_source1_combobox.currentIndex() + 1
         self.math_source2 = self.math_channel_select_source2_combobox.currentIndex() + 1
 
+    def math_expression_text(self, operation_type):
+        """Math 함수의 expression (Add/Subtract/Multiply/Divide 는 Source1, Source2 사이의 연산)."""
+        if operation_type == 'expression':
+            return self.math_expression_lineedit.text()
+        operators = {'add': '+', 'subtract': '-', 'multiply': '*', 'divide': '/'}
+        return f"CH{self.math_source1}{operators[operation_type]}CH{self.math_source2}"
+
     def math_operation_function(self, operation_type, checked):
         try:
             if checked:
                 if self.oscilloscope:
-                    self.math_is_running[operation_type] = True
                     self.math_select_channel()
-                    self.plot_math_operation(operation_type)
+                    self.math_engine.set(operation_type, self.math_expression_text(operation_type))
+                    self.math_is_running[operation_type] = True
+                    self.math_update()
                 else:
                     QMessageBox.critical(self, "Math Error", "Data is not collected")
             else:
+                self.math_engine.remove(operation_type)
                 self.plot_math_operation_remove(operation_type)
                 self.math_is_running[operation_type] = False
+                self.frame_math.pop(operation_type, None)
 
         except Exception as e:
+            self.math_function_checkbox[operation_type].setChecked(False)
             QMessageBox.critical(self, "Math Error", str(e))
 
+    def math_sources_changed(self):
+        """Source 선택이나 expression 이 바뀌면 실행 중인 math 함수를 다시 compile 합니다."""
+        for operation_type in self.math_is_running:
+            if self.math_is_running[operation_type]:
+                self.math_operation_function(operation_type, True)
+
+    def math_update(self):
+        """정지 상태에서 현재 프레임의 math 결과를 다시 계산해 그립니다 (Run 중에는 다음 프레임에 반영)."""
+        if not self.is_acquiring and self.frame_waveforms:
+            self.frame_math = self.math_engine.evaluate(self.frame_waveforms)
+            self.plot_time_domain_signals()
+
+    def math_fft_settings_changed(self):
+        try:
+            self.fft_processor.set_window(self.math_fft_window_combobox.currentText())
+            self.fft_processor.set_averaging(self.math_fft_averaging_combobox.currentText(),
+                                             self.math_fft_average_count_spinbox.value())
+            self.fft_use_dbv = self.math_fft_dbv_checkbox.isChecked()
+            self.spectral_analyzer = SpectralAnalyzer(self.math_fft_segment_spinbox.value(),
+                                                      self.math_fft_overlap_spinbox.value() / 100,
+                                                      self.math_fft_window_combobox.currentText())
+
+            mode = self.math_fft_mode_combobox.currentText()
+            if mode != self.spectral_mode:
+                self.spectral_mode = mode
+                if self.fft_mode:
+                    self.plots_clear()
+                    self.plot_item.enableAutoRange()
+            if self.fft_mode:
+                self.plot_set_labels()
+                self.plot_refresh()
+        except Exception as e:
+            QMessageBox.critical(self, "FFT Error", str(e))
+
     # ------------------------------------------------------ Plots --------------------------------------------------- #
 
     def plots_initialize(self):
         """그래프에 기본 제목과 레이블을 설정합니다."""
         # 시간 도메인 그래프 초기 설정
-        self.graph.clear()
+        self.plots_clear()
         self.graph.setTitle("Time Domain Signal")
         self.graph.setLabel('left', 'Voltage (V)')
         self.graph.setLabel('bottom', 'Time (ms)')
@@ -252,48 +725,223 @@ class OscilloscopeGUI(QtWidgets.QMainWindow):
 
         self.result_graphics_view.plot([], [], pen='r')
 '''
+    def plots_clear(self):
+        """그래프의 모든 항목을 지우고 persistent curve 들도 다시 만들도록 초기화합니다."""
+        self.graph.clear()
+        self.spectrogram_image = None
+        self.persistence_image = None
+        for channel in self.channel_plot:
+            self.channel_plot[channel] = None
+        for operation_type in self.math_plot:
+            self.math_plot[operation_type] = None
+
+    def plot_new_curve(self, pen, name):
+        """Persistent curve; pyqtgraph's own FFT transform is disabled since spectra are computed here."""
+        curve = self.graph.plot(pen=pen, name=name)
+        curve.setFftMode(False)
+        return curve
+
+    def plot_channel_curve(self, channel):
+        """선택된 채널의 curve 를 반환하고, 선택 해제된 채널의 curve 는 제거합니다."""
+        if self.channel_selected[channel] and channel in self.frame_waveforms:
+            if self.channel_plot[channel] is None:
+                self.channel_plot[channel] = self.plot_new_curve(self.color_dictionary[channel], f"Channel{channel}")
+            return self.channel_plot[channel]
+        if self.channel_plot[channel] is not None:
+            self.graph.removeItem(self.channel_plot[channel])
+            self.channel_plot[channel] = None
+        return None
+
     def plot_time_domain_signals(self):  # 수집된 신호 플로팅 함수
         try:
-            if self.oscilloscope:
-                self.graph.clear()
-                for channel in self.channel_selected:
-                    if self.channel_selected[channel]:
-                        self.graph.plot(self.oscilloscope.scaled_time[channel],
-                                        self.oscilloscope.scaled_wave[channel],
-                                        pen=self.color_dictionary[channel],
-                                        name=f"Channel{channel}")
-
-                for func in self.math_is_running:
-                    if self.math_is_running[func]:
-                        self.math_operation_function(func, True)
+            with self.instrumentation.stage('plot'):
+                if self.fft_mode:
+                    self.plot_frequency_domain_signals()
+                    return
+                self.plot_persistence()
+                if self.oscilloscope:
+                    for channel in self.channel_selected:
+                        curve = self.plot_channel_curve(channel)
+                        if curve is not None:
+                            self.plot_set_waveform(curve, self.frame_waveforms[channel])
+
+                    for operation_type in self.math_plot:
+                        self.plot_math_operation(operation_type)
 
         except Exception as e:
             QMessageBox.critical(self, "Plotting Error", str(e))
 
+    def plot_persistence(self):
+        """누적된 persistence histogram 을 채널 색으로 curve 들 뒤에 image 로 그립니다."""
+        image, rect = (None, None)
+        if self.persistence:
+            image, rect = self.persistence.image({channel: pg.mkColor(color).getRgb()[:3]
+                                                  for channel, color in self.color_dictionary.items()})
+        if image is None:
+            if self.persistence_image is not None:
+                self.graph.removeItem(self.persistence_image)
+                self.persistence_image = None
+            return
+        if self.persistence_image is None:
+            self.persistence_image = pg.ImageItem(axisOrder='row-major')
+            self.persistence_image.setZValue(-1)
+            self.graph.addItem(self.persistence_image)
+        self.persistence_image.setImage(image, autoLevels=False, levels=(0, 255))
+        x, y, width, height = rect
+        self.persistence_image.setRect(QRectF(x * 1000, y, width * 1000, height))
+
+    def plot_set_labels(self):
+        """현재 모드(시간 / FFT / Welch / Spectrogram)에 맞게 제목과 축 레이블을 설정합니다."""
+        if not self.fft_mode:
+            self.graph.setTitle("Time Domain Signal")
+            self.graph.setLabel('left', 'Voltage (V)')
+            self.graph.setLabel('bottom', 'Time (ms)')
+        elif self.spectral_mode == 'Spectrogram':
+            self.graph.setTitle("Spectrogram")
+            self.graph.setLabel('left', 'Frequency (kHz)')
+            self.graph.setLabel('bottom', 'Time (ms)')
+        elif self.spectral_mode == 'Welch PSD':
+            self.graph.setTitle("Power Spectral Density (Welch)")
+            self.graph.setLabel('left', 'PSD (dB V²/Hz)' if self.fft_use_dbv else 'PSD (V²/Hz)')
+            self.graph.setLabel('bottom', 'Frequency (kHz)')
+        else:
+            self.graph.setTitle("Frequency Domain Signal")
+            self.graph.setLabel('left', 'magnitude (dBV)' if self.fft_use_dbv else 'magnitude (V)')
+            self.graph.setLabel('bottom', 'Frequency (kHz)')
+        self.graph.showGrid(x=True, y=True)
+
+    def plot_frequency_domain_signals(self):  # 선택된 채널의 스펙트럼 플로팅 함수
+        try:
+            if self.spectral_mode == 'Spectrogram':
+                self.plot_spectrogram()
+                return
+
+            curves = {channel: self.plot_channel_curve(channel) for channel in self.channel_selected}
+            channels = [channel for channel in curves if curves[channel] is not None]
+            if not channels:
+                return
+
+            if self.spectral_mode == 'Welch PSD':
+                for channel in channels:
+                    with self.instrumentation.stage('fft'):
+                        freqs, psd = self.spectral_analyzer.welch(self.frame_waveforms[channel], self.plot_spectral_executor())
+                    if self.fft_use_dbv:
+                        psd = 10 * np.log10(np.maximum(psd, 1e-24))
+                    self.plot_set_decimated(curves[channel], psd, 0.0, freqs[1] / 1000)
+                return
+
+            # 모든 채널을 한 번의 rFFT 로 처리 (한 acquisition 의 채널들은 같은 record length)
+            waveforms = [self.frame_waveforms[channel] for channel in channels]
+            time_scale = waveforms[0].x_increment
+            shape = (len(waveforms), len(waveforms[0]))
+            if self.fft_volts is None or self.fft_volts.shape != shape:
+                self.fft_volts = np.empty(shape, dtype=np.float32)
+            with self.instrumentation.stage('scale'):
+                volts = volts_block(waveforms, out=self.fft_volts)
+            with self.instrumentation.stage('fft'):
+                self.fft_processor.perform_fft(time_scale, volts, self.fft_use_dbv)
+            freqs, magnitude = self.fft_processor.get_results()
+
+            freq_increment = freqs[1] / 1000 if len(freqs) > 1 else 0.0  # kHz
+            for index, channel in enumerate(channels):
+                self.plot_set_decimated(curves[channel], magnitude[index], 0.0, freq_increment)
+        except Exception as e:
+            QMessageBox.critical(self, "Plotting Error", str(e))
+
+    def plot_spectrogram(self):
+        """선택된 첫 번째 채널의 spectrogram 을 image 로 표시합니다 (dB V²/Hz)."""
+        channels = [channel for channel in self.channel_selected
+                    if self.channel_selected[channel] and channel in self.frame_waveforms]
+        if not channels:
+            return
+        waveform = self.frame_waveforms[channels[0]]
+        with self.instrumentation.stage('fft'):
+            freqs, times, sxx = self.spectral_analyzer.spectrogram(waveform, self.plot_spectral_executor())
+        image = 10 * np.log10(np.maximum(sxx, 1e-24))
+
+        if self.spectrogram_image is None:
+            self.spectrogram_image = pg.ImageItem()
+            self.spectrogram_image.setColorMap(pg.colormap.get('viridis'))
+            self.graph.addItem(self.spectrogram_image)
+        self.spectrogram_image.setImage(image, autoLevels=True)
+
+        row_duration = (times[1] - times[0]) if len(times) > 1 else waveform.duration
+        self.spectrogram_image.setRect(QRectF(times[0] * 1000, 0.0,
+                                              row_duration * len(times) * 1000,
+                                              (freqs[-1] + freqs[1]) / 1000))
+
+    def plot_spectral_executor(self):
+        if self.spectral_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self.spectral_executor = ThreadPoolExecutor(thread_name_prefix="SpectralAnalysis")
+        return self.spectral_executor
+
+    def plot_refresh(self):
+        """확대/이동 후 현재 프레임을 보이는 구간에 맞게 다시 그립니다 (Run 중에는 다음 프레임이 처리)."""
+        if not self.is_acquiring and self.frame_waveforms:
+            self.plot_time_domain_signals()
+
+    def plot_set_waveform(self, curve, waveform, values=None):
+        """Give ``curve`` a min/max-per-pixel envelope of the visible part of ``waveform``.
+
+        Parameters:
+            curve: persistent PlotDataItem
+            waveform: Waveform providing the samples (or, with ``values``, the time base)
+            values: already scaled samples (math results); default is the raw record, which is
+                decimated first so only the envelope is converted to volts
+        """
+        self.plot_set_decimated(curve, waveform.raw if values is None else values,
+                                waveform.x_zero * 1000, waveform.x_increment * 1000,
+                                waveform.scale if values is None else None)
+
+    def plot_set_decimated(self, curve, values, x_zero, x_increment, convert=None):
+        """Give ``curve`` the min/max envelope of ``values`` over the visible x-range.
+
+        Parameters:
+            x_zero, x_increment: x of the first sample and the sample spacing, in axis units
+            convert: applied to the decimated envelope only (e.g. Waveform.scale)
+        """
+        view_box = self.plot_item.getViewBox()
+        if view_box.autoRangeEnabled()[0] or not x_increment:
+            start, stop = 0, len(values)
+        else:
+            x_min, x_max = view_box.viewRange()[0]
+            start = int(np.floor((x_min - x_zero) / x_increment)) - 1
+            stop = int(np.ceil((x_max - x_zero) / x_increment)) + 2
+        bins = max(int(view_box.width()), 100)
+
+        positions, envelope = minmax_envelope(values, start, stop, bins)
+        if convert:
+            with self.instrumentation.stage('scale'):
+                envelope = convert(envelope)
+        curve.setData(x_zero + positions * x_increment, envelope)
+
     def plot_math_operation(self, operation_type):
+        """math engine 이 계산한 현재 프레임의 결과를 persistent curve 로 그립니다."""
         try:
-            if self.oscilloscope and self.oscilloscope.is_channel_on[self.math_source1] and self.oscilloscope.is_channel_on[self.math_source2]:
-
-                # 연산에 따른 결과 계산
-                operations = {
-                    'add': {'func': np.add, 'label': '+'},
-                    'subtract': {'func': np.subtract, 'label': '-'},
-                    'multiply': {'func': np.multiply, 'label': '*'},
-                    'divide': {'func': np.divide, 'label': '/'}
-                }
-
-                if operation_type in operations:
-                    result_wave = operations[operation_type]['func'](self.oscilloscope.scaled_wave[self.math_source1], self.oscilloscope.scaled_wave[self.math_source2])
-                    plot_name = f"Source{self.math_source1} {operations[operation_type]['label']} Source{self.math_source2}"
-                    time_data = self.oscilloscope.scaled_time[self.math_source1]
-                    self.math_plot[operation_type] = self.graph.plot(time_data, result_wave, pen=self.math_plot_color_dictionary[operation_type], name=plot_name)
+            expression = self.math_engine.expressions.get(operation_type)
+            if expression is None or operation_type not in self.frame_math:
+                self.plot_math_operation_remove(operation_type)
+                return
+
+            result_wave, source = self.frame_math[operation_type]
+            plot_name = expression.text
+            curve = self.math_plot[operation_type]
+            if curve is not None and curve.name() != plot_name:
+                self.plot_math_operation_remove(operation_type)
+                curve = None
+            if curve is None:
+                curve = self.math_plot[operation_type] = self.plot_new_curve(self.math_plot_color_dictionary[operation_type], plot_name)
+            self.plot_set_waveform(curve, source, result_wave)
 
         except Exception as e:
             QMessageBox.critical(self, "Plotting Error", str(e))
 
     def plot_math_operation_remove(self, operation_type):
         try:
-            self.graph.removeItem(self.math_plot[operation_type])
+            if self.math_plot[operation_type] is not None:
+                self.graph.removeItem(self.math_plot[operation_type])
+                self.math_plot[operation_type] = None
         except Exception as e:
             QMessageBox.critical(self, "Plotting Error", str(e))
 
@@ -329,20 +977,27 @@ class OscilloscopeGUI(QtWidgets.QMainWindow):
             QMessageBox.critical(self, "Unexpected Error", f"Plotting Error: {str(e)}")
 
     def on_fft_triggered(self, checked):
-        if checked:
-            self.graph.clear()
-            self.graph.setTitle("Frequency Domain Signal")
-            self.graph.setLabel('left', 'magnitude (V)')
-            self.graph.setLabel('bottom', 'Frequency (kHz)')
-            self.graph.showGrid(x=True, y=True)
-        else:
-            self.graph.clear()
-            self.graph.setTitle("Time Domain Signal")
-            self.graph.setLabel('left', 'Voltage (V)')
-            self.graph.setLabel('bottom', 'Time (ms)')
-            self.graph.showGrid(x=True, y=True)
+        if checked == self.fft_mode:  # toggled 는 context menu 를 열 때마다 다시 연결됨
+            return
+        self.fft_mode = checked
+        self.fft_processor.reset_average()
+        self.plots_clear()
+        self.plot_set_labels()
+        self.plot_item.enableAutoRange()
+        if self.frame_waveforms:
+            self.plot_time_domain_signals()
 
     # ---------------------------------------------------- Tool bar -------------------------------------------------- #
+    def closeEvent(self, event):
+        if self.acquisition_engine:
+            self.acquisition_engine.stop()
+        self.file_record_stop()
+        self.file_publish_stop()
+        self.measurement_worker.stop()
+        if self.spectral_executor is not None:
+            self.spectral_executor.shutdown(wait=False)
+        super().closeEvent(event)
+
     def close(self):
         if self.is_connected:
             self.oscilloscope.close()
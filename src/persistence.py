@@ -0,0 +1,165 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+
+# Samples queued by add() before they are binned without waiting for the display
+_FLUSH_SAMPLES = 1 << 22
+
+
+class PersistenceHistogram:
+    """Digital phosphor: how often every (time, voltage) cell was hit, over many frames.
+
+    Each channel has a ``rows`` x ``columns`` histogram. The time axis spans the record,
+    ``columns`` wide at most; the voltage axis spans the full scale of all channels. Binning
+    a frame is one table lookup per sample (digitizer level -> row, see _level_table), the
+    bin indexes are only queued, and all frames since the last image are counted with one
+    ``np.bincount``. Decay and rendering are done once per image() on the histogram itself,
+    so the cost of a display update depends on its resolution, not on how many frames were
+    accumulated.
+
+    The histogram is cleared when the channels, record length, time base or vertical
+    settings change.
+
+    Parameters:
+        decay_time: seconds for the hits to fade to 1/e; None for infinite persistence
+        columns: maximum number of time bins
+        rows: number of voltage bins
+    """
+
+    def __init__(self, decay_time=1.0, columns=1000, rows=256):
+        self.decay_time = decay_time
+        self.max_columns = columns
+        self.rows = rows
+        self.lock = threading.Lock()
+        self.updates = 0  # histogram changes, so an image rendered from an older one is not kept
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.layout = None
+            self.channels = ()
+            self.histogram = None
+            self.pending = []
+            self.pending_samples = 0
+            self.frames = 0
+            self.rendered = None
+            self.updates += 1
+            self.last_update = time.monotonic()
+
+    def add(self, waveforms):
+        """Bin one frame (channel -> Waveform, or SegmentedWaveform for a FastFrame acquisition)."""
+        if not waveforms:
+            return
+        with self.lock:
+            first = next(iter(waveforms.values()))
+            layout = (tuple(waveforms), len(first), first.x_zero, first.x_increment,
+                      tuple((w.raw.dtype.str, w.y_mult, w.y_off, w.y_zero) for w in waveforms.values()))
+            if layout != self.layout:
+                self._set_layout(layout, waveforms)
+            for slot, waveform in enumerate(waveforms.values()):
+                raw = waveform.raw
+                levels = raw.view(raw.dtype.str.replace('i', 'u')) if raw.dtype.kind == 'i' else raw
+                bins = np.take(self.level_tables[slot], levels)
+                bins += self.column_offsets[slot]
+                self.pending.append(bins.ravel())
+                self.pending_samples += bins.size
+            self.frames += first.raw.shape[0] if first.raw.ndim > 1 else 1
+            if self.pending_samples >= _FLUSH_SAMPLES:
+                self._flush()
+
+    def _set_layout(self, layout, waveforms):
+        """Size the histogram for this frame's channels and settings, and build its lookup tables."""
+        channels, points = layout[0], layout[1]
+        self.layout = layout
+        self.channels = channels
+        self.columns = max(min(self.max_columns, points), 1)
+        self.histogram = np.zeros((len(channels), self.rows, self.columns), dtype=np.float32)
+        self.pending = []
+        self.pending_samples = 0
+        self.frames = 0
+        self.rendered = None
+        self.updates += 1
+
+        # Common voltage range: the full scale of every channel
+        volts = [self._level_volts(waveform) for waveform in waveforms.values()]
+        self.y_min = min(v.min() for v in volts)
+        self.y_max = max(v.max() for v in volts)
+        if self.y_max <= self.y_min:
+            self.y_max = self.y_min + 1.0
+        self.x_zero = layout[2]
+        self.x_span = layout[3] * points
+
+        columns = (np.arange(points, dtype=np.int64) * self.columns // points).astype(np.int32)
+        size = self.rows * self.columns
+        self.level_tables = [self._level_table(v) for v in volts]
+        self.column_offsets = [columns + slot * size for slot in range(len(channels))]
+        self.last_update = time.monotonic()
+
+    @staticmethod
+    def _level_volts(waveform):
+        """Volts of every digitizer level, indexed by the level's unsigned bit pattern."""
+        levels = np.arange(1 << (8 * waveform.raw.dtype.itemsize), dtype=np.int64)
+        if waveform.raw.dtype.kind == 'i':
+            levels[len(levels) // 2:] -= len(levels)  # two's complement
+        return (levels - waveform.y_off) * waveform.y_mult + waveform.y_zero
+
+    def _level_table(self, volts):
+        """Histogram row (times ``columns``) of every level, from the levels' ``volts``."""
+        rows = np.floor((volts - self.y_min) / (self.y_max - self.y_min) * self.rows).astype(np.int32)
+        np.clip(rows, 0, self.rows - 1, out=rows)
+        return rows * self.columns
+
+    def _flush(self):
+        """Decay the histogram for the time since the last flush and count the queued bins.
+
+        Without new frames nothing changes, so a stopped display keeps its persistence.
+        """
+        if self.pending:
+            now = time.monotonic()
+            if self.decay_time is not None:
+                self.histogram *= math.exp(-(now - self.last_update) / self.decay_time)
+            self.last_update = now
+            self.rendered = None
+            self.updates += 1
+            bins = np.concatenate(self.pending) if len(self.pending) > 1 else self.pending[0]
+            counts = np.bincount(bins, minlength=self.histogram.size)
+            self.histogram += counts.reshape(self.histogram.shape)
+            self.pending = []
+            self.pending_samples = 0
+
+    def image(self, colors):
+        """RGBA image (rows x columns x 4, uint8) of the channels' hits, row 0 at ``y_min``.
+
+        Intensity is logarithmic in the number of hits, relative to the most hit cell of
+        each channel, so a glitch seen once stays visible next to a trace seen thousands of
+        times. Channels are added in their ``colors`` (channel -> (r, g, b)). The image is
+        rendered again only after new frames were counted.
+
+        Returns:
+            image: None before the first frame
+            rect: (x, y, width, height) covered by the image, in seconds and volts
+        """
+        with self.lock:
+            if self.histogram is None:
+                return None, None
+            self._flush()
+            if self.rendered is not None:
+                return self.rendered
+            histogram = np.log1p(self.histogram)
+            channels = self.channels
+            updates = self.updates
+            rect = (self.x_zero, self.y_min, self.x_span, self.y_max - self.y_min)
+        peak = histogram.reshape(len(channels), -1).max(axis=1)
+        histogram /= np.maximum(peak, 1e-12)[:, None, None]
+        palette = np.array([colors[channel] for channel in channels], dtype=np.float32) / 255
+        rgb = np.tensordot(histogram, palette, axes=([0], [0]))  # rows x columns x 3
+        image = np.empty(histogram.shape[1:] + (4,), dtype=np.uint8)
+        np.multiply(np.minimum(rgb, 1.0), 255, out=image[..., :3], casting='unsafe')
+        np.multiply(histogram.max(axis=0), 255, out=image[..., 3], casting='unsafe')
+        with self.lock:
+            if self.updates == updates:
+                self.rendered = image, rect
+        return image, rect
@@ -0,0 +1,222 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from src.waveform import Waveform
+
+
+FILE_MAGIC = b'PYOSCREC'
+FILE_VERSION = 1
+
+# Fixed-size file header at the start of the data file
+FILE_HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('header_size', '<u4'),
+    ('created', '<f8'),
+    ('reserved', 'V40'),
+])
+
+# One entry per recorded channel waveform, appended to the ``.idx`` file after its samples
+INDEX_DTYPE = np.dtype([
+    ('sequence', '<u8'),
+    ('timestamp', '<f8'),
+    ('channel', '<u4'),
+    ('dtype', 'S4'),
+    ('points', '<u8'),
+    ('data_offset', '<u8'),
+    ('x_increment', '<f8'),
+    ('x_zero', '<f8'),
+    ('y_mult', '<f8'),
+    ('y_off', '<f8'),
+    ('y_zero', '<f8'),
+])
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+class WaveformRecorder:
+    """Append-only recorder of raw waveforms.
+
+    The data file is a fixed FILE_HEADER_DTYPE header followed by raw sample blocks in the
+    transfer format (int8/int16, never float). A sidecar ``<path>.idx`` holds one INDEX_DTYPE
+    entry per channel waveform (sequence, timestamp, preamble, offset). The samples of a
+    frame are flushed before its entries are written, so even if the process is killed the
+    index never points past the data; after a crash of the whole system the file system
+    may still lose data the index refers to, and WaveformFile ignores such frames.
+
+    ``record()`` only queues the frame; a background thread does the disk I/O so
+    acquisition is never stalled. When the queue is full the frame is counted in
+    ``dropped`` instead of blocking, and leaves a gap in the sequence numbers, unless
+    ``block`` is set (headless capture, where every frame must reach the disk).
+    """
+
+    def __init__(self, path, queue_size=64, block=False):
+        self.path = path
+        self.block = block
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.sequence = 0
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.error = None
+        self.start_time = None
+        self._thread = None
+
+    @property
+    def is_recording(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self.data_file = open(self.path, 'wb', buffering=1 << 20)
+        self.index_file = open(index_path(self.path), 'wb', buffering=1 << 16)
+        header = np.zeros(1, dtype=FILE_HEADER_DTYPE)
+        header['magic'] = FILE_MAGIC
+        header['version'] = FILE_VERSION
+        header['header_size'] = FILE_HEADER_DTYPE.itemsize
+        header['created'] = time.time()
+        self.data_file.write(header.tobytes())
+        self.offset = FILE_HEADER_DTYPE.itemsize
+
+        self.start_time = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="WaveformRecorder", daemon=True)
+        self._thread.start()
+
+    def record(self, timestamp, waveforms):
+        """Queue one frame (channel -> Waveform) for writing; only blocks with ``block``."""
+        item = (self.sequence, timestamp, waveforms)
+        try:
+            if self.block:
+                while True:
+                    if self.error is not None:
+                        raise self.error  # the writer has stopped, waiting for room would never end
+                    try:
+                        self.queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+            else:
+                self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+        self.sequence += 1
+
+    def stop(self):
+        """Write everything still queued, then close the files."""
+        if self._thread is None:
+            return
+        while self._thread.is_alive():
+            # A writer that stopped on an error no longer drains the queue, so never block here
+            try:
+                self.queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                self._write_frame(*item)
+        except Exception as e:
+            self.error = e
+        finally:
+            for file in (self.data_file, self.index_file):
+                try:
+                    file.close()
+                except Exception as e:
+                    if self.error is None:
+                        self.error = e
+
+    def _write_frame(self, sequence, timestamp, waveforms):
+        entries = np.zeros(len(waveforms), dtype=INDEX_DTYPE)
+        for entry, (channel, waveform) in zip(entries, waveforms.items()):
+            raw = np.ascontiguousarray(waveform.raw)
+            self.data_file.write(raw.data)
+            entry['sequence'] = sequence
+            entry['timestamp'] = timestamp
+            entry['channel'] = channel
+            entry['dtype'] = raw.dtype.str.encode()
+            entry['points'] = len(raw)
+            entry['data_offset'] = self.offset
+            entry['x_increment'] = waveform.x_increment
+            entry['x_zero'] = waveform.x_zero
+            entry['y_mult'] = waveform.y_mult
+            entry['y_off'] = waveform.y_off
+            entry['y_zero'] = waveform.y_zero
+            self.offset += raw.nbytes
+            self.bytes_written += raw.nbytes
+        # The two files are buffered separately: the samples must reach the OS first
+        self.data_file.flush()
+        self.index_file.write(entries.tobytes())
+        self.recorded += 1
+
+    def statistics(self):
+        elapsed = time.monotonic() - self.start_time if self.start_time is not None else 0.0
+        return {
+            'recorded': self.recorded,
+            'dropped': self.dropped,
+            'bytes': self.bytes_written,
+            'mbps': self.bytes_written / elapsed / 1e6 if elapsed else 0.0,
+        }
+
+
+class WaveformFile:
+    """Read a file written by WaveformRecorder; samples are ``np.memmap`` views, not copies."""
+
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=FILE_HEADER_DTYPE, count=1)
+        if len(header) == 0 or header['magic'][0] != FILE_MAGIC:
+            raise ValueError(f"{path} is not a waveform recording")
+        if header['version'][0] > FILE_VERSION:
+            raise ValueError(f"Unsupported recording version {header['version'][0]}")
+        self.created = float(header['created'][0])
+
+        # A partially written last entry (recording interrupted) is ignored
+        size = os.path.getsize(index_path(path)) // INDEX_DTYPE.itemsize
+        self.index = np.fromfile(index_path(path), dtype=INDEX_DTYPE, count=size)
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+
+        # So are frames whose samples did not all reach the data file (system crash)
+        dtypes, inverse = np.unique(self.index['dtype'], return_inverse=True)
+        itemsize = np.array([np.dtype(dtype.decode()).itemsize for dtype in dtypes], dtype=np.uint64)[inverse]
+        complete = self.index['data_offset'] + self.index['points'] * itemsize <= len(self.data)
+        if not complete.all():
+            first = int(np.argmin(complete))
+            self.index = self.index[:first][self.index['sequence'][:first] != self.index['sequence'][first]]
+        self.sequences, self.frame_starts = np.unique(self.index['sequence'], return_index=True)
+
+    def __len__(self):
+        return len(self.sequences)
+
+    def waveform(self, entry):
+        """Waveform of one index entry, its raw samples viewing the memory map."""
+        dtype = np.dtype(entry['dtype'].decode())
+        start = int(entry['data_offset'])
+        raw = self.data[start:start + int(entry['points']) * dtype.itemsize].view(dtype)
+        preamble = {
+            'XINCR': float(entry['x_increment']),
+            'XZERO': float(entry['x_zero']),
+            'YMULT': float(entry['y_mult']),
+            'YOFF': float(entry['y_off']),
+            'YZERO': float(entry['y_zero']),
+            'NR_PT': int(entry['points']),
+        }
+        return Waveform(raw, preamble)
+
+    def frame(self, number):
+        """``(timestamp, {channel: Waveform})`` of the ``number``-th recorded frame."""
+        number = range(len(self))[number]  # entries of a frame are consecutive in the index
+        stop = self.frame_starts[number + 1] if number + 1 < len(self.frame_starts) else len(self.index)
+        entries = self.index[self.frame_starts[number]:stop]
+        return float(entries['timestamp'][0]), {int(e['channel']): self.waveform(e) for e in entries}
@@ -0,0 +1,177 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.acquisition_engine import AcquisitionEngine, Frame, FrameRingBuffer
+from src.oscilloscope import Oscilloscope, TRANSFER_FORMATS
+
+
+class SessionClock:
+    """Monotonic clock shared by every instrument of a session.
+
+    Readings are ``time.perf_counter()`` (monotonic, high resolution) shifted to match
+    ``time.time()`` when the clock was created. They can be used as Unix timestamps, but
+    never jump when the system clock is adjusted, so frames of different instruments can be
+    aligned by timestamp.
+    """
+
+    def __init__(self):
+        self.wall_epoch = time.time()
+        self.counter_epoch = time.perf_counter()
+
+    def __call__(self):
+        return self.wall_epoch + (time.perf_counter() - self.counter_epoch)
+
+
+class SessionInstrument:
+    """One oscilloscope of a SessionManager and its channel selection."""
+
+    def __init__(self, name, address, channels, transfer_format='int8', resource_manager=None):
+        self.name = name
+        self.address = address
+        self.channels = {channel: channel in channels for channel in range(1, 5)}
+        self.resource_manager = resource_manager
+        self.oscilloscope = Oscilloscope()
+        self.oscilloscope.set_transfer_format(*TRANSFER_FORMATS[transfer_format])
+        self.engine = None
+        self.sequence = 0
+
+    def connect(self):
+        if not self.oscilloscope.is_connected:
+            self.oscilloscope.connect_device(self.address, self.resource_manager)
+        self.oscilloscope.check_channel_on(self.channels)
+
+    def acquire(self, clock):
+        """Acquire one frame, timestamped with ``clock`` when the acquisition starts."""
+        frame = Frame()
+        frame.timestamp = clock()
+        self.oscilloscope.acquire_data(self.channels)
+        frame.sequence = self.sequence
+        frame.waveforms = {channel: self.oscilloscope.waveforms[channel]
+                           for channel in self.channels if self.channels[channel]}
+        self.sequence += 1
+        return frame
+
+
+class SessionManager:
+    """Acquires from several oscilloscopes in parallel with one time base.
+
+    PyVISA releases the GIL while it waits for the instrument, so one thread per instrument
+    overlaps their round trips and transfers. Throughput then grows with the number of
+    instruments until the shared network/USB link is saturated.
+
+    - ``acquire()`` takes one frame from every instrument at the same time (lockstep).
+    - ``start()`` runs one free-running AcquisitionEngine per instrument; read the frames
+      with ``take_latest()`` or from ``instrument.engine.ring``.
+
+    Every frame is timestamped with the shared SessionClock.
+
+    Parameters:
+        max_workers: threads for connect()/acquire()/map() (default: one per instrument)
+    """
+
+    def __init__(self, max_workers=None):
+        self.clock = SessionClock()
+        self.instruments = {}  # name -> SessionInstrument
+        self.max_workers = max_workers
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, address, channels, name=None, transfer_format='int8', resource_manager=None):
+        """Add an instrument (connect() opens it); returns its name.
+
+        Parameters:
+            channels: channel numbers to acquire, e.g. [1, 2]
+            name: defaults to the address, numbered if the address is used twice
+        """
+        if name is None:
+            name = address
+            number = 2
+            while name in self.instruments:
+                name = f"{address} #{number}"
+                number += 1
+        if name in self.instruments:
+            raise ValueError(f"Instrument name already used: {name}")
+        self.instruments[name] = SessionInstrument(name, address, channels, transfer_format, resource_manager)
+        return name
+
+    def remove(self, name):
+        instrument = self.instruments.pop(name)
+        if instrument.engine is not None:
+            instrument.engine.stop()
+        if instrument.oscilloscope.is_connected:
+            instrument.oscilloscope.close()
+
+    def map(self, function):
+        """Call ``function(instrument)`` for every instrument in parallel.
+
+        Returns:
+            name -> result
+        Raises the first error after all calls finished; its ``instrument`` attribute holds
+        the name of the instrument that failed.
+        """
+        workers = self.max_workers or max(len(self.instruments), 1)
+        if self.executor is None or self.executor._max_workers < workers:
+            if self.executor is not None:
+                self.executor.shutdown()
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix="SessionManager")
+        futures = {name: self.executor.submit(function, instrument) for name, instrument in self.instruments.items()}
+        results = {}
+        error = None
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                e.instrument = name
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def connect(self):
+        """Open every instrument that is not connected yet (in parallel) and check its channels."""
+        self.map(SessionInstrument.connect)
+
+    def acquire(self):
+        """One frame from every instrument, acquired concurrently.
+
+        Returns:
+            name -> Frame (timestamps from ``clock``)
+        """
+        return self.map(lambda instrument: instrument.acquire(self.clock))
+
+    def start(self, capacity=8, policy=FrameRingBuffer.DROP_OLDEST):
+        """Let every instrument acquire continuously on its own thread."""
+        for instrument in self.instruments.values():
+            if instrument.engine is None or not instrument.engine.is_running:
+                instrument.engine = AcquisitionEngine(instrument.oscilloscope, instrument.channels,
+                                                      capacity, policy, clock=self.clock)
+                instrument.engine.start()
+
+    def stop(self):
+        for instrument in self.instruments.values():
+            if instrument.engine is not None:
+                instrument.engine.stop()
+
+    def take_latest(self):
+        """Newest unread frame of every running instrument (name -> Frame, None if no new frame)."""
+        return {name: instrument.engine.ring.take_latest()
+                for name, instrument in self.instruments.items() if instrument.engine is not None}
+
+    def statistics(self):
+        """name -> AcquisitionEngine.statistics() of the instruments started with start()."""
+        return {name: instrument.engine.statistics()
+                for name, instrument in self.instruments.items() if instrument.engine is not None}
+
+    def close(self):
+        self.stop()
+        for instrument in self.instruments.values():
+            if instrument.oscilloscope.is_connected:
+                instrument.oscilloscope.close()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
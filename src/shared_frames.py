@@ -0,0 +1,317 @@
+import os
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from src.waveform import Waveform
+
+
+DEFAULT_NAME = 'pyoscilloscope-frames'
+RING_MAGIC = b'PYOSCSHM'
+RING_VERSION = 1
+MAX_CHANNELS = 4
+_ALIGNMENT = 64
+
+# Start of the shared memory block
+RING_HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('slots', '<u4'),
+    ('slot_size', '<u8'),
+    ('head', '<u8'),  # number of frames published; frame n is in slot n % slots
+    ('pid', '<u4'),  # process of the publisher
+    ('reserved', 'V28'),
+])
+
+# Sample layout and preamble of one channel waveform in a slot (same fields as recorder.INDEX_DTYPE)
+CHANNEL_DTYPE = np.dtype([
+    ('channel', '<u4'),
+    ('dtype', 'S4'),
+    ('points', '<u8'),
+    ('data_offset', '<u8'),  # from the start of the shared memory block
+    ('x_increment', '<f8'),
+    ('x_zero', '<f8'),
+    ('y_mult', '<f8'),
+    ('y_off', '<f8'),
+    ('y_zero', '<f8'),
+])
+
+# Header of every slot, followed by ``slot_size`` bytes of samples
+SLOT_HEADER_DTYPE = np.dtype([
+    ('lock', '<u8'),  # 2 * frame + 1 while frame is written, 2 * frame + 2 once it is complete
+    ('timestamp', '<f8'),
+    ('count', '<u4'),
+    ('reserved', 'V12'),
+    ('channels', CHANNEL_DTYPE, MAX_CHANNELS),
+])
+
+
+def _aligned(size):
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _slot_offset(index, slot_size):
+    return _aligned(RING_HEADER_DTYPE.itemsize) + index * (_aligned(SLOT_HEADER_DTYPE.itemsize) + slot_size)
+
+
+def _attach(name):
+    """Open an existing block without handing it to this process' resource tracker.
+
+    Before Python 3.13 every SharedMemory registers with the tracker, which unlinks the
+    block when a consumer exits, while the publisher is still using it. The registration is
+    kept if the publisher is this process, since it is then the publisher's own.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        memory = shared_memory.SharedMemory(name=name)
+        if _publisher_pid(memory) != os.getpid():
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        return memory
+
+
+def _publisher_pid(memory):
+    """Process of the ring's publisher (None if ``memory`` is not a frame ring)."""
+    if memory.size < RING_HEADER_DTYPE.itemsize:
+        return None
+    header = np.ndarray((), dtype=RING_HEADER_DTYPE, buffer=memory.buf)
+    pid = int(header['pid']) if bytes(header['magic']) == RING_MAGIC else None
+    del header
+    return pid
+
+
+def _process_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # running under another user
+    return True
+
+
+class SharedFrame:
+    """One frame read from a SharedFrameReader; waveforms view the shared memory."""
+    __slots__ = ('sequence', 'timestamp', 'waveforms')
+
+    def __init__(self, sequence, timestamp, waveforms):
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.waveforms = waveforms  # channel -> Waveform
+
+
+class SharedFrameWriter:
+    """Publishes frames into a ring of slots in shared memory for other processes.
+
+    Every slot is protected by a sequence lock: its ``lock`` is odd while the frame is
+    written and even once it is complete, so readers detect a frame overwritten under them
+    instead of waiting for the writer. The writer keeps no state about its readers and
+    never waits for them; a reader that falls more than ``slots`` frames behind loses the
+    oldest ones. Frames larger than ``slot_size`` (or with more than MAX_CHANNELS
+    channels) are not published and counted in ``oversized``.
+
+    ``close()`` may be called from another thread than ``publish()``; frames published
+    after it are dropped. A ring left behind by a publisher that did not close (its process
+    has ended) is replaced; FileExistsError is raised if the name is used by a running
+    publisher or by something that is not a frame ring.
+
+    Parameters:
+        name: shared memory name, the one readers attach to
+        slots: number of frames kept
+        slot_size: bytes of samples per frame (all channels)
+    """
+
+    def __init__(self, name=DEFAULT_NAME, slots=8, slot_size=1 << 22):
+        self.name = name
+        self.slots = slots
+        self.slot_size = _aligned(slot_size)
+        size = _slot_offset(slots, self.slot_size)
+        try:
+            self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._remove_stale(name)
+            self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.lock = threading.Lock()
+        self.published = 0
+        self.oversized = 0
+        self.bytes_published = 0
+
+        self.header = np.ndarray((), dtype=RING_HEADER_DTYPE, buffer=self.memory.buf)
+        self.slot_headers = [np.ndarray((), dtype=SLOT_HEADER_DTYPE, buffer=self.memory.buf,
+                                        offset=_slot_offset(index, self.slot_size))
+                             for index in range(slots)]
+        self.header['version'] = RING_VERSION
+        self.header['slots'] = slots
+        self.header['slot_size'] = self.slot_size
+        self.header['head'] = 0
+        self.header['pid'] = os.getpid()
+        self.header['magic'] = RING_MAGIC  # last: readers check it before anything else
+
+    @staticmethod
+    def _remove_stale(name):
+        """Unlink the existing block ``name`` if it is a ring whose publisher is no longer running."""
+        existing = shared_memory.SharedMemory(name=name)
+        pid = _publisher_pid(existing)
+        existing.close()
+        if pid is None or _process_running(pid):
+            if pid != os.getpid():
+                # Opening it registered the block with this process' resource tracker, which
+                # would unlink it at exit under its owner
+                resource_tracker.unregister(existing._name, 'shared_memory')
+            if pid is None:
+                raise FileExistsError(f"Shared memory '{name}' exists and is not a frame ring")
+            raise FileExistsError(f"Frame ring '{name}' is already in use by process {pid}")
+        existing.unlink()  # the publisher ended without closing
+
+    def publish(self, timestamp, waveforms):
+        """Copy one frame (channel -> Waveform) into the next slot; returns False if it was not published."""
+        raw = [np.ascontiguousarray(waveform.raw) for waveform in waveforms.values()]
+        offsets = np.cumsum([0] + [_aligned(samples.nbytes) for samples in raw])
+        if len(raw) > MAX_CHANNELS or offsets[-1] > self.slot_size:
+            self.oversized += 1
+            return False
+        with self.lock:
+            if self.memory is None:
+                return False
+            self._write(timestamp, waveforms, raw, offsets)
+        return True
+
+    def _write(self, timestamp, waveforms, raw, offsets):
+        frame = int(self.header['head'])
+        index = frame % self.slots
+        slot = self.slot_headers[index]
+        data_start = _slot_offset(index, self.slot_size) + _aligned(SLOT_HEADER_DTYPE.itemsize)
+        slot['lock'] = 2 * frame + 1
+        for entry_index, ((channel, waveform), samples) in enumerate(zip(waveforms.items(), raw)):
+            start = data_start + int(offsets[entry_index])
+            self.memory.buf[start:start + samples.nbytes] = samples.view(np.uint8).reshape(-1)
+            entry = slot['channels'][entry_index]
+            entry['channel'] = channel
+            entry['dtype'] = samples.dtype.str.encode()
+            entry['points'] = samples.size
+            entry['data_offset'] = start
+            entry['x_increment'] = waveform.x_increment
+            entry['x_zero'] = waveform.x_zero
+            entry['y_mult'] = waveform.y_mult
+            entry['y_off'] = waveform.y_off
+            entry['y_zero'] = waveform.y_zero
+        slot['timestamp'] = timestamp
+        slot['count'] = len(raw)
+        slot['lock'] = 2 * frame + 2
+        self.header['head'] = frame + 1
+        self.published += 1
+        self.bytes_published += int(offsets[-1])
+
+    def close(self):
+        """Stop publishing and remove the block (attached readers keep their mapping)."""
+        with self.lock:
+            if self.memory is None:
+                return
+            self.header = None
+            self.slot_headers = None
+            self.memory.close()
+            try:
+                self.memory.unlink()
+            except FileNotFoundError:
+                pass  # already replaced by a newer publisher of the same name
+            self.memory = None
+
+
+class SharedFrameReader:
+    """Reads the frames of a SharedFrameWriter, possibly in another process.
+
+    Samples are not copied: every Waveform views the shared memory, so a frame is only
+    valid until the writer reuses its slot, ``slots`` frames later. Check ``valid(frame)``
+    after processing a frame (or copy what you keep). Each reader keeps its own position,
+    so any number of readers can attach; frames a reader fell too far behind for are
+    counted in ``missed``.
+
+    Parameters:
+        name: shared memory name given to the writer
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.memory = _attach(name)
+        self.header = np.ndarray((), dtype=RING_HEADER_DTYPE, buffer=self.memory.buf)
+        if bytes(self.header['magic']) != RING_MAGIC:
+            self.close()
+            raise ValueError(f"{name} is not a frame ring")
+        if self.header['version'] > RING_VERSION:
+            version = int(self.header['version'])
+            self.close()
+            raise ValueError(f"Unsupported frame ring version {version}")
+        self.slots = int(self.header['slots'])
+        self.slot_size = int(self.header['slot_size'])
+        self.slot_headers = [np.ndarray((), dtype=SLOT_HEADER_DTYPE, buffer=self.memory.buf,
+                                        offset=_slot_offset(index, self.slot_size))
+                             for index in range(self.slots)]
+        self.position = int(self.header['head'])  # next frame to read; starts at the newest
+        self.missed = 0
+
+    @property
+    def head(self):
+        """Number of frames published so far."""
+        return int(self.header['head'])
+
+    def read(self, sequence):
+        """Frame number ``sequence``, or None if it is not (or no longer) in the ring."""
+        slot = self.slot_headers[sequence % self.slots]
+        lock = int(slot['lock'])
+        if lock != 2 * sequence + 2:
+            return None
+        timestamp = float(slot['timestamp'])
+        waveforms = {}
+        for entry in slot['channels'][:int(slot['count'])]:
+            dtype = np.dtype(bytes(entry['dtype']).decode())
+            raw = np.ndarray((int(entry['points']),), dtype=dtype, buffer=self.memory.buf,
+                             offset=int(entry['data_offset']))
+            raw.setflags(write=False)
+            preamble = {
+                'XINCR': float(entry['x_increment']),
+                'XZERO': float(entry['x_zero']),
+                'YMULT': float(entry['y_mult']),
+                'YOFF': float(entry['y_off']),
+                'YZERO': float(entry['y_zero']),
+                'NR_PT': int(entry['points']),
+            }
+            waveforms[int(entry['channel'])] = Waveform(raw, preamble)
+        if int(slot['lock']) != lock:
+            return None  # overwritten while the header was read
+        return SharedFrame(sequence, timestamp, waveforms)
+
+    def valid(self, frame):
+        """Whether ``frame``'s samples are still the ones published (not yet overwritten)."""
+        return int(self.slot_headers[frame.sequence % self.slots]['lock']) == 2 * frame.sequence + 2
+
+    def latest(self):
+        """Newest frame (None before the first one); next() continues after it."""
+        while True:
+            head = self.head
+            if head == 0:
+                return None
+            frame = self.read(head - 1)
+            if frame is not None:
+                self.position = head
+                return frame
+
+    def next(self):
+        """Oldest frame not yet read by this reader, or None when it is up to date."""
+        while True:
+            head = self.head
+            if self.position >= head:
+                return None
+            if head - self.position > self.slots:
+                self.missed += head - self.slots - self.position
+                self.position = head - self.slots
+            frame = self.read(self.position)
+            self.position += 1
+            if frame is not None:
+                return frame
+            self.missed += 1  # overwritten while it was read
+
+    def close(self):
+        """Detach; fails while Waveforms read from this reader are still referenced."""
+        self.header = None
+        self.slot_headers = None
+        self.memory.close()
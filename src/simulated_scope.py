@@ -0,0 +1,533 @@
+import re
+import time
+from datetime import datetime
+import numpy as np
+
+
+SIMULATED_ADDRESS = 'SIM::MDO4024C::INSTR'
+
+MAX_RECORD_LENGTH = 20_000_000
+
+# Digitizing levels per vertical division at 1 byte/sample (x256 at 2 bytes/sample)
+LEVELS_PER_DIV = 25
+
+# (signed, little endian) for each DATa:ENCdg value
+_ENCODINGS = {
+    'RIBinary': (True, False),
+    'RPBinary': (False, False),
+    'SRIbinary': (True, True),
+    'SRPbinary': (False, True),
+}
+
+# Splits a program message on ';' while leaving quoted strings intact
+_MESSAGE_SPLIT = re.compile(r';(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+
+def _short_form(mnemonic):
+    """'RECOrdlength' -> 'RECO'; mnemonics without lowercase letters are their own short form."""
+    short = ''.join(c for c in mnemonic if not c.islower())
+    return short if short else mnemonic.upper()
+
+
+def _matches(node, mnemonic):
+    node = node.upper()
+    return node.startswith(_short_form(mnemonic)) and mnemonic.upper().startswith(node)
+
+
+class SimulatedResourceManager:
+    """Stand-in for ``pyvisa.ResourceManager`` that only knows the simulated MDO4024C."""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def list_resources(self, query='?*::INSTR'):
+        return (SIMULATED_ADDRESS,) if query in ('?*::INSTR', '?*') or query.startswith('SIM') else ()
+
+    def open_resource(self, resource_name):
+        if not resource_name.startswith('SIM::'):
+            raise ValueError(f"Unknown simulated resource: {resource_name}")
+        return SimulatedMDO4024C(**self.options)
+
+    def close(self):
+        pass
+
+
+class SimulatedMDO4024C:
+    """Simulated Tektronix MDO4024C answering the SCPI subset used by Oscilloscope.
+
+    Implements the parts of the pyvisa ``MessageBasedResource`` interface that the
+    application relies on (write/query/read/read_bytes/query_binary_values).
+    Waveforms are digitized sines with noise, one frequency per channel, generated once per
+    record length and sliced at a random phase for each acquisition.
+
+    Parameters:
+        record_length: initial horizontal record length (up to 20M points)
+        latency: seconds added to every query, emulating the link round trip
+        transfer_rate: link throughput in bytes/s for responses (None = unlimited)
+        multi_source: accept a channel list in DATa:SOUrce and return one block per source
+        trigger_rate: trigger events per second seen by FastFrame acquisitions
+        run_trigger_rate: acquisitions per second in Run mode (ACQuire:NUMACq?); None triggers
+            whenever the counter or a curve is read, so every poll finds a new acquisition
+    """
+
+    def __init__(self, record_length=10000, latency=0.0, transfer_rate=None, multi_source=True, seed=0,
+                 trigger_rate=100e3, run_trigger_rate=None):
+        self.timeout = 10000
+        self.encoding = 'UTF-8'
+        self.read_termination = '\n'
+        self.write_termination = '\n'
+
+        self.latency = latency
+        self.transfer_rate = transfer_rate
+        self.multi_source = multi_source
+        self.trigger_rate = trigger_rate
+        self.run_trigger_rate = run_trigger_rate
+        self.rng = np.random.default_rng(seed)
+        self.output = bytearray()
+        self.output_position = 0
+
+        self.header = False
+        self.verbose = True
+        self.record_length = int(record_length)
+        self.horizontal_scale = 4e-6
+        self.horizontal_position = 50.0
+        self.acquire_mode = 'SAMPLE'
+        self.acquire_state = 1
+        self.acquisitions = 0  # ACQuire:NUMACq? when the run was last started or stopped
+        self.run_start = time.perf_counter()
+        self.data_sources = [1]
+        self.data_encoding = 'SRIbinary'
+        self.data_start = 1
+        self.data_stop = self.record_length
+        self.byte_nr = 1
+        self.channel_on = {1: True, 2: True, 3: True, 4: True}
+        self.channel_scale = {1: 0.1, 2: 0.2, 3: 0.5, 4: 1.0}
+        self.channel_offset = {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0}
+        self.channel_position = {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0}
+        self._base_waves = {}
+
+        # FastFrame: one ACQuire:STATE 1 in single-sequence mode captures fastframe_count frames
+        self.fastframe_state = False
+        self.fastframe_count = 1
+        self.stop_after = 'RUNSTOP'
+        self.frame_start = 1
+        self.frame_stop = 1
+        self.sequence_phases = None  # trigger phase of every frame of the last sequence
+        self.sequence_start = None   # Unix time of the first trigger of the last sequence
+        self.sequence_times = None   # trigger time of every frame of the last sequence after the first
+
+        # (mnemonic path, handler); CH<x> matches CH1..CH4 and passes the number on
+        self._commands = [
+            (('*IDN',), self._idn),
+            (('*CLS',), self._noop),
+            (('*OPC',), self._opc),
+            (('*RST',), self._noop),
+            (('HEAder',), self._header),
+            (('VERBose',), self._verbose),
+            (('DATa', 'SOUrce'), self._data_source),
+            (('DATa', 'ENCdg'), self._data_encoding),
+            (('DATa', 'STARt'), self._data_start),
+            (('DATa', 'STOP'), self._data_stop),
+            (('DATa', 'WIDth'), self._byte_nr),
+            (('DATa', 'FRAMESTARt'), self._frame_start),
+            (('DATa', 'FRAMESTOP'), self._frame_stop),
+            (('WFMOutpre', 'BYT_Nr'), self._byte_nr),
+            (('WFMOutpre', 'XINcr'), lambda arg, query: self._preamble_field('XINCR')),
+            (('WFMOutpre', 'XZEro'), lambda arg, query: self._preamble_field('XZERO')),
+            (('WFMOutpre', 'YMUlt'), lambda arg, query: self._preamble_field('YMULT')),
+            (('WFMOutpre', 'YZEro'), lambda arg, query: self._preamble_field('YZERO')),
+            (('WFMOutpre', 'YOFf'), lambda arg, query: self._preamble_field('YOFF')),
+            (('WFMOutpre', 'NR_Pt'), lambda arg, query: self._preamble_field('NR_PT')),
+            (('WFMOutpre', 'NR_FR'), lambda arg, query: str(self._frames()[1])),
+            (('WFMOutpre',), self._wfmoutpre),
+            (('HORizontal', 'RECOrdlength'), self._record_length),
+            (('HORizontal', 'SCAle'), self._horizontal_scale),
+            (('HORizontal', 'POSition'), self._horizontal_position),
+            (('HORizontal', 'FASTframe', 'STATE'), self._fastframe_state),
+            (('HORizontal', 'FASTframe', 'COUNt'), self._fastframe_count),
+            (('HORizontal', 'FASTframe', 'MAXFRames'), self._fastframe_max_frames),
+            (('HORizontal', 'FASTframe', 'TIMEStamp', 'ALL', 'CH<x>'), self._fastframe_timestamps),
+            (('ACQuire', 'STATE'), self._acquire_state),
+            (('ACQuire', 'STOPAfter'), self._stop_after),
+            (('ACQuire', 'MODe'), self._acquire_mode),
+            (('ACQuire', 'NUMACq'), self._number_of_acquisitions),
+            (('SELect', 'CH<x>'), self._select),
+            (('CH<x>', 'SCAle'), self._channel_scale),
+            (('CH<x>', 'OFFSet'), self._channel_offset),
+            (('CH<x>', 'POSition'), self._channel_position),
+            (('CURVe',), self._curve),
+        ]
+
+    # ------------------------------------------------ VISA interface ------------------------------------------------ #
+    def write(self, message):
+        responses = []
+        path = []
+        for unit in _MESSAGE_SPLIT.split(message.strip()):
+            unit = unit.strip()
+            if not unit:
+                continue
+            header, _, argument = unit.partition(' ')
+            is_query = header.endswith('?')
+            header = header.rstrip('?')
+            if header.startswith(':') or header.startswith('*'):
+                nodes = header.lstrip(':').split(':')
+            else:
+                # Relative header: continues from the parent of the previous command
+                nodes = path[:-1] + header.split(':')
+            path = nodes
+
+            response = self._dispatch(nodes, argument.strip(), is_query)
+            if is_query:
+                responses.append(response)
+
+        if responses:
+            if self.latency:
+                time.sleep(self.latency)
+            self.output += b';'.join(r if isinstance(r, bytes) else r.encode() for r in responses) + b'\n'
+        return len(message)
+
+    def read_bytes(self, count, chunk_size=None, break_on_termchar=False):
+        start = self.output_position
+        if start + count > len(self.output):
+            raise TimeoutError("Simulated read timed out: not enough data pending")
+        with memoryview(self.output) as view:
+            data = bytes(view[start:start + count])
+        self.output_position += count
+        if self.output_position == len(self.output):
+            self.clear()
+        if self.transfer_rate:
+            time.sleep(count / self.transfer_rate)
+        return data
+
+    def read_raw(self, size=None):
+        end = self.output.find(b'\n', self.output_position)
+        if end < 0:
+            raise TimeoutError("Simulated read timed out: no response pending")
+        return self.read_bytes(end + 1 - self.output_position)
+
+    def read(self, termination=None, encoding=None):
+        return self.read_raw().decode(encoding or self.encoding).rstrip('\n')
+
+    def query(self, message, delay=None):
+        self.write(message)
+        return self.read()
+
+    def query_binary_values(self, message, datatype='f', is_big_endian=False, container=list, **kwargs):
+        self.write(message)
+        header = self.read_bytes(2)
+        length = int(self.read_bytes(int(header[1:2])))
+        dtype = np.dtype(datatype).newbyteorder('>' if is_big_endian else '<')
+        values = np.frombuffer(self.read_bytes(length), dtype=dtype)
+        self.read_bytes(1)  # Termination
+        return container(values)
+
+    def clear(self):
+        self.output.clear()
+        self.output_position = 0
+
+    def close(self):
+        self.clear()
+        self._base_waves.clear()
+
+    # --------------------------------------------------- Dispatch -------------------------------------------------- #
+    def _dispatch(self, nodes, argument, is_query):
+        for pattern, handler in self._commands:
+            if len(pattern) != len(nodes):
+                continue
+            channel = None
+            for node, mnemonic in zip(nodes, pattern):
+                if mnemonic == 'CH<x>':
+                    match = re.fullmatch(r'CH([1-4])', node.upper())
+                    if not match:
+                        break
+                    channel = int(match.group(1))
+                elif not _matches(node, mnemonic):
+                    break
+            else:
+                if channel is None:
+                    response = handler(argument, is_query)
+                else:
+                    response = handler(channel, argument, is_query)
+                if (is_query and self.header and not isinstance(response, bytes)
+                        and not nodes[0].startswith('*') and pattern != ('WFMOutpre',)):
+                    response = ':' + ':'.join(n.upper() for n in nodes) + ' ' + response
+                return response
+        raise ValueError(f"Simulated scope: unsupported command {':'.join(nodes)}")
+
+    def _noop(self, argument, is_query):
+        return '' if is_query else None
+
+    def _idn(self, argument, is_query):
+        return 'TEKTRONIX,MDO4024C,SIM00001,CF:91.1CT FV:v1.00 (simulated)'
+
+    def _opc(self, argument, is_query):
+        return '1'
+
+    def _header(self, argument, is_query):
+        if is_query:
+            return str(int(self.header))
+        self.header = argument.upper() in ('1', 'ON')
+
+    def _verbose(self, argument, is_query):
+        if is_query:
+            return str(int(self.verbose))
+        self.verbose = argument.upper() in ('1', 'ON')
+
+    def _data_source(self, argument, is_query):
+        if is_query:
+            return ','.join(f'CH{channel}' for channel in self.data_sources)
+        sources = [int(s.strip().upper().lstrip('CH')) for s in argument.split(',')]
+        self.data_sources = sources if self.multi_source else sources[:1]
+
+    def _data_encoding(self, argument, is_query):
+        if is_query:
+            return self.data_encoding.upper()
+        for name in _ENCODINGS:
+            if _matches(argument, name):
+                self.data_encoding = name
+                return
+        raise ValueError(f"Simulated scope: unsupported encoding {argument}")
+
+    def _data_start(self, argument, is_query):
+        if is_query:
+            return str(self.data_start)
+        self.data_start = max(1, int(float(argument)))
+
+    def _data_stop(self, argument, is_query):
+        if is_query:
+            return str(self.data_stop)
+        self.data_stop = max(1, int(float(argument)))
+
+    def _byte_nr(self, argument, is_query):
+        if is_query:
+            return str(self.byte_nr)
+        width = int(float(argument))
+        if width not in (1, 2):
+            raise ValueError(f"Simulated scope: unsupported byte width {width}")
+        self.byte_nr = width
+
+    def _record_length(self, argument, is_query):
+        if is_query:
+            return str(self.record_length)
+        record = int(float(argument))
+        if not 1 <= record <= MAX_RECORD_LENGTH:
+            raise ValueError(f"Simulated scope: record length {record} out of range")
+        self.record_length = record
+
+    def _horizontal_scale(self, argument, is_query):
+        if is_query:
+            return f'{self.horizontal_scale:.4E}'
+        self.horizontal_scale = float(argument)
+
+    def _horizontal_position(self, argument, is_query):
+        if is_query:
+            return f'{self.horizontal_position:.4E}'
+        self.horizontal_position = float(argument)
+
+    def _acquisition_number(self, trigger=False):
+        """Acquisitions so far in Run mode; with ``trigger`` and no run_trigger_rate, one more."""
+        if self.run_trigger_rate is None:
+            if trigger and self.acquire_state and not self.fastframe_state:
+                self.acquisitions += 1
+            return self.acquisitions
+        if not self.acquire_state or self.fastframe_state:
+            return self.acquisitions
+        return self.acquisitions + int((time.perf_counter() - self.run_start) * self.run_trigger_rate)
+
+    def _number_of_acquisitions(self, argument, is_query):
+        return str(self._acquisition_number(trigger=True))
+
+    def _acquire_state(self, argument, is_query):
+        if is_query:
+            return str(self.acquire_state)
+        running = argument.upper() not in ('0', 'OFF', 'STOP')
+        if running != bool(self.acquire_state) and self.run_trigger_rate is not None:
+            # Keep the count when stopping, count from now when (re)starting
+            self.acquisitions = self._acquisition_number()
+            self.run_start = time.perf_counter()
+        self.acquire_state = 1 if running else 0
+        if self.acquire_state and self.fastframe_state:
+            # Capture a whole sequence; trigger intervals jitter around 1 / trigger_rate
+            count = self.fastframe_count
+            intervals = self.rng.exponential(1.0 / self.trigger_rate, count)
+            intervals[0] = 0.0
+            self.sequence_phases = self.rng.random(count)
+            self.sequence_start = time.time()
+            self.sequence_times = np.cumsum(intervals)
+            if self.stop_after == 'SEQUENCE':
+                self.acquire_state = 0
+
+    def _stop_after(self, argument, is_query):
+        if is_query:
+            return self.stop_after
+        argument = argument.upper()
+        self.stop_after = 'SEQUENCE' if 'SEQUENCE'.startswith(argument) and argument.startswith('SEQ') else 'RUNSTOP'
+
+    def _fastframe_state(self, argument, is_query):
+        if is_query:
+            return str(int(self.fastframe_state))
+        self.fastframe_state = argument.upper() in ('1', 'ON')
+
+    def _fastframe_count(self, argument, is_query):
+        if is_query:
+            return str(self.fastframe_count)
+        count = int(float(argument))
+        if not 1 <= count <= MAX_RECORD_LENGTH // self.record_length:
+            raise ValueError(f"Simulated scope: FastFrame count {count} out of range")
+        self.fastframe_count = count
+
+    def _fastframe_max_frames(self, argument, is_query):
+        return str(MAX_RECORD_LENGTH // self.record_length)
+
+    def _fastframe_timestamps(self, channel, argument, is_query):
+        """``HORizontal:FASTframe:TIMEStamp:ALL:CH<x>? <first frame>,<count>``"""
+        if self.sequence_times is None:
+            raise ValueError("Simulated scope: no FastFrame sequence acquired")
+        first, count = (int(float(value)) for value in argument.split(','))
+        # Whole seconds and nanoseconds are kept apart so the stamps keep their resolution
+        start = int(self.sequence_start)
+        nanoseconds = np.round(((self.sequence_start - start) + self.sequence_times[first - 1:first - 1 + count]) * 1e9)
+        stamps = []
+        for value in nanoseconds.astype(np.int64):
+            seconds, value = divmod(int(value), 1_000_000_000)
+            stamps.append(f'"{datetime.fromtimestamp(start + seconds).strftime("%d %b %Y %H:%M:%S")}.{value:09d}"')
+        return ','.join(stamps)
+
+    def _frame_start(self, argument, is_query):
+        if is_query:
+            return str(self.frame_start)
+        self.frame_start = max(1, int(float(argument)))
+
+    def _frame_stop(self, argument, is_query):
+        if is_query:
+            return str(self.frame_stop)
+        self.frame_stop = max(1, int(float(argument)))
+
+    def _acquire_mode(self, argument, is_query):
+        if is_query:
+            return self.acquire_mode
+        self.acquire_mode = argument.upper()
+
+    def _select(self, channel, argument, is_query):
+        if is_query:
+            return str(int(self.channel_on[channel]))
+        self.channel_on[channel] = argument.upper() in ('1', 'ON')
+
+    def _channel_scale(self, channel, argument, is_query):
+        if is_query:
+            return f'{self.channel_scale[channel]:.4E}'
+        self.channel_scale[channel] = float(argument)
+
+    def _channel_offset(self, channel, argument, is_query):
+        if is_query:
+            return f'{self.channel_offset[channel]:.4E}'
+        self.channel_offset[channel] = float(argument)
+
+    def _channel_position(self, channel, argument, is_query):
+        if is_query:
+            return f'{self.channel_position[channel]:.4E}'
+        self.channel_position[channel] = float(argument)
+
+    # --------------------------------------------------- Waveforms -------------------------------------------------- #
+    def _levels_per_div(self):
+        return LEVELS_PER_DIV * (256 if self.byte_nr == 2 else 1)
+
+    def _points(self):
+        start = min(self.data_start, self.record_length)
+        stop = min(max(self.data_stop, start), self.record_length)
+        return start, stop - start + 1
+
+    def _preamble(self, channel):
+        signed, little_endian = _ENCODINGS[self.data_encoding]
+        _, points = self._points()
+        xincr = self.horizontal_scale * 10 / self.record_length
+        levels = self._levels_per_div()
+        return {
+            'BYT_NR': str(self.byte_nr),
+            'BIT_NR': str(8 * self.byte_nr),
+            'ENCDG': 'BINARY',
+            'BN_FMT': 'RI' if signed else 'RP',
+            'BYT_OR': 'LSB' if little_endian else 'MSB',
+            'WFID': f'"Ch{channel}, DC coupling, {self.channel_scale[channel]:.4g}V/div, '
+                    f'{self.horizontal_scale:.4g}s/div, {self.record_length} points, Sample mode"',
+            'NR_PT': str(points),
+            'PT_FMT': 'Y',
+            'XUNIT': '"s"',
+            'XINCR': f'{xincr:.4E}',
+            'XZERO': f'{-self.horizontal_position / 100 * self.record_length * xincr:.4E}',
+            'PT_OFF': '0',
+            'YUNIT': '"V"',
+            'YMULT': f'{self.channel_scale[channel] / levels:.4E}',
+            'YOFF': f'{self.channel_position[channel] * levels + (0 if signed else 2 ** (8 * self.byte_nr - 1)):.4E}',
+            'YZERO': f'{self.channel_offset[channel]:.4E}',
+        }
+
+    def _frames(self):
+        """First frame (1-based) and number of frames returned by CURve?."""
+        if not self.fastframe_state or self.sequence_phases is None:
+            return 1, 1
+        start = min(self.frame_start, len(self.sequence_phases))
+        stop = min(max(self.frame_stop, start), len(self.sequence_phases))
+        return start, stop - start + 1
+
+    def _preamble_field(self, field):
+        return self._preamble(self.data_sources[0])[field]
+
+    def _wfmoutpre(self, argument, is_query):
+        preamble = self._preamble(self.data_sources[0])
+        if self.header and self.verbose:
+            return ':WFMOUTPRE:' + ';'.join(f'{key} {value}' for key, value in preamble.items())
+        if self.header:
+            return ':WFMO:' + ';'.join(f'{key} {value}' for key, value in preamble.items())
+        return ';'.join(preamble.values())
+
+    def _base_wave(self, channel):
+        """Noisy sine in divisions, long enough to be sliced at any phase of one period."""
+        key = (channel, self.record_length)
+        if key not in self._base_waves:
+            cycles = 5 * channel
+            period = max(self.record_length // cycles, 1)
+            length = self.record_length + period
+            wave = np.sin(np.arange(length, dtype=np.float32) * np.float32(2 * np.pi / period))
+            wave *= np.float32(3.0)
+            wave += self.rng.standard_normal(length, dtype=np.float32) * np.float32(0.02)
+            self._base_waves[key] = (wave, period)
+        return self._base_waves[key]
+
+    def _digitize(self, channel, start, points, phase):
+        """Samples of one frame, or of several frames back to back when ``phase`` is an array."""
+        wave, period = self._base_wave(channel)
+        if np.ndim(phase):
+            offsets = (np.asarray(phase) * period).astype(np.int64) + start - 1
+            divisions = wave[offsets[:, None] + np.arange(points)]
+        else:
+            phase = int(phase * period)
+            divisions = wave[phase + start - 1:phase + start - 1 + points]
+
+        levels = self._levels_per_div()
+        signed, little_endian = _ENCODINGS[self.data_encoding]
+        limit = 2 ** (8 * self.byte_nr - 1)
+        counts = divisions * np.float32(levels) + np.float32(self.channel_position[channel] * levels)
+        counts = np.clip(np.rint(counts), -limit, limit - 1)
+        dtype = np.dtype(f"{'<' if little_endian else '>'}{'i' if signed else 'u'}{self.byte_nr}")
+        if not signed:
+            counts += limit
+        return counts.astype(dtype).tobytes()
+
+    def _curve(self, argument, is_query):
+        start, points = self._points()
+        if self.fastframe_state and self.sequence_phases is not None:
+            first, count = self._frames()
+            phase = self.sequence_phases[first - 1:first - 1 + count]
+        elif self.run_trigger_rate is not None:
+            # The latest acquisition: reading it again returns the same waveform
+            phase = (self._acquisition_number() * 0.6180339887498949) % 1.0
+        else:
+            self._acquisition_number(trigger=True)
+            phase = self.rng.random()  # Same trigger point for every source
+        blocks = []
+        for channel in self.data_sources:
+            data = self._digitize(channel, start, points, phase)
+            length = str(len(data)).encode()
+            blocks.append(b'#' + str(len(length)).encode() + length + data)
+        return b';'.join(blocks)
@@ -0,0 +1,148 @@
+from collections import deque
+
+import numpy as np
+
+from src.fft_processor import make_window
+
+
+def _segment_power(samples, window, hop, y_mult, y_off, y_zero):
+    """Windowed |rFFT|^2 of every segment of ``samples`` (one chunk of a record).
+
+    Module level so it can run in a process pool; only the raw chunk is sent to the worker.
+    """
+    volts = np.subtract(samples, y_off, dtype=np.float32)
+    volts *= y_mult
+    volts += y_zero
+    segments = np.lib.stride_tricks.sliding_window_view(volts, len(window))[::hop]
+    segments = segments - segments.mean(axis=1, keepdims=True)  # constant detrend
+    segments *= window
+    spectrum = np.fft.rfft(segments, axis=1)
+    return spectrum.real ** 2 + spectrum.imag ** 2
+
+
+class SpectralAnalyzer:
+    """Welch PSD and STFT spectrogram of long records, processed in fixed-size chunks.
+
+    A chunk holds ``chunk_segments`` overlapping segments and is scaled to volts on its own,
+    so peak memory depends on the segment length and chunk size, not on the record length.
+    Chunks can be spread over a ``concurrent.futures`` thread or process pool.
+
+    Parameters:
+        segment_length: samples per FFT segment (sets the frequency resolution)
+        overlap: fraction of a segment shared with the next one, 0 <= overlap < 1
+        window: name from fft_processor.WINDOW_COEFFICIENTS
+        chunk_segments: segments per processing chunk
+        max_time_bins: spectrogram rows; adjacent segments are averaged beyond this
+    """
+
+    def __init__(self, segment_length=4096, overlap=0.5, window='Hann', chunk_segments=256, max_time_bins=512):
+        if segment_length < 2:
+            raise ValueError("Segment length must be at least 2 samples")
+        if not 0 <= overlap < 1:
+            raise ValueError("Overlap must be in [0, 1)")
+        self.segment_length = segment_length
+        self.overlap = overlap
+        self.window = window
+        self.chunk_segments = chunk_segments
+        self.max_time_bins = max_time_bins
+
+    @property
+    def hop(self):
+        return max(int(round(self.segment_length * (1 - self.overlap))), 1)
+
+    def segment_count(self, record):
+        if record < self.segment_length:
+            return 0
+        return (record - self.segment_length) // self.hop + 1
+
+    def checked_segment_count(self, waveform):
+        """segment_count() of ``waveform``; raises ValueError if it is shorter than one segment."""
+        count = self.segment_count(len(waveform))
+        if count == 0:
+            raise ValueError(f"Record ({len(waveform)} points) is shorter than one segment ({self.segment_length})")
+        return count
+
+    def iter_segment_power(self, waveform, executor=None):
+        """Yield ``(first_segment, power)`` per chunk, in order.
+
+        With an executor, at most two chunks per worker are in flight at a time so memory
+        stays bounded.
+        """
+        nperseg = self.segment_length
+        hop = self.hop
+        count = self.checked_segment_count(waveform)
+        window = make_window(self.window, nperseg)
+        scaling = (waveform.y_mult, waveform.y_off, waveform.y_zero)
+
+        def chunk(first):
+            last = min(first + self.chunk_segments, count)
+            start = first * hop
+            stop = (last - 1) * hop + nperseg
+            return waveform.raw[start:stop]
+
+        firsts = range(0, count, self.chunk_segments)
+        if executor is None:
+            for first in firsts:
+                yield first, _segment_power(chunk(first), window, hop, *scaling)
+            return
+
+        pending = deque()
+        limit = 2 * max(getattr(executor, '_max_workers', 1), 1)
+        for first in firsts:
+            pending.append((first, executor.submit(_segment_power, chunk(first), window, hop, *scaling)))
+            if len(pending) >= limit:
+                done_first, future = pending.popleft()
+                yield done_first, future.result()
+        while pending:
+            done_first, future = pending.popleft()
+            yield done_first, future.result()
+
+    def density_scale(self, sample_rate):
+        """Per-bin factor turning |X|^2 into a single-sided PSD in V^2/Hz."""
+        window = make_window(self.window, self.segment_length)
+        bins = self.segment_length // 2 + 1
+        scale = np.full(bins, 2.0 / (sample_rate * float(np.sum(window.astype(np.float64) ** 2))))
+        scale[0] /= 2
+        if self.segment_length % 2 == 0:
+            scale[-1] /= 2
+        return scale
+
+    def welch(self, waveform, executor=None):
+        """Welch power spectral density of ``waveform``.
+
+        Returns:
+            freqs: frequency axis (Hz)
+            psd: averaged single-sided PSD (V^2/Hz)
+        """
+        sample_rate = 1.0 / waveform.x_increment
+        total = np.zeros(self.segment_length // 2 + 1, dtype=np.float64)
+        segments = 0
+        for _, power in self.iter_segment_power(waveform, executor):
+            total += power.sum(axis=0)
+            segments += len(power)
+        freqs = np.fft.rfftfreq(self.segment_length, d=waveform.x_increment)
+        return freqs, total / segments * self.density_scale(sample_rate)
+
+    def spectrogram(self, waveform, executor=None):
+        """STFT spectrogram of ``waveform``.
+
+        Returns:
+            freqs: frequency axis (Hz)
+            times: start time (s) of each row
+            sxx: (rows x freqs) PSD in V^2/Hz, float32, at most ``max_time_bins`` rows
+        """
+        count = self.checked_segment_count(waveform)
+        group = -(-count // self.max_time_bins)  # segments averaged per row
+        rows = -(-count // group)
+        sxx = np.zeros((rows, self.segment_length // 2 + 1), dtype=np.float32)
+        for first, power in self.iter_segment_power(waveform, executor):
+            row_index = (first + np.arange(len(power))) // group
+            np.add.at(sxx, row_index, power)
+
+        per_row = np.bincount(np.arange(count) // group, minlength=rows)
+        sxx /= per_row[:, None]
+        sxx *= self.density_scale(1.0 / waveform.x_increment).astype(np.float32)
+
+        freqs = np.fft.rfftfreq(self.segment_length, d=waveform.x_increment)
+        times = waveform.x_zero + np.arange(rows) * group * self.hop * waveform.x_increment
+        return freqs, times, sxx
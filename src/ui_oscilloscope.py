@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'src/oscilloscope.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(1600, 900)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.gridLayout = QtWidgets.QGridLayout(self.centralwidget)
+        self.gridLayout.setObjectName("gridLayout")
+        self.graph_groupbox = QtWidgets.QGroupBox(self.centralwidget)
+        self.graph_groupbox.setObjectName("graph_groupbox")
+        self.time_domain_data_graph_layout = QtWidgets.QVBoxLayout(self.graph_groupbox)
+        self.time_domain_data_graph_layout.setObjectName("time_domain_data_graph_layout")
+        self.graph_widget = QtWidgets.QWidget(self.graph_groupbox)
+        self.graph_widget.setObjectName("graph_widget")
+        self.time_domain_data_graph_layout.addWidget(self.graph_widget)
+        self.gridLayout.addWidget(self.graph_groupbox, 0, 1, 1, 1)
+        self.tabWidget = QtWidgets.QTabWidget(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.tabWidget.sizePolicy().hasHeightForWidth())
+        self.tabWidget.setSizePolicy(sizePolicy)
+        self.tabWidget.setMinimumSize(QtCore.QSize(0, 0))
+        self.tabWidget.setMaximumSize(QtCore.QSize(300, 16777215))
+        self.tabWidget.setFocusPolicy(QtCore.Qt.StrongFocus)
+        self.tabWidget.setTabPosition(QtWidgets.QTabWidget.West)
+        self.tabWidget.setTabShape(QtWidgets.QTabWidget.Rounded)
+        self.tabWidget.setIconSize(QtCore.QSize(16, 16))
+        self.tabWidget.setElideMode(QtCore.Qt.ElideNone)
+        self.tabWidget.setObjectName("tabWidget")
+        self.tab_connection = QtWidgets.QWidget()
+        self.tab_connection.setObjectName("tab_connection")
+        self.verticalLayout_5 = QtWidgets.QVBoxLayout(self.tab_connection)
+        self.verticalLayout_5.setObjectName("verticalLayout_5")
+        self.connect_connection_groupbox = QtWidgets.QGroupBox(self.tab_connection)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.connect_connection_groupbox.sizePolicy().hasHeightForWidth())
+        self.connect_connection_groupbox.setSizePolicy(sizePolicy)
+        self.connect_connection_groupbox.setMaximumSize(QtCore.QSize(16777215, 130))
+        self.connect_connection_groupbox.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.connect_connection_groupbox.setObjectName("connect_connection_groupbox")
+        self.verticalLayout_waveform_2 = QtWidgets.QVBoxLayout(self.connect_connection_groupbox)
+        self.verticalLayout_waveform_2.setObjectName("verticalLayout_waveform_2")
+        self.connection_combobox = QtWidgets.QComboBox(self.connect_connection_groupbox)
+        self.connection_combobox.setObjectName("connection_combobox")
+        self.verticalLayout_waveform_2.addWidget(self.connection_combobox)
+        self.connection_connect_button = QtWidgets.QPushButton(self.connect_connection_groupbox)
+        self.connection_connect_button.setEnabled(True)
+        self.connection_connect_button.setObjectName("connection_connect_button")
+        self.verticalLayout_waveform_2.addWidget(self.connection_connect_button)
+        self.verticalLayout_5.addWidget(self.connect_connection_groupbox)
+        self.connect_device_name_label = QtWidgets.QLabel(self.tab_connection)
+        self.connect_device_name_label.setObjectName("connect_device_name_label")
+        self.verticalLayout_5.addWidget(self.connect_device_name_label)
+        self.connection_status_label = QtWidgets.QLabel(self.tab_connection)
+        self.connection_status_label.setObjectName("connection_status_label")
+        self.verticalLayout_5.addWidget(self.connection_status_label)
+        self.connection_current_time_label = QtWidgets.QLabel(self.tab_connection)
+        self.connection_current_time_label.setObjectName("connection_current_time_label")
+        self.verticalLayout_5.addWidget(self.connection_current_time_label)
+        spacerItem = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout_5.addItem(spacerItem)
+        self.tabWidget.addTab(self.tab_connection, "")
+        self.tab_control = QtWidgets.QWidget()
+        self.tab_control.setObjectName("tab_control")
+        self.verticalLayout_6 = QtWidgets.QVBoxLayout(self.tab_control)
+        self.verticalLayout_6.setObjectName("verticalLayout_6")
+        self.control_select_channel_groupbox = QtWidgets.QGroupBox(self.tab_control)
+        self.control_select_channel_groupbox.setEnabled(True)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.control_select_channel_groupbox.sizePolicy().hasHeightForWidth())
+        self.control_select_channel_groupbox.setSizePolicy(sizePolicy)
+        self.control_select_channel_groupbox.setMaximumSize(QtCore.QSize(16777215, 160))
+        self.control_select_channel_groupbox.setAlignment(QtCore.Qt.AlignLeading|QtCore.Qt.AlignLeft|QtCore.Qt.AlignVCenter)
+        self.control_select_channel_groupbox.setObjectName("control_select_channel_groupbox")
+        self.verticalLayout_waveform_3 = QtWidgets.QVBoxLayout(self.control_select_channel_groupbox)
+        self.verticalLayout_waveform_3.setObjectName("verticalLayout_waveform_3")
+        self.control_select_channel_ch1 = QtWidgets.QCheckBox(self.control_select_channel_groupbox)
+        self.control_select_channel_ch1.setObjectName("control_select_channel_ch1")
+        self.verticalLayout_waveform_3.addWidget(self.control_select_channel_ch1)
+        self.control_select_channel_ch2 = QtWidgets.QCheckBox(self.control_select_channel_groupbox)
+        self.control_select_channel_ch2.setObjectName("control_select_channel_ch2")
+        self.verticalLayout_waveform_3.addWidget(self.control_select_channel_ch2)
+        self.control_select_channel_ch3 = QtWidgets.QCheckBox(self.control_select_channel_groupbox)
+        self.control_select_channel_ch3.setObjectName("control_select_channel_ch3")
+        self.verticalLayout_waveform_3.addWidget(self.control_select_channel_ch3)
+        self.control_select_channel_ch4 = QtWidgets.QCheckBox(self.control_select_channel_groupbox)
+        self.control_select_channel_ch4.setObjectName("control_select_channel_ch4")
+        self.verticalLayout_waveform_3.addWidget(self.control_select_channel_ch4)
+        self.verticalLayout_6.addWidget(self.control_select_channel_groupbox)
+        self.control_transfer_format_combobox = QtWidgets.QComboBox(self.tab_control)
+        self.control_transfer_format_combobox.setObjectName("control_transfer_format_combobox")
+        self.verticalLayout_6.addWidget(self.control_transfer_format_combobox)
+        self.control_autoset = QtWidgets.QPushButton(self.tab_control)
+        self.control_autoset.setObjectName("control_autoset")
+        self.verticalLayout_6.addWidget(self.control_autoset)
+        self.control_single = QtWidgets.QPushButton(self.tab_control)
+        self.control_single.setEnabled(False)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.control_single.sizePolicy().hasHeightForWidth())
+        self.control_single.setSizePolicy(sizePolicy)
+        self.control_single.setObjectName("control_single")
+        self.verticalLayout_6.addWidget(self.control_single)
+        self.control_run_stop = QtWidgets.QPushButton(self.tab_control)
+        self.control_run_stop.setEnabled(False)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.control_run_stop.sizePolicy().hasHeightForWidth())
+        self.control_run_stop.setSizePolicy(sizePolicy)
+        self.control_run_stop.setObjectName("control_run_stop")
+        self.verticalLayout_6.addWidget(self.control_run_stop)
+        spacerItem1 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout_6.addItem(spacerItem1)
+        self.tabWidget.addTab(self.tab_control, "")
+        self.tab_math = QtWidgets.QWidget()
+        self.tab_math.setObjectName("tab_math")
+        self.verticalLayout_7 = QtWidgets.QVBoxLayout(self.tab_math)
+        self.verticalLayout_7.setObjectName("verticalLayout_7")
+        self.math_select_channel_groupbox = QtWidgets.QGroupBox(self.tab_math)
+        self.math_select_channel_groupbox.setEnabled(True)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.math_select_channel_groupbox.sizePolicy().hasHeightForWidth())
+        self.math_select_channel_groupbox.setSizePolicy(sizePolicy)
+        self.math_select_channel_groupbox.setMaximumSize(QtCore.QSize(16777215, 100))
+        self.math_select_channel_groupbox.setObjectName("math_select_channel_groupbox")
+        self.formLayout = QtWidgets.QFormLayout(self.math_select_channel_groupbox)
+        self.formLayout.setObjectName("formLayout")
+        self.math_channel_select_source1_combobox = QtWidgets.QComboBox(self.math_select_channel_groupbox)
+        self.math_channel_select_source1_combobox.setObjectName("math_channel_select_source1_combobox")
+        self.math_channel_select_source1_combobox.addItem("")
+        self.math_channel_select_source1_combobox.addItem("")
+        self.math_channel_select_source1_combobox.addItem("")
+        self.math_channel_select_source1_combobox.addItem("")
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.math_channel_select_source1_combobox)
+        self.math_channel_select_source1 = QtWidgets.QLabel(self.math_select_channel_groupbox)
+        self.math_channel_select_source1.setObjectName("math_channel_select_source1")
+        self.formLayout.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.math_channel_select_source1)
+        self.math_channel_select_source2_combobox = QtWidgets.QComboBox(self.math_select_channel_groupbox)
+        self.math_channel_select_source2_combobox.setObjectName("math_channel_select_source2_combobox")
+        self.math_channel_select_source2_combobox.addItem("")
+        self.math_channel_select_source2_combobox.addItem("")
+        self.math_channel_select_source2_combobox.addItem("")
+        self.math_channel_select_source2_combobox.addItem("")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.math_channel_select_source2_combobox)
+        self.math_channel_select_source2 = QtWidgets.QLabel(self.math_select_channel_groupbox)
+        self.math_channel_select_source2.setObjectName("math_channel_select_source2")
+        self.formLayout.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.math_channel_select_source2)
+        self.verticalLayout_7.addWidget(self.math_select_channel_groupbox)
+        self.math_function_groupbox = QtWidgets.QGroupBox(self.tab_math)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.math_function_groupbox.sizePolicy().hasHeightForWidth())
+        self.math_function_groupbox.setSizePolicy(sizePolicy)
+        self.math_function_groupbox.setMaximumSize(QtCore.QSize(16777215, 210))
+        self.math_function_groupbox.setObjectName("math_function_groupbox")
+        self.verticalLayout_9 = QtWidgets.QVBoxLayout(self.math_function_groupbox)
+        self.verticalLayout_9.setObjectName("verticalLayout_9")
+        self.math_function_add = QtWidgets.QCheckBox(self.math_function_groupbox)
+        self.math_function_add.setObjectName("math_function_add")
+        self.verticalLayout_9.addWidget(self.math_function_add)
+        self.math_function_subtract = QtWidgets.QCheckBox(self.math_function_groupbox)
+        self.math_function_subtract.setObjectName("math_function_subtract")
+        self.verticalLayout_9.addWidget(self.math_function_subtract)
+        self.math_function_multiply = QtWidgets.QCheckBox(self.math_function_groupbox)
+        self.math_function_multiply.setObjectName("math_function_multiply")
+        self.verticalLayout_9.addWidget(self.math_function_multiply)
+        self.math_function_divide = QtWidgets.QCheckBox(self.math_function_groupbox)
+        self.math_function_divide.setObjectName("math_function_divide")
+        self.verticalLayout_9.addWidget(self.math_function_divide)
+        self.horizontalLayout_math_expression = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_math_expression.setObjectName("horizontalLayout_math_expression")
+        self.math_function_expression = QtWidgets.QCheckBox(self.math_function_groupbox)
+        self.math_function_expression.setObjectName("math_function_expression")
+        self.horizontalLayout_math_expression.addWidget(self.math_function_expression)
+        self.math_expression_lineedit = QtWidgets.QLineEdit(self.math_function_groupbox)
+        self.math_expression_lineedit.setObjectName("math_expression_lineedit")
+        self.horizontalLayout_math_expression.addWidget(self.math_expression_lineedit)
+        self.verticalLayout_9.addLayout(self.horizontalLayout_math_expression)
+        self.verticalLayout_7.addWidget(self.math_function_groupbox)
+        self.math_fft_groupbox = QtWidgets.QGroupBox(self.tab_math)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.MinimumExpanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(1)
+        sizePolicy.setVerticalStretch(1)
+        sizePolicy.setHeightForWidth(self.math_fft_groupbox.sizePolicy().hasHeightForWidth())
+        self.math_fft_groupbox.setSizePolicy(sizePolicy)
+        self.math_fft_groupbox.setMaximumSize(QtCore.QSize(16777215, 280))
+        self.math_fft_groupbox.setObjectName("math_fft_groupbox")
+        self.formLayout_fft = QtWidgets.QFormLayout(self.math_fft_groupbox)
+        self.formLayout_fft.setObjectName("formLayout_fft")
+        self.math_fft_mode_label = QtWidgets.QLabel(self.math_fft_groupbox)
+        self.math_fft_mode_label.setObjectName("math_fft_mode_label")
+        self.formLayout_fft.setWidget(0, QtWidgets.QFormLayout.LabelRole, self.math_fft_mode_label)
+        self.math_fft_mode_combobox = QtWidgets.QComboBox(self.math_fft_groupbox)
+        self.math_fft_mode_combobox.setObjectName("math_fft_mode_combobox")
+        self.formLayout_fft.setWidget(0, QtWidgets.QFormLayout.FieldRole, self.math_fft_mode_combobox)
+        self.math_fft_window_label = QtWidgets.QLabel(self.math_fft_groupbox)
+        self.math_fft_window_label.setObjectName("math_fft_window_label")
+        self.formLayout_fft.setWidget(1, QtWidgets.QFormLayout.LabelRole, self.math_fft_window_label)
+        self.math_fft_window_combobox = QtWidgets.QComboBox(self.math_fft_groupbox)
+        self.math_fft_window_combobox.setObjectName("math_fft_window_combobox")
+        self.formLayout_fft.setWidget(1, QtWidgets.QFormLayout.FieldRole, self.math_fft_window_combobox)
+        self.math_fft_averaging_label = QtWidgets.QLabel(self.math_fft_groupbox)
+        self.math_fft_averaging_label.setObjectName("math_fft_averaging_label")
+        self.formLayout_fft.setWidget(2, QtWidgets.QFormLayout.LabelRole, self.math_fft_averaging_label)
+        self.math_fft_averaging_combobox = QtWidgets.QComboBox(self.math_fft_groupbox)
+        self.math_fft_averaging_combobox.setObjectName("math_fft_averaging_combobox")
+        self.formLayout_fft.setWidget(2, QtWidgets.QFormLayout.FieldRole, self.math_fft_averaging_combobox)
+        self.math_fft_average_count_label = QtWidgets.QLabel(self.math_fft_groupbox)
+        self.math_fft_average_count_label.setObjectName("math_fft_average_count_label")
+        self.formLayout_fft.setWidget(3, QtWidgets.QFormLayout.LabelRole, self.math_fft_average_count_label)
+        self.math_fft_average_count_spinbox = QtWidgets.QSpinBox(self.math_fft_groupbox)
+        self.math_fft_average_count_spinbox.setMinimum(1)
+        self.math_fft_average_count_spinbox.setMaximum(10000)
+        self.math_fft_average_count_spinbox.setProperty("value", 16)
+        self.math_fft_average_count_spinbox.setObjectName("math_fft_average_count_spinbox")
+        self.formLayout_fft.setWidget(3, QtWidgets.QFormLayout.FieldRole, self.math_fft_average_count_spinbox)
+        self.math_fft_segment_label = QtWidgets.QLabel(self.math_fft_groupbox)
+        self.math_fft_segment_label.setObjectName("math_fft_segment_label")
+        self.formLayout_fft.setWidget(4, QtWidgets.QFormLayout.LabelRole, self.math_fft_segment_label)
+        self.math_fft_segment_spinbox = QtWidgets.QSpinBox(self.math_fft_groupbox)
+        self.math_fft_segment_spinbox.setSingleStep(256)
+        self.math_fft_segment_spinbox.setMinimum(256)
+        self.math_fft_segment_spinbox.setMaximum(1048576)
+        self.math_fft_segment_spinbox.setProperty("value", 4096)
+        self.math_fft_segment_spinbox.setObjectName("math_fft_segment_spinbox")
+        self.formLayout_fft.setWidget(4, QtWidgets.QFormLayout.FieldRole, self.math_fft_segment_spinbox)
+        self.math_fft_overlap_label = QtWidgets.QLabel(self.math_fft_groupbox)
+        self.math_fft_overlap_label.setObjectName("math_fft_overlap_label")
+        self.formLayout_fft.setWidget(5, QtWidgets.QFormLayout.LabelRole, self.math_fft_overlap_label)
+        self.math_fft_overlap_spinbox = QtWidgets.QSpinBox(self.math_fft_groupbox)
+        self.math_fft_overlap_spinbox.setSingleStep(5)
+        self.math_fft_overlap_spinbox.setMinimum(0)
+        self.math_fft_overlap_spinbox.setMaximum(95)
+        self.math_fft_overlap_spinbox.setProperty("value", 50)
+        self.math_fft_overlap_spinbox.setObjectName("math_fft_overlap_spinbox")
+        self.formLayout_fft.setWidget(5, QtWidgets.QFormLayout.FieldRole, self.math_fft_overlap_spinbox)
+        self.math_fft_dbv_checkbox = QtWidgets.QCheckBox(self.math_fft_groupbox)
+        self.math_fft_dbv_checkbox.setObjectName("math_fft_dbv_checkbox")
+        self.formLayout_fft.setWidget(6, QtWidgets.QFormLayout.FieldRole, self.math_fft_dbv_checkbox)
+        self.verticalLayout_7.addWidget(self.math_fft_groupbox)
+        spacerItem2 = QtWidgets.QSpacerItem(20, 40, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.verticalLayout_7.addItem(spacerItem2)
+        self.tabWidget.addTab(self.tab_math, "")
+        self.tab_measure = QtWidgets.QWidget()
+        self.tab_measure.setObjectName("tab_measure")
+        self.verticalLayout_measure = QtWidgets.QVBoxLayout(self.tab_measure)
+        self.verticalLayout_measure.setObjectName("verticalLayout_measure")
+        self.measure_enable_checkbox = QtWidgets.QCheckBox(self.tab_measure)
+        self.measure_enable_checkbox.setObjectName("measure_enable_checkbox")
+        self.verticalLayout_measure.addWidget(self.measure_enable_checkbox)
+        self.horizontalLayout_measure_channel = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_measure_channel.setObjectName("horizontalLayout_measure_channel")
+        self.measure_channel_label = QtWidgets.QLabel(self.tab_measure)
+        self.measure_channel_label.setObjectName("measure_channel_label")
+        self.horizontalLayout_measure_channel.addWidget(self.measure_channel_label)
+        self.measure_channel_combobox = QtWidgets.QComboBox(self.tab_measure)
+        self.measure_channel_combobox.setObjectName("measure_channel_combobox")
+        self.measure_channel_combobox.addItem("")
+        self.measure_channel_combobox.addItem("")
+        self.measure_channel_combobox.addItem("")
+        self.measure_channel_combobox.addItem("")
+        self.horizontalLayout_measure_channel.addWidget(self.measure_channel_combobox)
+        self.verticalLayout_measure.addLayout(self.horizontalLayout_measure_channel)
+        self.measure_table = QtWidgets.QTableWidget(self.tab_measure)
+        self.measure_table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.measure_table.setObjectName("measure_table")
+        self.measure_table.setColumnCount(0)
+        self.measure_table.setRowCount(0)
+        self.verticalLayout_measure.addWidget(self.measure_table)
+        self.horizontalLayout_measure_reset = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_measure_reset.setObjectName("horizontalLayout_measure_reset")
+        self.measure_count_label = QtWidgets.QLabel(self.tab_measure)
+        self.measure_count_label.setText("")
+        self.measure_count_label.setObjectName("measure_count_label")
+        self.horizontalLayout_measure_reset.addWidget(self.measure_count_label)
+        self.measure_reset_button = QtWidgets.QPushButton(self.tab_measure)
+        self.measure_reset_button.setObjectName("measure_reset_button")
+        self.horizontalLayout_measure_reset.addWidget(self.measure_reset_button)
+        self.verticalLayout_measure.addLayout(self.horizontalLayout_measure_reset)
+        self.tabWidget.addTab(self.tab_measure, "")
+        self.gridLayout.addWidget(self.tabWidget, 0, 0, 2, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 1600, 22))
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuView = QtWidgets.QMenu(self.menubar)
+        self.menuView.setObjectName("menuView")
+        self.menuHelp = QtWidgets.QMenu(self.menubar)
+        self.menuHelp.setObjectName("menuHelp")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.menu_action_open = QtWidgets.QAction(MainWindow)
+        self.menu_action_open.setObjectName("menu_action_open")
+        self.menu_action_save = QtWidgets.QAction(MainWindow)
+        self.menu_action_save.setObjectName("menu_action_save")
+        self.menu_action_record = QtWidgets.QAction(MainWindow)
+        self.menu_action_record.setCheckable(True)
+        self.menu_action_record.setObjectName("menu_action_record")
+        self.menu_action_exit = QtWidgets.QAction(MainWindow)
+        self.menu_action_exit.setObjectName("menu_action_exit")
+        self.menu_action_publish = QtWidgets.QAction(MainWindow)
+        self.menu_action_publish.setCheckable(True)
+        self.menu_action_publish.setObjectName("menu_action_publish")
+        self.menu_action_performance_overlay = QtWidgets.QAction(MainWindow)
+        self.menu_action_performance_overlay.setCheckable(True)
+        self.menu_action_performance_overlay.setObjectName("menu_action_performance_overlay")
+        self.menu_action_export_statistics = QtWidgets.QAction(MainWindow)
+        self.menu_action_export_statistics.setObjectName("menu_action_export_statistics")
+        self.menu_action_persistence = QtWidgets.QAction(MainWindow)
+        self.menu_action_persistence.setCheckable(True)
+        self.menu_action_persistence.setObjectName("menu_action_persistence")
+        self.menu_action_persistence_infinite = QtWidgets.QAction(MainWindow)
+        self.menu_action_persistence_infinite.setCheckable(True)
+        self.menu_action_persistence_infinite.setObjectName("menu_action_persistence_infinite")
+        self.menu_action_persistence_clear = QtWidgets.QAction(MainWindow)
+        self.menu_action_persistence_clear.setObjectName("menu_action_persistence_clear")
+        self.menu_action_about = QtWidgets.QAction(MainWindow)
+        self.menu_action_about.setObjectName("menu_action_about")
+        self.menuFile.addAction(self.menu_action_open)
+        self.menuFile.addAction(self.menu_action_save)
+        self.menuFile.addAction(self.menu_action_record)
+        self.menuFile.addAction(self.menu_action_publish)
+        self.menuFile.addAction(self.menu_action_exit)
+        self.menuView.addAction(self.menu_action_performance_overlay)
+        self.menuView.addAction(self.menu_action_export_statistics)
+        self.menuView.addSeparator()
+        self.menuView.addAction(self.menu_action_persistence)
+        self.menuView.addAction(self.menu_action_persistence_infinite)
+        self.menuView.addAction(self.menu_action_persistence_clear)
+        self.menuHelp.addAction(self.menu_action_about)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuView.menuAction())
+        self.menubar.addAction(self.menuHelp.menuAction())
+
+        self.retranslateUi(MainWindow)
+        self.tabWidget.setCurrentIndex(2)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "PyOscilloscope"))
+        self.graph_groupbox.setTitle(_translate("MainWindow", "Graph"))
+        self.connect_connection_groupbox.setTitle(_translate("MainWindow", "Connection"))
+        self.connection_connect_button.setText(_translate("MainWindow", "Connect"))
+        self.connect_device_name_label.setText(_translate("MainWindow", "Device:"))
+        self.connection_status_label.setText(_translate("MainWindow", "Status: Not Connected"))
+        self.connection_current_time_label.setText(_translate("MainWindow", "Current Time: 00:00:00"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_connection), _translate("MainWindow", "Connect"))
+        self.control_select_channel_groupbox.setTitle(_translate("MainWindow", "Select Channel"))
+        self.control_select_channel_ch1.setText(_translate("MainWindow", "Probe Channel 1"))
+        self.control_select_channel_ch2.setText(_translate("MainWindow", "Probe Channel 2"))
+        self.control_select_channel_ch3.setText(_translate("MainWindow", "Probe Channel 3"))
+        self.control_select_channel_ch4.setText(_translate("MainWindow", "Probe Channel 4"))
+        self.control_transfer_format_combobox.setToolTip(_translate("MainWindow", "Waveform transfer format (int16 keeps Hi Res / Average resolution)"))
+        self.control_autoset.setText(_translate("MainWindow", "AutoSet"))
+        self.control_single.setText(_translate("MainWindow", "Single"))
+        self.control_run_stop.setText(_translate("MainWindow", "Run / Stop"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_control), _translate("MainWindow", "Control"))
+        self.math_select_channel_groupbox.setTitle(_translate("MainWindow", "Select Channel"))
+        self.math_channel_select_source1_combobox.setItemText(0, _translate("MainWindow", "Channel 1"))
+        self.math_channel_select_source1_combobox.setItemText(1, _translate("MainWindow", "Channel 2"))
+        self.math_channel_select_source1_combobox.setItemText(2, _translate("MainWindow", "Channel 3"))
+        self.math_channel_select_source1_combobox.setItemText(3, _translate("MainWindow", "Channel 4"))
+        self.math_channel_select_source1.setText(_translate("MainWindow", "Source 1"))
+        self.math_channel_select_source2_combobox.setItemText(0, _translate("MainWindow", "Channel 1"))
+        self.math_channel_select_source2_combobox.setItemText(1, _translate("MainWindow", "Channel 2"))
+        self.math_channel_select_source2_combobox.setItemText(2, _translate("MainWindow", "Channel 3"))
+        self.math_channel_select_source2_combobox.setItemText(3, _translate("MainWindow", "Channel 4"))
+        self.math_channel_select_source2.setText(_translate("MainWindow", "Source 2"))
+        self.math_function_groupbox.setTitle(_translate("MainWindow", "Function"))
+        self.math_function_add.setText(_translate("MainWindow", "Add"))
+        self.math_function_subtract.setText(_translate("MainWindow", "Subtract"))
+        self.math_function_multiply.setText(_translate("MainWindow", "Multiply"))
+        self.math_function_divide.setText(_translate("MainWindow", "Divide"))
+        self.math_function_expression.setText(_translate("MainWindow", "Expression"))
+        self.math_expression_lineedit.setPlaceholderText(_translate("MainWindow", "(CH1-CH2)*CH3, abs, integrate, differentiate, lowpass(CH1, 1e6)"))
+        self.math_fft_groupbox.setTitle(_translate("MainWindow", "Spectrum (FFT)"))
+        self.math_fft_mode_label.setText(_translate("MainWindow", "Mode"))
+        self.math_fft_window_label.setText(_translate("MainWindow", "Window"))
+        self.math_fft_averaging_label.setText(_translate("MainWindow", "Averaging"))
+        self.math_fft_average_count_label.setText(_translate("MainWindow", "Averages"))
+        self.math_fft_segment_label.setText(_translate("MainWindow", "Segment"))
+        self.math_fft_segment_spinbox.setSuffix(_translate("MainWindow", " pts"))
+        self.math_fft_overlap_label.setText(_translate("MainWindow", "Overlap"))
+        self.math_fft_overlap_spinbox.setSuffix(_translate("MainWindow", " %"))
+        self.math_fft_dbv_checkbox.setText(_translate("MainWindow", "dB scale"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_math), _translate("MainWindow", "Math"))
+        self.measure_enable_checkbox.setText(_translate("MainWindow", "Measure every frame"))
+        self.measure_channel_label.setText(_translate("MainWindow", "Channel"))
+        self.measure_channel_combobox.setItemText(0, _translate("MainWindow", "Channel 1"))
+        self.measure_channel_combobox.setItemText(1, _translate("MainWindow", "Channel 2"))
+        self.measure_channel_combobox.setItemText(2, _translate("MainWindow", "Channel 3"))
+        self.measure_channel_combobox.setItemText(3, _translate("MainWindow", "Channel 4"))
+        self.measure_reset_button.setText(_translate("MainWindow", "Reset Statistics"))
+        self.tabWidget.setTabText(self.tabWidget.indexOf(self.tab_measure), _translate("MainWindow", "Measure"))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuView.setTitle(_translate("MainWindow", "View"))
+        self.menuHelp.setTitle(_translate("MainWindow", "Help"))
+        self.menu_action_open.setText(_translate("MainWindow", "Open"))
+        self.menu_action_save.setText(_translate("MainWindow", "Save"))
+        self.menu_action_record.setText(_translate("MainWindow", "Record..."))
+        self.menu_action_exit.setText(_translate("MainWindow", "Exit"))
+        self.menu_action_publish.setText(_translate("MainWindow", "Publish Frames"))
+        self.menu_action_performance_overlay.setText(_translate("MainWindow", "Performance Overlay"))
+        self.menu_action_export_statistics.setText(_translate("MainWindow", "Export Statistics..."))
+        self.menu_action_persistence.setText(_translate("MainWindow", "Persistence"))
+        self.menu_action_persistence_infinite.setText(_translate("MainWindow", "Infinite Persistence"))
+        self.menu_action_persistence_clear.setText(_translate("MainWindow", "Clear Persistence"))
+        self.menu_action_about.setText(_translate("MainWindow", "About"))
@@ -0,0 +1,96 @@
+import numpy as np
+
+
+class Waveform:
+    """Raw samples of one channel and the preamble needed to scale them.
+
+    Samples stay in the instrument's integer format (int8/int16). The time axis is only
+    ``x_zero`` + ``x_increment``, and volts are computed on demand, so a frame that is
+    never displayed or analysed is never converted to floating point.
+
+    Parameters:
+        raw: 1D integer array of digitizer levels (may be a view on the transfer buffer)
+        preamble: parsed ``WFMOutpre?`` response (see oscilloscope.parse_preamble)
+    """
+
+    def __init__(self, raw, preamble):
+        self.raw = raw
+        self.preamble = preamble
+        self.x_increment = preamble['XINCR']
+        self.x_zero = preamble['XZERO']
+        self.y_mult = preamble['YMULT']
+        self.y_off = preamble['YOFF']
+        self.y_zero = preamble['YZERO']
+        self._volts = None
+
+    def __len__(self):
+        return self.raw.shape[-1]
+
+    @property
+    def duration(self):
+        return self.x_increment * len(self)
+
+    def scale(self, raw, out=None, dtype=np.float32):
+        """Convert ``raw`` levels (this record or a slice of it) to volts.
+
+        The result is written into ``out`` when given, so callers can reuse one buffer
+        across frames.
+        """
+        if out is None:
+            out = np.empty(raw.shape, dtype=dtype)
+        np.subtract(raw, self.y_off, out=out, dtype=out.dtype)
+        out *= self.y_mult
+        out += self.y_zero
+        return out
+
+    def volts(self, out=None):
+        """Scaled record in float32 volts.
+
+        Without ``out`` the result is computed once and cached on the waveform, so every
+        consumer of the same frame shares one array.
+        """
+        if out is not None:
+            return self.scale(self.raw, out=out)
+        if self._volts is None:
+            self._volts = self.scale(self.raw)
+        return self._volts
+
+
+class SegmentedWaveform(Waveform):
+    """FastFrame acquisition of one channel: many triggered frames sharing one preamble.
+
+    ``raw`` is (frames x samples), usually a reshaped view of a single transfer block, so
+    ``volts()`` scales every frame in one vectorized pass. Length, duration and time axis are
+    those of one frame.
+
+    Parameters:
+        raw: 2D integer array of digitizer levels, one row per frame
+        preamble: parsed ``WFMOutpre?`` response
+        trigger_times: seconds from the first frame's trigger to each frame's trigger
+        first_trigger: Unix time of the first trigger on the instrument clock (None if unknown)
+    """
+
+    def __init__(self, raw, preamble, trigger_times, first_trigger=None):
+        super().__init__(raw, preamble)
+        self.trigger_times = trigger_times
+        self.first_trigger = first_trigger
+
+    @property
+    def frame_count(self):
+        return self.raw.shape[0]
+
+    def frame(self, index):
+        """Waveform of a single frame, viewing the samples of this acquisition."""
+        return Waveform(self.raw[index], self.preamble)
+
+
+def volts_block(waveforms, out=None, dtype=np.float32):
+    """Scale several equal-length waveforms into one (channels x record) array.
+
+    Pass the previous result as ``out`` to reuse it for the next frame.
+    """
+    if out is None:
+        out = np.empty((len(waveforms), len(waveforms[0])), dtype=dtype)
+    for row, waveform in zip(out, waveforms):
+        waveform.scale(waveform.raw, out=row)
+    return out
@@ -0,0 +1,74 @@
+from src.oscilloscope import Oscilloscope
+from src.simulated_scope import SIMULATED_ADDRESS, SimulatedResourceManager
+
+CHANNELS = {1: True, 2: True, 3: False, 4: False}
+
+
+def connect(monkeypatch, corrupt_curves):
+    """Simulated scope whose next ``corrupt_curves`` multi-source CURve? replies start with a bad block header."""
+    oscilloscope = Oscilloscope()
+    oscilloscope.connect_device(SIMULATED_ADDRESS)
+    resource = oscilloscope.scope.resource
+    write = resource.write
+    remaining = [corrupt_curves]
+    commands = []
+
+    def corrupting_write(message):
+        commands.append(message)
+        position = len(resource.output)
+        result = write(message)
+        if 'CURve?' in message and len(resource.data_sources) > 1 and remaining[0] > 0:
+            remaining[0] -= 1
+            resource.output[position:position + 2] = b'X9'
+        return result
+
+    monkeypatch.setattr(resource, 'write', corrupting_write)
+    return oscilloscope, commands
+
+
+def test_bad_multi_source_block_falls_back_to_per_channel(monkeypatch):
+    oscilloscope, commands = connect(monkeypatch, corrupt_curves=1)
+    oscilloscope.acquire_frame(CHANNELS)
+    assert oscilloscope.multi_source_supported
+    assert oscilloscope.multi_source_failures == 1
+    assert sorted(oscilloscope.waveforms) == [1, 2]
+    # The multi-source CURve? failed, then one CURve? per channel
+    assert sum('CURve?' in command for command in commands) == 3
+
+    commands.clear()
+    oscilloscope.acquire_frame(CHANNELS)
+    assert oscilloscope.multi_source_failures == 0
+    assert sum('CURve?' in command for command in commands) == 1
+    assert all(len(oscilloscope.waveforms[channel]) == oscilloscope.record_length for channel in (1, 2))
+
+
+def test_repeated_multi_source_failures_disable_the_mode(monkeypatch):
+    oscilloscope, commands = connect(monkeypatch, corrupt_curves=3)
+    for _ in range(3):
+        oscilloscope.acquire_frame(CHANNELS)
+    assert oscilloscope.multi_source_supported is False
+
+    commands.clear()
+    oscilloscope.acquire_frame(CHANNELS)
+    assert sum('CURve?' in command for command in commands) == 2
+    assert sorted(oscilloscope.waveforms) == [1, 2]
+
+
+def test_run_mode_channels_come_from_one_acquisition(monkeypatch):
+    oscilloscope = Oscilloscope()
+    oscilloscope.connect_device(SIMULATED_ADDRESS, SimulatedResourceManager(multi_source=False, run_trigger_rate=1e6))
+    resource = oscilloscope.scope.resource
+    write = resource.write
+    curves = []
+
+    def recording_write(message):
+        if 'CURve?' in message:
+            curves.append((resource.acquire_state, resource._acquisition_number()))
+        return write(message)
+
+    monkeypatch.setattr(resource, 'write', recording_write)
+    oscilloscope.start_run()
+    assert oscilloscope.acquire_new_frame(CHANNELS)
+    assert len(curves) == 2
+    assert curves[0] == curves[1] == (0, oscilloscope.transferred_acquisition)
+    assert resource.acquire_state == 1